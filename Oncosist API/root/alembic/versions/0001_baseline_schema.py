@@ -0,0 +1,133 @@
+"""Baseline schema with query-driven indexes
+
+Brings any existing database, whether created by `create_all()`, by older
+releases, or by the ad-hoc migration scripts, up to the current schema, and
+creates it from scratch on an empty database. Tables that are missing are
+created; tables that exist get their missing nullable columns and indexes.
+
+Indexes follow the history queries: scans are filtered by uploader or
+patient and sorted by `uploaded_at DESC`, and each scan has at most one
+prediction.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Frozen copy of the schema at this revision (migrations must not import models)
+metadata = sa.MetaData()
+
+users = sa.Table(
+    "users", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, index=True),
+    sa.Column("username", sa.String, unique=True, index=True, nullable=False),
+    sa.Column("email", sa.String, unique=True, index=True, nullable=False),
+    sa.Column("hashed_password", sa.String, nullable=False),
+    sa.Column("full_name", sa.String, nullable=False),
+    sa.Column("position", sa.String, nullable=False),
+    sa.Column("created_at", sa.DateTime),
+)
+
+patients = sa.Table(
+    "patients", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, index=True, autoincrement=True),
+    sa.Column("name", sa.String, nullable=False),
+    sa.Column("age", sa.Integer, nullable=False),
+    sa.Column("sex", sa.String, nullable=False),
+)
+
+scans = sa.Table(
+    "scans", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, index=True),
+    sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id"), nullable=False),
+    sa.Column("patient_id", sa.Integer, sa.ForeignKey("patients.id"), nullable=False),
+    sa.Column("patient_name", sa.String, nullable=True),
+    sa.Column("age", sa.Integer, nullable=False),
+    sa.Column("sex", sa.String, nullable=False),
+    sa.Column("scan_date", sa.DateTime, nullable=False),
+    sa.Column("uploaded_at", sa.DateTime),
+    sa.Column("file_path", sa.String, nullable=False),
+    sa.Column("doctor_notes", sa.Text, nullable=True),
+    sa.Column("content_hash", sa.String(64), nullable=True, index=True),
+    sa.Column("tensor_path", sa.String, nullable=True),
+    sa.Column("thumbnail_path", sa.String, nullable=True),
+)
+sa.Index("ix_scans_user_id_uploaded_at", scans.c.user_id, scans.c.uploaded_at.desc())
+sa.Index("ix_scans_patient_id_uploaded_at", scans.c.patient_id, scans.c.uploaded_at.desc())
+
+predictions = sa.Table(
+    "predictions", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, index=True),
+    sa.Column("scan_id", sa.Integer, sa.ForeignKey("scans.id"), nullable=False),
+    sa.Column("result_path", sa.String, nullable=True, index=True),
+    sa.Column("tumor_type", sa.String, nullable=True),
+    sa.Column("mask_path", sa.String, nullable=True),
+    sa.Column("overlay_slice", sa.Integer, nullable=True),
+    sa.Column("status", sa.String),
+    sa.Column("created_at", sa.DateTime),
+)
+sa.Index("uq_predictions_scan_id", predictions.c.scan_id, unique=True)
+
+prediction_cache = sa.Table(
+    "prediction_cache", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, index=True),
+    sa.Column("image_hash", sa.String(64), nullable=False),
+    sa.Column("model_version", sa.String(64), nullable=False),
+    sa.Column("tumor_type", sa.String, nullable=False),
+    sa.Column("mask", sa.LargeBinary, nullable=False),
+    sa.Column("created_at", sa.DateTime),
+    sa.Column("last_accessed_at", sa.DateTime, index=True),
+)
+sa.Index("ix_prediction_cache_key", prediction_cache.c.image_hash, prediction_cache.c.model_version, unique=True)
+
+
+def _deduplicate_predictions(bind):
+    """Keeps one prediction per scan (completed first, then newest) so the unique index can be built."""
+    rows = bind.execute(sa.text("SELECT id, scan_id, status FROM predictions ORDER BY id")).all()
+
+    keep = {}
+    for prediction_id, scan_id, status in rows:
+        current = keep.get(scan_id)
+        if current is None or status == "completed" or current[1] != "completed":
+            keep[scan_id] = (prediction_id, status)
+
+    kept_ids = {prediction_id for prediction_id, _ in keep.values()}
+    for prediction_id, _, _ in rows:
+        if prediction_id not in kept_ids:
+            bind.execute(sa.text("DELETE FROM predictions WHERE id = :id"), {"id": prediction_id})
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            table.create(bind)
+            continue
+
+        # Columns added by later releases of the pre-migration schema
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing_columns and column.nullable:
+                op.add_column(table.name, sa.Column(column.name, column.type, nullable=True))
+
+        if table.name == "predictions":
+            _deduplicate_predictions(bind)
+
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(bind)
+
+
+def downgrade():
+    metadata.drop_all(op.get_bind())
@@ -0,0 +1,38 @@
+"""Extend history indexes with the keyset tie-breaker
+
+History pages are read newest first and resumed from an `(uploaded_at, id)`
+cursor. Adding `id` to the composite indexes lets the database seek to the
+cursor and return rows in index order without a sort.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_scans_user_id_uploaded_at_id", "scans",
+        ["user_id", sa.text("uploaded_at DESC"), sa.text("id DESC")],
+    )
+    op.create_index(
+        "ix_scans_patient_id_uploaded_at_id", "scans",
+        ["patient_id", sa.text("uploaded_at DESC"), sa.text("id DESC")],
+    )
+    op.drop_index("ix_scans_user_id_uploaded_at", table_name="scans")
+    op.drop_index("ix_scans_patient_id_uploaded_at", table_name="scans")
+
+
+def downgrade():
+    op.create_index("ix_scans_user_id_uploaded_at", "scans", ["user_id", sa.text("uploaded_at DESC")])
+    op.create_index("ix_scans_patient_id_uploaded_at", "scans", ["patient_id", sa.text("uploaded_at DESC")])
+    op.drop_index("ix_scans_user_id_uploaded_at_id", table_name="scans")
+    op.drop_index("ix_scans_patient_id_uploaded_at_id", table_name="scans")
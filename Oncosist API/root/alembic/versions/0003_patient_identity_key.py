@@ -0,0 +1,63 @@
+"""Add a unique patient identity key and merge duplicate patients
+
+Uploads looked patients up by the wrong column and created a new row every
+time. Each patient now has an identity key (normalized name, age and sex)
+with a unique index. Existing duplicates are merged into their oldest row
+and their scans repointed before the index is built.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def _identity_key(name: str, age: int, sex: str) -> str:
+    """Frozen copy of `app.db.models.patient.patient_identity_key`."""
+    return f"{' '.join(name.split()).casefold()}|{age}|{sex.strip().casefold()}"
+
+
+def _merge_duplicate_patients(bind):
+    """Sets every identity key, keeping the oldest patient of each key and moving the others' scans to it."""
+    rows = bind.execute(sa.text("SELECT id, name, age, sex FROM patients ORDER BY id")).all()
+
+    keep = {}
+    merged = []
+    for patient_id, name, age, sex in rows:
+        key = _identity_key(name, age, sex)
+        if key in keep:
+            merged.append({"duplicate_id": patient_id, "patient_id": keep[key]})
+        else:
+            keep[key] = patient_id
+
+    if merged:
+        bind.execute(sa.text("UPDATE scans SET patient_id = :patient_id WHERE patient_id = :duplicate_id"), merged)
+        bind.execute(sa.text("DELETE FROM patients WHERE id = :duplicate_id"), merged)
+    if keep:
+        bind.execute(
+            sa.text("UPDATE patients SET identity_key = :key WHERE id = :id"),
+            [{"key": key, "id": patient_id} for key, patient_id in keep.items()],
+        )
+
+
+def upgrade():
+    op.add_column("patients", sa.Column("identity_key", sa.String, nullable=True))
+    _merge_duplicate_patients(op.get_bind())
+
+    with op.batch_alter_table("patients") as batch_op:
+        batch_op.alter_column("identity_key", existing_type=sa.String, nullable=False)
+    op.create_index("uq_patients_identity_key", "patients", ["identity_key"], unique=True)
+
+
+def downgrade():
+    # Merged patients are not split again
+    op.drop_index("uq_patients_identity_key", table_name="patients")
+    with op.batch_alter_table("patients") as batch_op:
+        batch_op.drop_column("identity_key")
@@ -0,0 +1,185 @@
+"""Add statistics rollups maintained by triggers
+
+Dashboards counted scans, predictions and tumor types by downloading the
+whole history. Four rollup tables now hold those counts per user and per
+patient. Triggers on `scans` and `predictions` adjust them in the writing
+transaction, whichever code path inserts, updates or deletes the rows.
+Existing data is counted once here; `backfill_stats.py` recounts it later.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+STATS_TABLES = (
+    "stats_user_daily_scans",
+    "stats_user_patient_scans",
+    "stats_user_predictions",
+    "stats_patient_predictions",
+)
+
+
+def _add(table: str, keys: dict, counter: str, delta: str, source: str) -> list[str]:
+    """
+    Adds `delta` to the counter of every key row selected from `source`.
+
+    Rows that drop to zero are deleted, so the tables only hold live counts.
+    `date()`, row values and the upsert syntax are the same on SQLite and PostgreSQL.
+    """
+    columns, values = ", ".join(keys), ", ".join(keys.values())
+    return [
+        f"INSERT INTO {table} ({columns}, {counter}) SELECT {values}, {delta} {source} "
+        f"ON CONFLICT ({columns}) DO UPDATE SET {counter} = {table}.{counter} + excluded.{counter}",
+        f"DELETE FROM {table} WHERE {counter} <= 0 AND ({columns}) IN (SELECT {values} {source})",
+    ]
+
+
+def _scan_counts(row: str, delta: str) -> list[str]:
+    """Statements counting the scan `row` (NEW or OLD) with the given sign."""
+    user, patient = f"{row}.user_id", f"{row}.patient_id"
+    return (
+        _add("stats_user_daily_scans", {"user_id": user, "day": f"date({row}.uploaded_at)"}, "scans", delta,
+             f"WHERE {row}.uploaded_at IS NOT NULL")
+        + _add("stats_user_patient_scans", {"user_id": user, "patient_id": patient}, "scans", delta, "WHERE 1 = 1")
+        # A deleted or reassigned scan takes its prediction along
+        + _add("stats_user_predictions",
+               {"user_id": user, "status": "COALESCE(p.status, 'pending')", "tumor_type": "COALESCE(p.tumor_type, '')"},
+               "predictions", delta, f"FROM predictions p WHERE p.scan_id = {row}.id")
+        + _add("stats_patient_predictions",
+               {"patient_id": patient, "status": "COALESCE(p.status, 'pending')", "tumor_type": "COALESCE(p.tumor_type, '')"},
+               "predictions", delta, f"FROM predictions p WHERE p.scan_id = {row}.id")
+    )
+
+
+def _prediction_counts(row: str, delta: str) -> list[str]:
+    """Statements counting the prediction `row` (NEW or OLD) with the given sign."""
+    status, tumor_type = f"COALESCE({row}.status, 'pending')", f"COALESCE({row}.tumor_type, '')"
+    source = f"FROM scans s WHERE s.id = {row}.scan_id"
+    return (
+        _add("stats_user_predictions", {"user_id": "s.user_id", "status": status, "tumor_type": tumor_type},
+             "predictions", delta, source)
+        + _add("stats_patient_predictions", {"patient_id": "s.patient_id", "status": status, "tumor_type": tumor_type},
+               "predictions", delta, source)
+    )
+
+
+# Which columns of each table the rollups depend on. SQLite drops a table's
+# triggers when batch migrations recreate it; such migrations must recreate them.
+SCAN_COLUMNS = ("user_id", "patient_id", "uploaded_at")
+PREDICTION_COLUMNS = ("scan_id", "status", "tumor_type")
+
+
+def _create_sqlite_triggers():
+    for table, columns, counts in (
+        ("scans", SCAN_COLUMNS, _scan_counts),
+        ("predictions", PREDICTION_COLUMNS, _prediction_counts),
+    ):
+        changed = " OR ".join(f"OLD.{column} IS NOT NEW.{column}" for column in columns)
+        for event, when, statements in (
+            ("INSERT", "", counts("NEW", "1")),
+            ("DELETE", "", counts("OLD", "-1")),
+            (f"UPDATE OF {', '.join(columns)}", f"WHEN {changed}", counts("OLD", "-1") + counts("NEW", "1")),
+        ):
+            name = f"stats_{table}_{event.split()[0].lower()}"
+            body = "".join(f"{statement};\n" for statement in statements)
+            op.execute(f"CREATE TRIGGER {name} AFTER {event} ON {table} FOR EACH ROW {when}\nBEGIN\n{body}END")
+
+
+def _create_postgresql_triggers():
+    for table, columns, counts in (
+        ("scans", SCAN_COLUMNS, _scan_counts),
+        ("predictions", PREDICTION_COLUMNS, _prediction_counts),
+    ):
+        changed = " OR ".join(f"OLD.{column} IS DISTINCT FROM NEW.{column}" for column in columns)
+        old = "".join(f"    {statement};\n" for statement in counts("OLD", "-1"))
+        new = "".join(f"    {statement};\n" for statement in counts("NEW", "1"))
+        op.execute(f"""
+CREATE OR REPLACE FUNCTION stats_{table}_changed() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+  IF TG_OP = 'UPDATE' AND NOT ({changed}) THEN
+    RETURN NULL;
+  END IF;
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+{old}  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+{new}  END IF;
+  RETURN NULL;
+END
+$$""")
+        op.execute(
+            f"CREATE TRIGGER stats_{table}_changed AFTER INSERT OR DELETE OR UPDATE OF {', '.join(columns)} "
+            f"ON {table} FOR EACH ROW EXECUTE FUNCTION stats_{table}_changed()"
+        )
+
+
+def _backfill():
+    """Counts the existing scans and predictions."""
+    op.execute(
+        "INSERT INTO stats_user_daily_scans (user_id, day, scans) "
+        "SELECT user_id, date(uploaded_at), COUNT(*) FROM scans WHERE uploaded_at IS NOT NULL "
+        "GROUP BY user_id, date(uploaded_at)"
+    )
+    op.execute(
+        "INSERT INTO stats_user_patient_scans (user_id, patient_id, scans) "
+        "SELECT user_id, patient_id, COUNT(*) FROM scans GROUP BY user_id, patient_id"
+    )
+    for table, owner in (("stats_user_predictions", "user_id"), ("stats_patient_predictions", "patient_id")):
+        op.execute(
+            f"INSERT INTO {table} ({owner}, status, tumor_type, predictions) "
+            f"SELECT s.{owner}, COALESCE(p.status, 'pending'), COALESCE(p.tumor_type, ''), COUNT(*) "
+            f"FROM predictions p JOIN scans s ON s.id = p.scan_id "
+            f"GROUP BY s.{owner}, COALESCE(p.status, 'pending'), COALESCE(p.tumor_type, '')"
+        )
+
+
+def upgrade():
+    op.create_table(
+        "stats_user_daily_scans",
+        sa.Column("user_id", sa.Integer, primary_key=True),
+        sa.Column("day", sa.Date, primary_key=True),
+        sa.Column("scans", sa.Integer, nullable=False),
+    )
+    op.create_table(
+        "stats_user_patient_scans",
+        sa.Column("user_id", sa.Integer, primary_key=True),
+        sa.Column("patient_id", sa.Integer, primary_key=True),
+        sa.Column("scans", sa.Integer, nullable=False),
+    )
+    op.create_index("ix_stats_user_patient_scans_patient_id", "stats_user_patient_scans", ["patient_id"])
+    for table, owner in (("stats_user_predictions", "user_id"), ("stats_patient_predictions", "patient_id")):
+        op.create_table(
+            table,
+            sa.Column(owner, sa.Integer, primary_key=True),
+            sa.Column("status", sa.String, primary_key=True),
+            sa.Column("tumor_type", sa.String, primary_key=True),
+            sa.Column("predictions", sa.Integer, nullable=False),
+        )
+
+    _backfill()
+    if op.get_bind().dialect.name == "postgresql":
+        _create_postgresql_triggers()
+    else:
+        _create_sqlite_triggers()
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        for table in ("scans", "predictions"):
+            op.execute(f"DROP TRIGGER IF EXISTS stats_{table}_changed ON {table}")
+            op.execute(f"DROP FUNCTION IF EXISTS stats_{table}_changed()")
+    else:
+        for table in ("scans", "predictions"):
+            for event in ("insert", "delete", "update"):
+                op.execute(f"DROP TRIGGER IF EXISTS stats_{table}_{event}")
+
+    op.drop_index("ix_stats_user_patient_scans_patient_id", table_name="stats_user_patient_scans")
+    for table in reversed(STATS_TABLES):
+        op.drop_table(table)
@@ -0,0 +1,29 @@
+"""Record when a prediction job was claimed
+
+Resuming jobs reset every 'processing' prediction to 'pending', even ones a
+live worker was still computing. The claim time lets resumption (and
+`/predict`) take over only jobs whose claim is older than the stale timeout.
+Jobs already 'processing' have no claim time and count as stale.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("predictions", sa.Column("claimed_at", sa.DateTime, nullable=True))
+
+
+def downgrade():
+    # Plain ALTER TABLE (SQLite 3.35+): a batch table rebuild would drop the
+    # statistics triggers of migration 0004
+    op.execute("ALTER TABLE predictions DROP COLUMN claimed_at")
@@ -8,11 +8,11 @@ This module provides:
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordRequestForm
 
 # Local Imports
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.services.auth_service import register_user, login_user, refresh_access_token
 from app.schemas.user import UserCreate, UserResponse
 from app.schemas.token import TokenResponse
@@ -22,7 +22,7 @@ router = APIRouter()
 
 
 @router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED, summary="Register new user")
-def signup(user_data: UserCreate, db: Session = Depends(get_db)):
+async def signup(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     API endpoint for user registration.
 
@@ -33,7 +33,7 @@ def signup(user_data: UserCreate, db: Session = Depends(get_db)):
 
     Args:
         user_data (UserCreate): The user details from the request.
-        db (Session): Database session dependency.
+        db (AsyncSession): Async database session dependency.
 
     Returns:
         UserResponse: The created user details.
@@ -41,7 +41,7 @@ def signup(user_data: UserCreate, db: Session = Depends(get_db)):
     Raises:
         HTTPException: If the email is already registered.
     """
-    new_user = register_user(db, user_data)
+    new_user = await register_user(db, user_data)
     if not new_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -51,7 +51,7 @@ def signup(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse, summary="Authenticate user and return tokens")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """
     API endpoint for user login.
 
@@ -61,7 +61,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
 
     Args:
         form_data (OAuth2PasswordRequestForm): The login form containing email and password.
-        db (Session): Database session dependency.
+        db (AsyncSession): Async database session dependency.
 
     Returns:
         TokenResponse: Contains access & refresh tokens.
@@ -69,7 +69,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     Raises:
         HTTPException: If authentication fails due to invalid credentials.
     """
-    auth_result = login_user(db, form_data.username, form_data.password)
+    auth_result = await login_user(db, form_data.username, form_data.password)
     if not auth_result:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -79,7 +79,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
 
 
 @router.post("/refresh", response_model=TokenResponse, summary="Refresh access token")
-def refresh(token: str, db: Session = Depends(get_db)):
+async def refresh(token: str):
     """
     API endpoint for refreshing an expired access token.
 
@@ -89,7 +89,6 @@ def refresh(token: str, db: Session = Depends(get_db)):
 
     Args:
         token (str): The refresh token provided by the client.
-        db (Session): Database session dependency.
 
     Returns:
         TokenResponse: The new access token.
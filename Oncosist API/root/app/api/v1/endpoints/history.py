@@ -2,88 +2,96 @@
 MRI Scan History API.
 
 This module provides:
-- User-based scan history (recent and full).
-- Patient-based scan history (recent and full).
-- Deletion of scans (restricted to the uploading user).
+- User-based scan history (recent, and full with cursor pagination and filters).
+- Patient-based scan history (recent, and full with cursor pagination and filters).
+- Deletion of scans and their files (restricted to the uploading user).
+
+History reads use the read replica when one is configured; see `get_user_read_db`.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from typing import List
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import Optional
 
 # Local Imports
-from app.db.session import get_db
+from app.core.config import settings
+from app.db.routing import recent_writes
+from app.db.session import get_async_db
 from app.db.models.scan import Scan
 from app.db.models.patient import Patient
 from app.db.models.user import User
-from app.services.auth_service import get_current_user
-from app.services.scan_service import format_scan_response
+from app.services.auth_service import get_current_user, get_user_read_db
+from app.services.history_service import get_scan_page
+from app.services.scan_service import delete_scan_files, format_scan_page, scan_files
 
 # Initialize router
 router = APIRouter()
 
+RECENT_LIMIT = 5  # Scans returned by the /recent endpoints
+
 ### USER-BASED SCAN HISTORY ###
 
+def _user_summary(user: User) -> dict:
+    return {
+        "user_id": user.id,
+        "username": user.username,
+        "email": user.email
+    }
+
+
 @router.get("/user/recent", summary="Retrieve recent scans uploaded by the current user")
-def get_recent_user_scans(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def get_recent_user_scans(db: AsyncSession = Depends(get_user_read_db), current_user: User = Depends(get_current_user)):
     """
     Retrieves the 5 most recent scans uploaded by the authenticated user.
     """
-    scans = (
-        db.query(Scan)
-        .options(joinedload(Scan.patient))
-        .filter(Scan.user_id == current_user.id)
-        .order_by(Scan.uploaded_at.desc())
-        .limit(5)
-        .all()
-    )
+    scans, _ = await get_scan_page(db, Scan.user_id == current_user.id, limit=RECENT_LIMIT, include_patient=True)
 
     return {
-        "user": {
-            "user_id": current_user.id,
-            "username": current_user.username,
-            "email": current_user.email
-        },
-        "scans": format_scan_response(scans, include_patient=True, include_uploader=False)
+        "user": _user_summary(current_user),
+        "scans": await format_scan_page(scans, include_patient=True, include_uploader=False)
     }
 
 
-@router.get("/user/all", summary="Retrieve full scan history of the current user")
-def get_all_user_scans(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.get("/user/all", summary="Retrieve the scan history of the current user, one page at a time")
+async def get_all_user_scans(
+    cursor: Optional[str] = Query(None, description="The next_cursor of the previous page"),
+    limit: int = Query(settings.HISTORY_PAGE_SIZE, ge=1, le=settings.HISTORY_MAX_PAGE_SIZE),
+    date_from: Optional[date] = Query(None, description="Earliest upload date (inclusive)"),
+    date_to: Optional[date] = Query(None, description="Latest upload date (inclusive)"),
+    tumor_type: Optional[str] = Query(None),
+    prediction_status: Optional[str] = Query(None, alias="status"),
+    db: AsyncSession = Depends(get_user_read_db),
+    current_user: User = Depends(get_current_user)
+):
     """
-    Retrieves the complete scan history uploaded by the authenticated user.
+    Retrieves the scan history uploaded by the authenticated user, newest first.
+
+    Pass the returned `next_cursor` back as `cursor` to get the following page;
+    it is null on the last page.
     """
-    scans = (
-        db.query(Scan)
-        .options(joinedload(Scan.patient))
-        .filter(Scan.user_id == current_user.id)
-        .order_by(Scan.uploaded_at.desc())
-        .all()
+    scans, next_cursor = await get_scan_page(
+        db, Scan.user_id == current_user.id, limit, cursor, include_patient=True,
+        date_from=date_from, date_to=date_to, tumor_type=tumor_type, prediction_status=prediction_status,
     )
 
     return {
-        "user": {
-            "user_id": current_user.id,
-            "username": current_user.username,
-            "email": current_user.email
-        },
-        "scans": format_scan_response(scans, include_patient=True, include_uploader=False)
+        "user": _user_summary(current_user),
+        "scans": await format_scan_page(scans, include_patient=True, include_uploader=False),
+        "next_cursor": next_cursor
     }
 
 
 @router.get("/user/patients", summary="Retrieve all patients linked to the current user")
-def get_patients_of_user(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def get_patients_of_user(db: AsyncSession = Depends(get_user_read_db), current_user: User = Depends(get_current_user)):
     """
     Retrieves all unique patients associated with the authenticated user's scans.
     """
-    patient_ids = (
-        db.query(Scan.patient_id)
-        .filter(Scan.user_id == current_user.id)
-        .distinct()
-        .all()
-    )
-    patient_ids = [p[0] for p in patient_ids]
-    patients = db.query(Patient).filter(Patient.id.in_(patient_ids)).all()
+    patient_ids = select(Scan.patient_id).where(Scan.user_id == current_user.id)
+    patients = await db.scalars(select(Patient).where(Patient.id.in_(patient_ids)))
 
     patient_data = [
         {
@@ -96,37 +104,31 @@ def get_patients_of_user(db: Session = Depends(get_db), current_user: User = Dep
     ]
 
     return {
-        "user": {
-            "user_id": current_user.id,
-            "username": current_user.username,
-            "email": current_user.email
-        },
+        "user": _user_summary(current_user),
         "patients": patient_data
     }
 
 
 ### PATIENT-BASED SCAN HISTORY ###
 
+async def _get_patient_or_404(db: AsyncSession, patient_id: int) -> Patient:
+    patient = await db.get(Patient, patient_id)
+    if not patient:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    return patient
+
+
 @router.get("/patient/{patient_id}/recent", summary="Retrieve recent scans of a patient")
-def get_recent_patient_scans(
+async def get_recent_patient_scans(
     patient_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_user_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Retrieves the 5 most recent scans of a specific patient.
     """
-    patient = db.query(Patient).filter(Patient.id == patient_id).first()
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
-
-    scans = (
-        db.query(Scan)
-        .filter(Scan.patient_id == patient_id)
-        .order_by(Scan.uploaded_at.desc())
-        .limit(5)
-        .all()
-    )
+    patient = await _get_patient_or_404(db, patient_id)
+    scans, _ = await get_scan_page(db, Scan.patient_id == patient_id, limit=RECENT_LIMIT, include_uploader=True)
 
     return {
         "patient": {
@@ -135,48 +137,65 @@ def get_recent_patient_scans(
             "patient_age": patient.age,
             "patient_sex": patient.sex
         },
-        "scans": format_scan_response(scans, include_patient=False, include_uploader=True)
+        "scans": await format_scan_page(scans, include_patient=False, include_uploader=True)
     }
 
 
-@router.get("/patient/{patient_id}/all", summary="Retrieve full scan history of a patient")
-def get_all_patient_scans(
+@router.get("/patient/{patient_id}/all", summary="Retrieve the scan history of a patient, one page at a time")
+async def get_all_patient_scans(
     patient_id: int,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="The next_cursor of the previous page"),
+    limit: int = Query(settings.HISTORY_PAGE_SIZE, ge=1, le=settings.HISTORY_MAX_PAGE_SIZE),
+    date_from: Optional[date] = Query(None, description="Earliest upload date (inclusive)"),
+    date_to: Optional[date] = Query(None, description="Latest upload date (inclusive)"),
+    tumor_type: Optional[str] = Query(None),
+    prediction_status: Optional[str] = Query(None, alias="status"),
+    db: AsyncSession = Depends(get_user_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Retrieves the complete scan history of a specific patient.
-    """
-    patient = db.query(Patient).filter(Patient.id == patient_id).first()
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
+    Retrieves the scan history of a specific patient, newest first.
 
-    scans = (
-        db.query(Scan)
-        .filter(Scan.patient_id == patient_id)
-        .order_by(Scan.uploaded_at.desc())
-        .all()
+    Pass the returned `next_cursor` back as `cursor` to get the following page;
+    it is null on the last page.
+    """
+    await _get_patient_or_404(db, patient_id)
+    scans, next_cursor = await get_scan_page(
+        db, Scan.patient_id == patient_id, limit, cursor, include_patient=True,
+        date_from=date_from, date_to=date_to, tumor_type=tumor_type, prediction_status=prediction_status,
     )
 
     return {
-        "scans": format_scan_response(scans, include_patient=True, include_uploader=False)
+        "scans": await format_scan_page(scans, include_patient=True, include_uploader=False),
+        "next_cursor": next_cursor
     }
 
 
 ### DELETE SCAN (User Can Only Delete Their Own Scans) ###
 
 @router.delete("/delete/{scan_id}", summary="Delete a scan (User-based permission)")
-def delete_scan(scan_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def delete_scan(scan_id: int, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     """
-    Deletes an MRI scan uploaded by the authenticated user.
+    Deletes an MRI scan uploaded by the authenticated user, along with its
+    stored files: the upload, its preprocessed tensor and thumbnail, and the
+    prediction's mask.
     """
-    scan = db.query(Scan).filter(Scan.id == scan_id, Scan.user_id == current_user.id).first()
+    # The prediction is loaded up front so the delete cascade needs no lazy load
+    scan = await db.scalar(
+        select(Scan)
+        .options(selectinload(Scan.prediction))
+        .where(Scan.id == scan_id, Scan.user_id == current_user.id)
+    )
 
     if not scan:
         raise HTTPException(status_code=404, detail="Scan not found or unauthorized to delete")
 
-    db.delete(scan)
-    db.commit()
+    paths = scan_files(scan)
+    await db.delete(scan)
+    await db.commit()
+    recent_writes.mark(current_user.id)
+
+    # Files go only once the rows are gone, so a failed delete keeps them
+    await run_in_threadpool(delete_scan_files, paths)
 
     return {"message": "Scan deleted successfully"}
@@ -1,22 +1,142 @@
 # app/api/v1/endpoints/predict.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
 # Local Imports
 from app.db.session import get_db
 from app.db.models.scan import Scan
 from app.db.models.user import User
-from app.db.crud.crud_prediction import get_prediction_by_scan
-from app.services.prediction_service import process_prediction
+from app.db.models.prediction import Prediction
+from app.db.crud.crud_prediction import (
+    get_prediction_by_scan, create_pending_prediction, update_prediction_status, claim_prediction,
+    reserve_prediction
+)
+from app.core.config import settings
+from app.schemas.prediction import PredictionBatchRequest, PredictionBatchItem
+from app.services.prediction_service import process_prediction, process_predictions_batch
 from app.services.auth_service import get_current_user
+from app.services.single_flight import SingleFlight
+from app.worker.tasks import enqueue_prediction
+from app.worker.executor import get_prediction_executor
 
 router = APIRouter()
 
+# Concurrent synchronous predictions of one scan share a single computation
+prediction_flights = SingleFlight()
+
+
+def compute_prediction(scan: Scan, db: Session, prediction: Prediction | None) -> int | None:
+    """
+    Runs the models for a scan, unless another process already is.
+
+    Creating the record first (or claiming a failed one) means the unique
+    index on `predictions.scan_id` decides the single owner across processes.
+    The reservation records its claim time, so if this process dies the job
+    is taken over once the claim is stale instead of staying 'processing'.
+
+    Args:
+        scan (Scan): The MRI scan to process.
+        db (Session): Active database session.
+        prediction (Prediction, optional): The scan's failed prediction, if any.
+
+    Returns:
+        int | None: The completed prediction's ID, or None if another process
+        owns the computation.
+    """
+    if prediction is None:
+        prediction = reserve_prediction(db, scan.id)
+        if prediction is None:
+            return None
+    elif not claim_prediction(db, prediction.id, statuses=("failed",)):
+        return None
+    db.refresh(prediction)
+
+    try:
+        return process_prediction(scan, db, prediction=prediction).id
+    except Exception:
+        db.rollback()
+        update_prediction_status(db, prediction, "failed")
+        raise
+
+
+def format_job_status(prediction: Prediction) -> dict:
+    """
+    Formats a prediction record as a job status payload.
+
+    Args:
+        prediction (Prediction): The prediction record.
+
+    Returns:
+        dict: The job status, plus results once completed.
+    """
+    return {
+        "prediction_id": prediction.id,
+        "scan_id": prediction.scan_id,
+        "status": prediction.status,
+        "tumor_type": prediction.tumor_type,
+        "overlay_image_path": prediction.result_path,
+        "status_url": f"/predict/{prediction.scan_id}/status"
+    }
+
+
+@router.post("/batch", response_model=List[PredictionBatchItem], summary="Predict tumors for many MRI scans")
+def predict_tumor_batch(
+    request: PredictionBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Runs tumor segmentation and classification for a set of MRI scans in one call.
+
+    This endpoint:
+    - Selects scans by `scan_ids`, by `patient_id`, or (with neither) all of
+      the current user's scans without a completed prediction
+    - Preprocesses images concurrently and runs the models in large batches
+    - Stores all predictions in a single transaction
+    - Skips scans whose prediction is already queued or running elsewhere;
+      they are reported as 'pending' or 'processing'
+    - Returns one result per requested scan, in request order
+    """
+    query = db.query(Scan)
+    if request.scan_ids is not None:
+        scans = query.filter(Scan.id.in_(request.scan_ids)).all()
+    elif request.patient_id is not None:
+        scans = query.filter(Scan.patient_id == request.patient_id).order_by(Scan.id).all()
+    else:
+        scans = (
+            query.outerjoin(Prediction, Prediction.scan_id == Scan.id)
+            .filter(Scan.user_id == current_user.id)
+            .filter((Prediction.id.is_(None)) | (Prediction.status != "completed"))
+            .order_by(Scan.id)
+            .all()
+        )
+
+    predictions = {p.scan_id: p for p in process_predictions_batch(scans, db)}
+
+    requested_ids = request.scan_ids if request.scan_ids is not None else [scan.id for scan in scans]
+    results = []
+    for scan_id in requested_ids:
+        prediction = predictions.get(scan_id)
+        if prediction is None:
+            results.append(PredictionBatchItem(scan_id=scan_id, status="not_found"))
+            continue
+        results.append(PredictionBatchItem(
+            scan_id=scan_id,
+            status=prediction.status,
+            tumor_type=prediction.tumor_type,
+            overlay_image_path=prediction.result_path
+        ))
+    return results
+
 
 @router.post("/{scan_id}", summary="Predict tumor in MRI scan")
 def predict_tumor(
     scan_id: int,
+    background: bool = Query(False, description="Enqueue as a job and return immediately"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -26,7 +146,14 @@ def predict_tumor(
     This endpoint:
     - Checks if the scan exists
     - Returns cached prediction if already available
-    - Otherwise runs the ML models and stores the result
+    - Waits for a prediction already scheduled at upload (`analyze=true`) and
+      returns its result
+    - Otherwise runs the ML models and stores the result; concurrent requests
+      for the same scan share one computation
+    - Takes over a job still 'processing' after `PREDICTION_STALE_SECONDS`,
+      whose process presumably died
+    - With `background=true`, creates a pending job and returns `202` right away;
+      poll `GET /predict/{scan_id}/status` for progress
     """
     # Check if scan exists
     scan = db.query(Scan).filter(Scan.id == scan_id).first()
@@ -35,16 +162,100 @@ def predict_tumor(
 
     # Return cached prediction if available
     prediction = get_prediction_by_scan(db, scan_id)
-    if prediction:
+    if prediction and prediction.status == "completed":
         return {
             "tumor_type": prediction.tumor_type,
             "overlay_image_path": prediction.result_path
         }
 
-    # Otherwise run ML model
-    prediction = process_prediction(scan, db)
+    # A job for this scan is already queued or running
+    if prediction and prediction.status in ("pending", "processing"):
+        # Scheduled at upload in this process: wait for it and share the result
+        future = get_prediction_executor().get_in_flight(scan_id)
+        if future and not background:
+            try:
+                future.result(timeout=settings.PREDICT_WAIT_TIMEOUT)
+            except FutureTimeoutError:
+                pass
+            db.refresh(prediction)
+            if prediction.status == "completed":
+                return {
+                    "tumor_type": prediction.tumor_type,
+                    "overlay_image_path": prediction.result_path
+                }
+
+        # Being computed by a concurrent request in this process: share its result
+        elif not background and prediction_flights.in_flight(scan_id):
+            prediction_flights.do(scan_id, lambda: None)
+            db.refresh(prediction)
+            if prediction.status == "completed":
+                return {
+                    "tumor_type": prediction.tumor_type,
+                    "overlay_image_path": prediction.result_path
+                }
+
+        # Still queued and nobody has started it, or the process that claimed it
+        # died (its claim went stale): run it now instead of waiting
+        elif not background and claim_prediction(db, prediction.id, stale_after=settings.PREDICTION_STALE_SECONDS):
+            db.refresh(prediction)
+            try:
+                prediction = process_prediction(scan, db, prediction=prediction)
+            except Exception:
+                db.rollback()
+                update_prediction_status(db, prediction, "failed")
+                raise
+            return {
+                "tumor_type": prediction.tumor_type,
+                "overlay_image_path": prediction.result_path
+            }
+
+        # Job mode: a job abandoned by a dead process is queued again
+        elif background and claim_prediction(db, prediction.id, statuses=(), stale_after=settings.PREDICTION_STALE_SECONDS):
+            prediction = update_prediction_status(db, prediction, "pending")
+            enqueue_prediction(prediction.id)
+
+        if prediction.status in ("pending", "processing"):
+            return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=format_job_status(prediction))
+
+    # Job mode: record a pending prediction and hand it to the worker pool
+    if background:
+        if prediction:
+            prediction = update_prediction_status(db, prediction, "pending")
+        else:
+            prediction = create_pending_prediction(db, scan_id)
+        enqueue_prediction(prediction.id)
+        db.refresh(prediction)
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=format_job_status(prediction))
+
+    # Otherwise run ML model (retrying a failed job in place). Concurrent requests
+    # for this scan wait for the same computation instead of starting their own.
+    prediction_flights.do(scan_id, lambda: compute_prediction(scan, db, prediction))
+
+    prediction = get_prediction_by_scan(db, scan_id)
+    db.refresh(prediction)
+    if prediction.status != "completed":
+        # Computed by another process; report its progress
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=format_job_status(prediction))
 
     return {
         "tumor_type": prediction.tumor_type,
         "overlay_image_path": prediction.result_path
     }
+
+
+@router.get("/{scan_id}/status", summary="Get the prediction job status of an MRI scan")
+def get_prediction_status(
+    scan_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Reports the progress of a scan's prediction job.
+
+    Status moves through 'pending' -> 'processing' -> 'completed' (or 'failed').
+    """
+    prediction = get_prediction_by_scan(db, scan_id)
+    if not prediction:
+        raise HTTPException(status_code=404, detail="No prediction found for this scan")
+
+    return format_job_status(prediction)
@@ -0,0 +1,62 @@
+"""
+Scan Statistics API.
+
+This module provides:
+- Statistics of the current user's scans (per day, per patient, predictions by status and tumor type).
+- Statistics of a patient's scans (predictions by status and tumor type).
+
+Statistics are served from rollup tables, never by scanning the history, and
+use the read replica when one is configured; see `get_user_read_db`.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Local Imports
+from app.db.models.patient import Patient
+from app.db.models.user import User
+from app.services.auth_service import get_current_user, get_user_read_db
+from app.services.stats_service import get_patient_stats, get_user_stats
+
+# Initialize router
+router = APIRouter()
+
+DEFAULT_DAYS = 30  # Days covered by scans_per_day unless requested otherwise
+MAX_DAYS = 366
+
+
+@router.get("/user", summary="Retrieve scan statistics of the current user")
+async def get_statistics_of_user(
+    days: int = Query(DEFAULT_DAYS, ge=1, le=MAX_DAYS, description="Days covered by scans_per_day, ending today"),
+    db: AsyncSession = Depends(get_user_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Retrieves scans per day, scans per patient, and prediction counts by
+    status and tumor type for the authenticated user's scans.
+    """
+    return {
+        "user_id": current_user.id,
+        **await get_user_stats(db, current_user.id, days)
+    }
+
+
+@router.get("/patient/{patient_id}", summary="Retrieve scan statistics of a patient")
+async def get_statistics_of_patient(
+    patient_id: int,
+    db: AsyncSession = Depends(get_user_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Retrieves the number of scans and prediction counts by status and tumor
+    type for a specific patient.
+    """
+    patient = await db.get(Patient, patient_id)
+    if not patient:
+        raise HTTPException(status_code=404, detail="Patient not found")
+
+    return {
+        "patient_id": patient.id,
+        "patient_name": patient.name,
+        **await get_patient_stats(db, patient_id)
+    }
@@ -3,37 +3,28 @@ MRI Scan Upload API.
 
 This module handles:
 - Uploading MRI scans.
-- Creating patient records if they do not exist.
+- Reusing the patient record of a returning patient, creating it otherwise.
 - Associating scans with authenticated users.
 """
 
-import os
 from datetime import date
 from typing import List, Optional
-from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, UploadFile, File, Form
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Local Imports
-from app.db.session import get_db
+from app.db.routing import recent_writes
+from app.db.session import get_async_db
 from app.db.models.user import User
-from app.db.models.patient import Patient
 from app.schemas.scan import ScanResponse
 from app.schemas.patient import PatientCreate
 from app.services.auth_service import get_current_user
-from app.db.crud.crud_patient import create_patient, get_patient
-from app.services.scan_service import save_scan
+from app.services.scan_service import save_scans
+from app.worker.executor import schedule_predictions_async
 
 # Initialize router
 router = APIRouter()
 
-# Define upload directory
-UPLOAD_DIR = "uploads"
-try:
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
-except OSError as e:
-    raise HTTPException(status_code=500, detail=f"Failed to create upload directory: {str(e)}")
-
-
 @router.post("/upload", response_model=List[ScanResponse], summary="Upload MRI scans")
 async def upload_mri_scans(
     patient_name: str = Form(...),
@@ -42,17 +33,24 @@ async def upload_mri_scans(
     scan_date: date = Form(...),
     doctor_notes: Optional[str] = Form(None),  # ✅ Added doctor notes as form input
     files: List[UploadFile] = File(...),  # Accept multiple files
-    db: Session = Depends(get_db),
+    analyze: bool = Form(False),  # Start inference for each scan right after upload
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Upload multiple MRI scan files and store metadata in the database.
 
     This endpoint:
-    - Stores patient details in `patients` table if they don't exist.
+    - Validates and stages every file before touching the database.
+    - Reuses the patient with the same name, age and sex, or stores a new one.
     - Saves each scan inside `uploads/{patient_id}/` directory.
+    - Stores the patient and all scans in one transaction; if any file fails,
+      none are kept and no patient is created.
     - Links scans to the authenticated user.
     - Stores doctor notes if provided.
+    - With `analyze=true`, schedules tumor prediction for every stored scan on a
+      bounded background executor; `/predict/{scan_id}` then returns the result
+      as soon as it is ready.
 
     Returns:
         List[ScanResponse]: List of stored scan metadata.
@@ -60,15 +58,17 @@ async def upload_mri_scans(
 
     user_id = current_user.id
 
-    patient = get_patient(db, patient_name)
-    if not patient:
-        patient_data = PatientCreate(name=patient_name, age=age, sex=sex)
-        patient = create_patient(db=db, patient_data=patient_data)
+    # Stage every file, then upsert the patient (repeat uploads reuse their
+    # record) and insert all scan rows in a single transaction
+    patient_data = PatientCreate(name=patient_name, age=age, sex=sex)
+    scans = await save_scans(files, patient_data, user_id, scan_date, db, doctor_notes=doctor_notes)
+    scan_responses = [ScanResponse.model_validate(scan) for scan in scans]
 
-    scan_responses = []
+    # Keep this user's history reads on the primary until the replica has the new scans
+    recent_writes.mark(user_id)
 
-    for file in files:
-        scan = await save_scan(file, patient, user_id, scan_date, db, doctor_notes=doctor_notes)
-        scan_responses.append(scan)
+    # Upload-and-analyze: queue inference now; /predict returns the result once ready
+    if analyze:
+        await schedule_predictions_async(db, [scan.id for scan in scan_responses])
 
     return scan_responses
@@ -7,7 +7,7 @@ This module:
 """
 
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, upload, history, predict  
+from app.api.v1.endpoints import auth, upload, history, predict, stats
 
 # Initialize the API router
 router = APIRouter()
@@ -23,3 +23,6 @@ router.include_router(history.router, prefix="/history", tags=["History"])
 
 # Tumor Prediction (Analyzed scans after U-Net process)
 router.include_router(predict.router, prefix="/predict", tags=["Tumor Prediction"])
+
+# Statistics (Dashboard counts served from rollup tables)
+router.include_router(stats.router, prefix="/stats", tags=["Statistics"])
@@ -4,11 +4,12 @@ Configuration module for the application.
 This module handles:
 - Environment variable loading.
 - Database connection settings.
-- Automatic fallback to SQLite if PostgreSQL is unavailable.
+- Automatic fallback to SQLite if PostgreSQL is unavailable, probed on first
+  use with a bounded connect timeout rather than at import.
 """
 
 import os
-import psycopg2
+from functools import cached_property
 from dotenv import load_dotenv
 from colorama import Fore, Style, init
 
@@ -25,28 +26,148 @@ class Settings:
 
     - Uses PostgreSQL if available.
     - Falls back to SQLite if PostgreSQL is not accessible.
+    - Nothing connects to a database until `DATABASE_URL` is first read.
     """
     
     # Load database URLs from environment variables
     DATABASE_URL_POSTGRES: str = os.getenv("DATABASE_URL_POSTGRES")
     DATABASE_URL_SQLITE: str = os.getenv("DATABASE_URL_SQLITE", "sqlite:///./database.sqlite3")
 
-    # Default to SQLite, but attempt to use PostgreSQL if available
-    DATABASE_URL = DATABASE_URL_SQLITE
-
-    if DATABASE_URL_POSTGRES:
-        try:
-            # Attempt to connect to PostgreSQL
-            conn = psycopg2.connect(DATABASE_URL_POSTGRES)
-            conn.close()
-            DATABASE_URL = DATABASE_URL_POSTGRES  # Use PostgreSQL if successful
-        except Exception:
-            print("\n" + "-" * 80)
-            print(f"{Fore.YELLOW}[Database Warning]:{Style.RESET_ALL} PostgreSQL is not accessible! Falling back to SQLite.")
-
-    # Log the database being used
-    print(f"{Fore.GREEN}[Database]:{Style.RESET_ALL} {DATABASE_URL}")
-    print("-" * 80 + "\n")
+    # Seconds to wait for PostgreSQL when probing it before falling back to SQLite
+    DB_CONNECT_TIMEOUT: int = int(os.getenv("DB_CONNECT_TIMEOUT", "3"))
+
+    # Seconds startup waits for schema migrations before serving without them
+    STARTUP_DB_TIMEOUT: float = float(os.getenv("STARTUP_DB_TIMEOUT", "30"))
+
+    @cached_property
+    def DATABASE_URL(self) -> str:
+        """
+        The database in use, resolved on first access.
+
+        PostgreSQL is used if it accepts a connection within `DB_CONNECT_TIMEOUT`
+        seconds; otherwise the application falls back to SQLite.
+
+        Returns:
+            str: The database URL.
+        """
+        database_url = self.DATABASE_URL_SQLITE
+
+        if self.DATABASE_URL_POSTGRES:
+            try:
+                import psycopg2
+
+                # Attempt to connect to PostgreSQL
+                conn = psycopg2.connect(self.DATABASE_URL_POSTGRES, connect_timeout=self.DB_CONNECT_TIMEOUT)
+                conn.close()
+                database_url = self.DATABASE_URL_POSTGRES  # Use PostgreSQL if successful
+            except Exception:
+                print("\n" + "-" * 80)
+                print(f"{Fore.YELLOW}[Database Warning]:{Style.RESET_ALL} PostgreSQL is not accessible! Falling back to SQLite.")
+
+        # Log the database being used
+        print(f"{Fore.GREEN}[Database]:{Style.RESET_ALL} {database_url}")
+        print("-" * 80 + "\n")
+        return database_url
+
+    # Connection pool of each server-database engine, per process. A process
+    # holds up to two engines (sync and async), plus two more with a replica,
+    # so size DB_POOL_SIZE + DB_MAX_OVERFLOW against max_connections / processes.
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+    # Optional read replica for history and listing queries. After a user
+    # writes, their reads stay on the primary for this many seconds.
+    DATABASE_URL_REPLICA: str = os.getenv("DATABASE_URL_REPLICA", "")
+    READ_YOUR_WRITES_SECONDS: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+
+    # SQLite connection profile, applied to every connection. WAL lets readers
+    # run alongside the writer; synchronous=NORMAL fsyncs at checkpoints only.
+    SQLITE_TUNED: bool = os.getenv("SQLITE_TUNED", "true").lower() == "true"
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE_MB: int = int(os.getenv("SQLITE_MMAP_SIZE_MB", "256"))
+    SQLITE_CACHE_SIZE_MB: int = int(os.getenv("SQLITE_CACHE_SIZE_MB", "64"))
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+    # SQLite group commit: small writes from concurrent requests are queued to
+    # one writer and committed together, at most this many per transaction.
+    SQLITE_GROUP_COMMIT: bool = os.getenv("SQLITE_GROUP_COMMIT", "false").lower() == "true"
+    SQLITE_GROUP_COMMIT_WINDOW_MS: float = float(os.getenv("SQLITE_GROUP_COMMIT_WINDOW_MS", "2"))
+    SQLITE_GROUP_COMMIT_MAX_BATCH: int = int(os.getenv("SQLITE_GROUP_COMMIT_MAX_BATCH", "64"))
+
+    # Load the ML models in the background at startup. Tests and tools that do
+    # not run inference can turn this off; models then load on first prediction.
+    ML_PRELOAD_MODELS: bool = os.getenv("ML_PRELOAD_MODELS", "true").lower() == "true"
+
+    # Inference micro-batching: concurrent requests arriving within the window
+    # are grouped into a single U-Net/CNN forward pass of at most this size.
+    INFERENCE_BATCH_MAX_SIZE: int = int(os.getenv("INFERENCE_BATCH_MAX_SIZE", "8"))
+    INFERENCE_BATCH_WINDOW_MS: float = float(os.getenv("INFERENCE_BATCH_WINDOW_MS", "10"))
+
+    # Compiled inference: call the models through a traced tf.function instead
+    # of Model.predict(). XLA jit compilation is opt-in.
+    INFERENCE_COMPILED: bool = os.getenv("INFERENCE_COMPILED", "true").lower() == "true"
+    INFERENCE_JIT_COMPILE: bool = os.getenv("INFERENCE_JIT_COMPILE", "false").lower() == "true"
+    INFERENCE_PARITY_CHECK: bool = os.getenv("INFERENCE_PARITY_CHECK", "false").lower() == "true"
+
+    # Batch prediction: decode/preprocess thread count and images per forward pass
+    PREPROCESS_WORKERS: int = int(os.getenv("PREPROCESS_WORKERS", str(min(8, os.cpu_count() or 1))))
+    BATCH_PREDICT_CHUNK_SIZE: int = int(os.getenv("BATCH_PREDICT_CHUNK_SIZE", "32"))
+
+    # Volumetric (NIfTI) scans are segmented in batches of this many axial slices
+    VOLUME_SLICE_BATCH_SIZE: int = int(os.getenv("VOLUME_SLICE_BATCH_SIZE", "16"))
+
+    # Content-addressed prediction cache, keyed by input pixels + model artifacts
+    PREDICTION_CACHE_ENABLED: bool = os.getenv("PREDICTION_CACHE_ENABLED", "true").lower() == "true"
+    PREDICTION_CACHE_MAX_ENTRIES: int = int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", "2000"))
+    # The size bound is enforced after this many inserts (per process), not on every store
+    PREDICTION_CACHE_EVICT_EVERY: int = int(os.getenv("PREDICTION_CACHE_EVICT_EVERY", "50"))
+
+    # On-demand overlay rendering: default style/format and LRU disk cache bound
+    OVERLAY_FORMAT: str = os.getenv("OVERLAY_FORMAT", "png").lower()  # 'png' or 'webp'
+    OVERLAY_COLOR: str = os.getenv("OVERLAY_COLOR", "#ff0000")
+    OVERLAY_ALPHA: float = float(os.getenv("OVERLAY_ALPHA", "1.0"))
+    OVERLAY_CACHE_DIR: str = os.getenv("OVERLAY_CACHE_DIR", "cache/overlays")
+    OVERLAY_CACHE_MAX_MB: int = int(os.getenv("OVERLAY_CACHE_MAX_MB", "256"))
+
+    # Streaming uploads: chunk size for the disk copy and size limits. Requests
+    # over the total limit are rejected while the body is still arriving.
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE_KB", "1024")) * 1024
+    UPLOAD_MAX_FILE_BYTES: int = int(os.getenv("UPLOAD_MAX_FILE_MB", "512")) * 1024 * 1024
+    UPLOAD_MAX_REQUEST_BYTES: int = int(os.getenv("UPLOAD_MAX_REQUEST_MB", "2048")) * 1024 * 1024
+
+    # Resized image variants (/images/...): allowed widths, encode quality and LRU disk cache bound
+    IMAGE_VARIANT_WIDTHS: tuple = tuple(int(w) for w in os.getenv("IMAGE_VARIANT_WIDTHS", "128,256,512,1024").split(","))
+    IMAGE_VARIANT_QUALITY: int = int(os.getenv("IMAGE_VARIANT_QUALITY", "80"))
+    IMAGE_VARIANT_CACHE_DIR: str = os.getenv("IMAGE_VARIANT_CACHE_DIR", "cache/variants")
+    IMAGE_VARIANT_CACHE_MAX_MB: int = int(os.getenv("IMAGE_VARIANT_CACHE_MAX_MB", "256"))
+
+    # Upload-time derivatives: longest side of scan thumbnails in pixels
+    THUMBNAIL_MAX_SIZE: int = int(os.getenv("THUMBNAIL_MAX_SIZE", "256"))
+
+    # History pagination: page size when none is requested, and the largest allowed
+    HISTORY_PAGE_SIZE: int = int(os.getenv("HISTORY_PAGE_SIZE", "50"))
+    HISTORY_MAX_PAGE_SIZE: int = int(os.getenv("HISTORY_MAX_PAGE_SIZE", "200"))
+
+    # Upload-and-analyze: in-process executor size, queue bound, and how long a
+    # /predict call waits for an in-flight result before answering 202
+    ANALYZE_WORKERS: int = int(os.getenv("ANALYZE_WORKERS", "2"))
+    ANALYZE_MAX_PENDING: int = int(os.getenv("ANALYZE_MAX_PENDING", "64"))
+    PREDICT_WAIT_TIMEOUT: float = float(os.getenv("PREDICT_WAIT_TIMEOUT", "120"))
+
+    # A job claimed this many seconds ago and still 'processing' is presumed
+    # abandoned by a dead worker and may be reclaimed. Must exceed the longest
+    # inference (volumes included), or a live job could be run twice.
+    PREDICTION_STALE_SECONDS: float = float(os.getenv("PREDICTION_STALE_SECONDS", "900"))
+
+    # Asynchronous prediction jobs (Celery). Eager mode runs tasks inline,
+    # which is useful for local development and tests without a broker.
+    CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+    CELERY_RESULT_BACKEND: str = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/1")
+    CELERY_TASK_ALWAYS_EAGER: bool = os.getenv("CELERY_TASK_ALWAYS_EAGER", "false").lower() == "true"
 
 
 # Global settings instance for application-wide use
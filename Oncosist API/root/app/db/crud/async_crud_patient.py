@@ -0,0 +1,60 @@
+"""
+Async CRUD operations for patient management.
+
+This module provides:
+- Creating a new patient record.
+- Retrieving a patient by ID.
+- Retrieving all patients from the database.
+
+Mirrors `crud_patient` for request handlers running on the event loop.
+"""
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models.patient import Patient
+from app.schemas.patient import PatientCreate
+
+
+async def create_patient(db: AsyncSession, patient_data: PatientCreate) -> Patient:
+    """
+    Creates a new patient record in the database.
+
+    Args:
+        db (AsyncSession): The async database session.
+        patient_data (PatientCreate): The patient details.
+
+    Returns:
+        Patient: The created patient instance.
+    """
+    db_patient = Patient(**patient_data.model_dump())
+    db.add(db_patient)
+    await db.commit()
+    await db.refresh(db_patient)
+    return db_patient
+
+
+async def get_patient(db: AsyncSession, patient_id: int) -> Patient | None:
+    """
+    Retrieves a patient by their ID.
+
+    Args:
+        db (AsyncSession): The async database session.
+        patient_id (int): The ID of the patient.
+
+    Returns:
+        Patient | None: The patient instance if found, otherwise None.
+    """
+    return await db.get(Patient, patient_id)
+
+
+async def get_all_patients(db: AsyncSession) -> list[Patient]:
+    """
+    Retrieves all patients stored in the database.
+
+    Args:
+        db (AsyncSession): The async database session.
+
+    Returns:
+        list[Patient]: A list of all patient records.
+    """
+    return list(await db.scalars(select(Patient)))
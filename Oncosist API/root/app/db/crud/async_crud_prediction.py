@@ -0,0 +1,39 @@
+"""
+Async CRUD operations for tumor predictions.
+
+This module provides:
+- Creating pending prediction jobs for newly uploaded scans.
+
+Only the operations request handlers need are mirrored here; inference
+workers run in threads and keep using `crud_prediction`.
+"""
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.crud.crud_prediction import insert_pending_predictions
+from app.db.group_commit import get_group_commit_writer
+from app.db.models.prediction import Prediction
+
+
+async def create_pending_predictions(db: AsyncSession, scan_ids: list[int]) -> list[int]:
+    """
+    Creates pending prediction jobs for many MRI scans with one INSERT and one commit.
+
+    Args:
+        db (AsyncSession): The async database session.
+        scan_ids (list[int]): The IDs of the MRI scans.
+
+    Returns:
+        list[int]: The IDs of the created predictions, in `scan_ids` order.
+    """
+    writer = get_group_commit_writer()
+    if writer is not None:
+        # Committed together with other requests' small writes
+        return await writer.run(insert_pending_predictions, scan_ids)
+
+    rows = [{"scan_id": scan_id, "status": "pending"} for scan_id in scan_ids]
+    result = await db.scalars(insert(Prediction).returning(Prediction.id, sort_by_parameter_order=True), rows)
+    prediction_ids = list(result)
+    await db.commit()
+    return prediction_ids
+
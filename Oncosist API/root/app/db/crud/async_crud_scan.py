@@ -0,0 +1,109 @@
+"""
+Async CRUD operations for MRI scan management.
+
+This module provides:
+- Creating a new MRI scan entry.
+- Creating a patient's scans and, if new, the patient in a single transaction.
+- Retrieving a scan by ID.
+- Retrieving scans linked to a specific patient.
+
+Mirrors `crud_scan` for request handlers running on the event loop.
+"""
+
+import asyncio
+from typing import Callable
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.crud.crud_patient import upsert_patient_statement
+from app.db.crud.crud_scan import insert_patient_scans
+from app.db.group_commit import get_group_commit_writer
+from app.db.models.patient import Patient
+from app.db.models.scan import Scan
+from app.schemas.patient import PatientCreate
+from app.schemas.scan import ScanCreate
+
+
+async def create_scan(db: AsyncSession, scan_data: ScanCreate) -> Scan:
+    """
+    Creates a new MRI scan entry in the database.
+
+    Args:
+        db (AsyncSession): The async database session.
+        scan_data (ScanCreate): The scan details.
+
+    Returns:
+        Scan: The created scan instance.
+    """
+    db_scan = Scan(**scan_data.model_dump())
+    db.add(db_scan)
+    await db.commit()
+    await db.refresh(db_scan)
+    return db_scan
+
+
+async def create_patient_scans(
+    db: AsyncSession, patient_data: PatientCreate, build_rows: Callable[[Patient], list[dict]]
+) -> list[Scan]:
+    """
+    Gets or creates a patient and inserts their scans in one transaction.
+
+    If any row fails, neither the scans nor a newly created patient are stored.
+
+    Args:
+        db (AsyncSession): The async database session.
+        patient_data (PatientCreate): The patient details.
+        build_rows (Callable[[Patient], list[dict]]): Builds the column values
+            of each scan once the patient's ID is known (run in a worker thread).
+
+    Returns:
+        list[Scan]: The created scans, in the order of the built rows.
+    """
+    writer = get_group_commit_writer()
+    if writer is not None:
+        # Committed together with other requests' small writes
+        ids = await writer.run(insert_patient_scans, patient_data, build_rows)
+    else:
+        try:
+            patient = await db.scalar(upsert_patient_statement(db.get_bind().dialect.name, patient_data))
+            rows = await asyncio.to_thread(build_rows, patient)
+            ids = list(await db.scalars(insert(Scan).returning(Scan.id, sort_by_parameter_order=True), rows))
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+    return await _load_scans(db, ids)
+
+
+async def _load_scans(db: AsyncSession, ids: list[int]) -> list[Scan]:
+    """Loads new scans with one SELECT (defaults such as uploaded_at included), in the order of `ids`."""
+    scans = {scan.id: scan for scan in await db.scalars(select(Scan).where(Scan.id.in_(ids)))}
+    return [scans[scan_id] for scan_id in ids]
+
+
+async def get_scan(db: AsyncSession, scan_id: int) -> Scan | None:
+    """
+    Retrieves a specific MRI scan by its ID.
+
+    Args:
+        db (AsyncSession): The async database session.
+        scan_id (int): The ID of the scan.
+
+    Returns:
+        Scan | None: The scan instance if found, otherwise None.
+    """
+    return await db.get(Scan, scan_id)
+
+
+async def get_scans_by_patient(db: AsyncSession, patient_id: int) -> list[Scan]:
+    """
+    Retrieves all MRI scans linked to a specific patient.
+
+    Args:
+        db (AsyncSession): The async database session.
+        patient_id (int): The ID of the patient.
+
+    Returns:
+        list[Scan]: A list of scans associated with the patient.
+    """
+    return list(await db.scalars(select(Scan).where(Scan.patient_id == patient_id)))
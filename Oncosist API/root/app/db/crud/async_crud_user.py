@@ -0,0 +1,104 @@
+"""
+Async CRUD operations for User management.
+
+This module provides:
+- Creating a new user with hashed passwords.
+- Retrieving users by ID, email, or username.
+- Filtering users by position with pagination.
+
+Mirrors `crud_user` for request handlers running on the event loop.
+"""
+
+from datetime import datetime
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models.user import User
+from app.schemas.user import UserCreate
+from app.core.security import get_password_hash
+
+
+async def create_user(db: AsyncSession, user: UserCreate) -> User:
+    """
+    Creates a new user in the database.
+
+    Args:
+        db (AsyncSession): The async database session.
+        user (UserCreate): The user details from the request.
+
+    Returns:
+        User: The created user instance.
+    """
+    # bcrypt is deliberately slow; keep it off the event loop
+    hashed_password = await run_in_threadpool(get_password_hash, user.password)
+    db_user = User(
+        username=user.username,
+        email=user.email,
+        full_name=user.full_name,
+        position=user.position,
+        hashed_password=hashed_password,
+        created_at=datetime.utcnow()
+    )
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
+
+
+async def get_user_by_id(db: AsyncSession, user_id: int) -> User | None:
+    """
+    Retrieves a user by their ID.
+
+    Args:
+        db (AsyncSession): The async database session.
+        user_id (int): The ID of the user.
+
+    Returns:
+        User | None: The user instance if found, otherwise None.
+    """
+    return await db.scalar(select(User).where(User.id == user_id).limit(1))
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
+    """
+    Retrieves a user by their email.
+
+    Args:
+        db (AsyncSession): The async database session.
+        email (str): The email of the user.
+
+    Returns:
+        User | None: The user instance if found, otherwise None.
+    """
+    return await db.scalar(select(User).where(User.email == email).limit(1))
+
+
+async def get_user_by_username(db: AsyncSession, username: str) -> User | None:
+    """
+    Retrieves a user by their username.
+
+    Args:
+        db (AsyncSession): The async database session.
+        username (str): The username of the user.
+
+    Returns:
+        User | None: The user instance if found, otherwise None.
+    """
+    return await db.scalar(select(User).where(User.username == username).limit(1))
+
+
+async def get_users_by_position(db: AsyncSession, position: str, limit: int = 10, skip: int = 0) -> list[User]:
+    """
+    Retrieves a list of users by their position (e.g., all doctors).
+
+    Args:
+        db (AsyncSession): The async database session.
+        position (str): The role of the users (e.g., "Doctor").
+        limit (int, optional): Maximum number of users to retrieve. Defaults to 10.
+        skip (int, optional): Number of records to skip (for pagination). Defaults to 0.
+
+    Returns:
+        list[User]: A list of user instances matching the position.
+    """
+    result = await db.scalars(select(User).where(User.position == position).offset(skip).limit(limit))
+    return list(result)
@@ -3,12 +3,15 @@ CRUD operations for patient management.
 
 This module provides:
 - Creating a new patient record.
+- The atomic get-or-create statement of a patient by identity key (used by uploads).
 - Retrieving a patient by ID.
 - Retrieving all patients from the database.
 """
 
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
-from app.db.models.patient import Patient
+from app.db.models.patient import Patient, patient_identity_key
 from app.schemas.patient import PatientCreate
 
 
@@ -23,13 +26,39 @@ def create_patient(db: Session, patient_data: PatientCreate) -> Patient:
     Returns:
         Patient: The created patient instance.
     """
-    db_patient = Patient(**patient_data.dict())  # Convert Pydantic model to SQLAlchemy object
+    db_patient = Patient(**patient_data.model_dump())  # Convert Pydantic model to SQLAlchemy object
     db.add(db_patient)
     db.commit()
     db.refresh(db_patient)
     return db_patient
 
 
+def upsert_patient_statement(dialect_name: str, patient_data: PatientCreate):
+    """
+    Builds a single-statement get-or-create of a patient.
+
+    The INSERT conflicts on the identity key when the patient exists; the
+    no-op update on conflict makes RETURNING yield the existing row, so
+    concurrent uploads of one patient all end up with the same record.
+
+    Args:
+        dialect_name (str): 'postgresql' or 'sqlite'.
+        patient_data (PatientCreate): The patient details.
+
+    Returns:
+        Insert: The statement, returning the `Patient`.
+    """
+    insert = postgresql_insert if dialect_name == "postgresql" else sqlite_insert
+    values = patient_data.model_dump()
+    statement = insert(Patient).values(
+        **values, identity_key=patient_identity_key(values["name"], values["age"], values["sex"])
+    )
+    return statement.on_conflict_do_update(
+        index_elements=[Patient.identity_key],
+        set_={"identity_key": statement.excluded.identity_key},
+    ).returning(Patient)
+
+
 def get_patient(db: Session, patient_id: int) -> Patient | None:
     """
     Retrieves a patient by their ID.
@@ -3,10 +3,20 @@ CRUD operations for managing tumor predictions.
 
 This module provides:
 - Creating a new tumor prediction entry.
+- Creating pending prediction jobs and tracking their status.
+- Inserting and completing jobs without committing (group-commit jobs).
+- Reserving a scan's single prediction record across concurrent requests.
+- Claiming jobs, including ones abandoned by a dead worker, and re-queueing
+  unfinished jobs on resume.
 - Retrieving a prediction linked to an MRI scan.
 - Deleting a prediction entry.
 """
 
+from datetime import datetime, timedelta
+from sqlalchemy import and_, insert, or_, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.db.models.prediction import Prediction
 from app.schemas.prediction import PredictionCreate
@@ -30,6 +40,260 @@ def create_prediction(db: Session, prediction_data: PredictionCreate) -> Predict
     return db_prediction
 
 
+def create_pending_prediction(db: Session, scan_id: int) -> Prediction:
+    """
+    Creates a pending prediction job entry for an MRI scan.
+
+    If the scan already got a prediction from a concurrent request, that
+    record is returned instead.
+
+    Args:
+        db (Session): The database session.
+        scan_id (int): The ID of the MRI scan.
+
+    Returns:
+        Prediction: The pending (or concurrently created) prediction instance.
+    """
+    try:
+        return create_prediction(db, PredictionCreate(scan_id=scan_id, status="pending"))
+    except IntegrityError:
+        db.rollback()
+        return get_prediction_by_scan(db, scan_id)
+
+
+def reserve_prediction(db: Session, scan_id: int) -> Prediction | None:
+    """
+    Creates a 'processing' prediction for a scan, claiming its computation.
+
+    The unique index on `predictions.scan_id` lets only one caller across all
+    processes win; the others get None and should wait for that result.
+
+    Args:
+        db (Session): The database session.
+        scan_id (int): The ID of the MRI scan.
+
+    Returns:
+        Prediction | None: The reserved prediction, or None if the scan
+        already has one.
+    """
+    prediction = Prediction(scan_id=scan_id, status="processing", claimed_at=datetime.utcnow())
+    db.add(prediction)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
+    db.refresh(prediction)
+    return prediction
+
+
+def create_pending_predictions(db: Session, scan_ids: list[int]) -> list[int]:
+    """
+    Creates pending prediction jobs for many MRI scans with one INSERT and one commit.
+
+    Args:
+        db (Session): The database session.
+        scan_ids (list[int]): The IDs of the MRI scans.
+
+    Returns:
+        list[int]: The IDs of the created predictions, in `scan_ids` order.
+    """
+    prediction_ids = insert_pending_predictions(db, scan_ids)
+    db.commit()
+    return prediction_ids
+
+
+def insert_pending_predictions(db: Session, scan_ids: list[int]) -> list[int]:
+    """
+    Inserts pending prediction jobs with one INSERT statement, without committing.
+
+    Also used as a group-commit job.
+
+    Args:
+        db (Session): The database session.
+        scan_ids (list[int]): The IDs of the MRI scans.
+
+    Returns:
+        list[int]: The IDs of the created predictions, in `scan_ids` order.
+    """
+    rows = [{"scan_id": scan_id, "status": "pending"} for scan_id in scan_ids]
+    return list(db.scalars(insert(Prediction).returning(Prediction.id, sort_by_parameter_order=True), rows))
+
+
+def complete_prediction(db: Session, prediction_id: int, values: dict):
+    """
+    Marks a prediction job as completed with its results, without committing.
+
+    Used as a group-commit job.
+
+    Args:
+        db (Session): The database session.
+        prediction_id (int): The ID of the prediction.
+        values (dict): Result columns (tumor_type, result_path, mask_path, overlay_slice).
+    """
+    db.execute(
+        update(Prediction)
+        .where(Prediction.id == prediction_id)
+        .values(**values, status="completed")
+    )
+
+
+def get_prediction(db: Session, prediction_id: int) -> Prediction | None:
+    """
+    Retrieves a prediction by its ID.
+
+    Args:
+        db (Session): The database session.
+        prediction_id (int): The ID of the prediction.
+
+    Returns:
+        Prediction | None: The prediction instance if found, otherwise None.
+    """
+    return db.query(Prediction).filter(Prediction.id == prediction_id).first()
+
+
+def _claim_is_stale(now: datetime, stale_after: float):
+    """Whether a job's claim is older than `stale_after` seconds (or was never recorded)."""
+    return or_(Prediction.claimed_at.is_(None), Prediction.claimed_at < now - timedelta(seconds=stale_after))
+
+
+def _claimable(statuses: tuple, now: datetime, stale_after: float | None = None):
+    """
+    Builds the condition under which a job may be claimed.
+
+    Args:
+        statuses (tuple): Statuses the job may be claimed from.
+        now (datetime): The claim time (naive UTC).
+        stale_after (float, optional): Also allow taking over a 'processing'
+            job claimed more than this many seconds ago.
+
+    Returns:
+        ColumnElement: The SQL condition.
+    """
+    condition = Prediction.status.in_(statuses)
+    if stale_after is not None:
+        condition = or_(condition, and_(Prediction.status == "processing", _claim_is_stale(now, stale_after)))
+    return condition
+
+
+def claim_prediction(
+    db: Session,
+    prediction_id: int,
+    statuses: tuple = ("pending",),
+    stale_after: float | None = None
+) -> bool:
+    """
+    Atomically moves a prediction from 'pending' (or another given status) to 'processing'.
+
+    Only one worker can win the transition, so a job that was enqueued twice
+    (e.g., resumed after a restart) is processed once. The claim time is
+    recorded so that a job abandoned by a dead worker can be taken over.
+
+    Args:
+        db (Session): The database session.
+        prediction_id (int): The ID of the prediction.
+        statuses (tuple, optional): Statuses the job may be claimed from.
+            Defaults to ('pending',).
+        stale_after (float, optional): Also take over the job if it is
+            'processing' but was claimed more than this many seconds ago.
+
+    Returns:
+        bool: True if this caller claimed the job, otherwise False.
+    """
+    now = datetime.utcnow()
+    claimed = (
+        db.query(Prediction)
+        .filter(Prediction.id == prediction_id, _claimable(statuses, now, stale_after))
+        .update({Prediction.status: "processing", Prediction.claimed_at: now}, synchronize_session=False)
+    )
+    db.commit()
+    return claimed == 1
+
+
+def claim_predictions_for_scans(db: Session, scan_ids: list[int], stale_after: float) -> set[int]:
+    """
+    Claims the prediction jobs of many scans for one caller, with one commit.
+
+    Scans without a prediction get a 'processing' row (the unique index on
+    `predictions.scan_id` skips ones created concurrently), and 'pending' or
+    'failed' jobs, or 'processing' ones with a stale claim, are moved to
+    'processing'. Jobs another worker or request owns are left alone.
+
+    Args:
+        db (Session): The database session.
+        scan_ids (list[int]): The IDs of the MRI scans.
+        stale_after (float): Seconds after which a 'processing' claim counts as abandoned.
+
+    Returns:
+        set[int]: The IDs of the scans whose job this caller now owns.
+    """
+    if not scan_ids:
+        return set()
+
+    now = datetime.utcnow()
+    insert_ = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    reserved = db.scalars(
+        insert_(Prediction)
+        .values([{"scan_id": scan_id, "status": "processing", "claimed_at": now} for scan_id in scan_ids])
+        .on_conflict_do_nothing(index_elements=[Prediction.scan_id])
+        .returning(Prediction.scan_id)
+    ).all()
+    claimed = db.scalars(
+        update(Prediction)
+        .where(Prediction.scan_id.in_(scan_ids), _claimable(("pending", "failed"), now, stale_after))
+        .values(status="processing", claimed_at=now)
+        .returning(Prediction.scan_id)
+    ).all()
+    db.commit()
+    return set(reserved) | set(claimed)
+
+
+def requeue_stalled_predictions(db: Session, stale_after: float) -> list[tuple[int, int]]:
+    """
+    Takes the unfinished jobs no live worker owns, for the caller to enqueue again.
+
+    'pending' jobs and 'processing' jobs whose claim is stale are set to
+    'pending' with a fresh claim time in one UPDATE. When several processes
+    resume at once, each job is therefore returned to exactly one of them;
+    the others see the fresh claim and skip it. Jobs claimed within
+    `stale_after` seconds are left to their worker.
+
+    Args:
+        db (Session): The database session.
+        stale_after (float): Seconds after which a claim counts as abandoned.
+
+    Returns:
+        list[tuple[int, int]]: (prediction_id, scan_id) of each job, oldest first.
+    """
+    now = datetime.utcnow()
+    jobs = db.execute(
+        update(Prediction)
+        .where(Prediction.status.in_(("pending", "processing")), _claim_is_stale(now, stale_after))
+        .values(status="pending", claimed_at=now)
+        .returning(Prediction.id, Prediction.scan_id)
+    ).all()
+    db.commit()
+    return sorted((prediction_id, scan_id) for prediction_id, scan_id in jobs)
+
+
+def update_prediction_status(db: Session, prediction: Prediction, status: str) -> Prediction:
+    """
+    Sets the status of a prediction.
+
+    Args:
+        db (Session): The database session.
+        prediction (Prediction): The prediction to update.
+        status (str): The new status ('pending', 'processing', 'completed', 'failed').
+
+    Returns:
+        Prediction: The updated prediction instance.
+    """
+    prediction.status = status
+    db.commit()
+    db.refresh(prediction)
+    return prediction
+
+
 def get_prediction_by_scan(db: Session, scan_id: int) -> Prediction | None:
     """
     Retrieves the tumor prediction associated with a specific MRI scan.
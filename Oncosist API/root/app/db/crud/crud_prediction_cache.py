@@ -0,0 +1,136 @@
+"""
+CRUD operations for the content-addressed prediction cache.
+
+This module provides:
+- Looking up a cached result by image and model hash.
+- Marking entries as recently used.
+- Storing new results.
+- LRU eviction and purging of entries from replaced models.
+
+None of these commit; writes become part of the caller's transaction.
+"""
+
+from datetime import datetime
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.db.models.prediction_cache import PredictionCacheEntry
+
+
+def get_cache_entry(db: Session, image_hash: str, model_version: str) -> PredictionCacheEntry | None:
+    """
+    Retrieves a cached result.
+
+    Args:
+        db (Session): The database session.
+        image_hash (str): Hash of the normalized input pixels.
+        model_version (str): Hash of the current model artifacts.
+
+    Returns:
+        PredictionCacheEntry | None: The cached entry if found, otherwise None.
+    """
+    return (
+        db.query(PredictionCacheEntry)
+        .filter(PredictionCacheEntry.image_hash == image_hash, PredictionCacheEntry.model_version == model_version)
+        .first()
+    )
+
+
+def touch_cache_entries(db: Session, image_hashes: list[str], model_version: str):
+    """
+    Marks entries as recently used with one UPDATE, without committing.
+
+    The new access times are stored with the caller's next commit.
+
+    Args:
+        db (Session): The database session.
+        image_hashes (list[str]): Hashes of the entries that were hit.
+        model_version (str): Hash of the current model artifacts.
+    """
+    db.execute(
+        update(PredictionCacheEntry)
+        .where(PredictionCacheEntry.image_hash.in_(image_hashes), PredictionCacheEntry.model_version == model_version)
+        .values(last_accessed_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def create_cache_entries(db: Session, entries: list[tuple[str, str, str, bytes]]) -> int:
+    """
+    Stores model results in the cache with one INSERT, without committing.
+
+    Images another request cached first are skipped.
+
+    Args:
+        db (Session): The database session.
+        entries (list[tuple[str, str, str, bytes]]): (image_hash, model_version,
+            tumor_type, mask) tuples.
+
+    Returns:
+        int: The number of entries inserted.
+    """
+    if not entries:
+        return 0
+
+    insert_ = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    now = datetime.utcnow()
+    inserted = db.scalars(
+        insert_(PredictionCacheEntry)
+        .values([
+            {
+                "image_hash": image_hash, "model_version": model_version, "tumor_type": tumor_type,
+                "mask": mask, "created_at": now, "last_accessed_at": now,
+            }
+            for image_hash, model_version, tumor_type, mask in entries
+        ])
+        .on_conflict_do_nothing(index_elements=[PredictionCacheEntry.image_hash, PredictionCacheEntry.model_version])
+        .returning(PredictionCacheEntry.id)
+    ).all()
+    return len(inserted)
+
+
+def evict_cache_entries(db: Session, max_entries: int) -> int:
+    """
+    Deletes the least recently used entries beyond the size bound, without committing.
+
+    Args:
+        db (Session): The database session.
+        max_entries (int): The maximum number of entries to keep.
+
+    Returns:
+        int: The number of entries evicted.
+    """
+    excess = db.query(PredictionCacheEntry).count() - max_entries
+    if excess <= 0:
+        return 0
+
+    stale_ids = (
+        db.query(PredictionCacheEntry.id)
+        .order_by(PredictionCacheEntry.last_accessed_at.asc())
+        .limit(excess)
+        .subquery()
+    )
+    return (
+        db.query(PredictionCacheEntry)
+        .filter(PredictionCacheEntry.id.in_(stale_ids.select()))
+        .delete(synchronize_session=False)
+    )
+
+
+def purge_stale_cache_entries(db: Session, model_version: str) -> int:
+    """
+    Deletes entries produced by model artifacts other than the current ones, without committing.
+
+    Args:
+        db (Session): The database session.
+        model_version (str): Hash of the current model artifacts.
+
+    Returns:
+        int: The number of entries deleted.
+    """
+    return (
+        db.query(PredictionCacheEntry)
+        .filter(PredictionCacheEntry.model_version != model_version)
+        .delete(synchronize_session=False)
+    )
@@ -3,12 +3,19 @@ CRUD operations for MRI scan management.
 
 This module provides:
 - Creating a new MRI scan entry.
+- Inserting scan rows with one statement, without committing.
+- Upserting a patient together with their scan rows, without committing.
 - Retrieving a scan by ID.
 - Retrieving scans linked to a specific patient.
 """
 
+from typing import Callable
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
+from app.db.crud.crud_patient import upsert_patient_statement
+from app.db.models.patient import Patient
 from app.db.models.scan import Scan
+from app.schemas.patient import PatientCreate
 from app.schemas.scan import ScanCreate
 
 
@@ -30,6 +37,42 @@ def create_scan(db: Session, scan_data: ScanCreate) -> Scan:
     return db_scan
 
 
+def insert_scan_rows(db: Session, rows: list[dict]) -> list[int]:
+    """
+    Inserts scan rows with one INSERT statement, without committing.
+
+    Args:
+        db (Session): The database session.
+        rows (list[dict]): Column values of each scan.
+
+    Returns:
+        list[int]: The IDs of the new scans, in the order of `rows`.
+    """
+    return list(db.scalars(insert(Scan).returning(Scan.id, sort_by_parameter_order=True), rows))
+
+
+def insert_patient_scans(
+    db: Session, patient_data: PatientCreate, build_rows: Callable[[Patient], list[dict]]
+) -> list[int]:
+    """
+    Gets or creates a patient and inserts their scan rows, without committing.
+
+    Also used as a group-commit job, so a new patient is only stored together
+    with their scans.
+
+    Args:
+        db (Session): The database session.
+        patient_data (PatientCreate): The patient details.
+        build_rows (Callable[[Patient], list[dict]]): Builds the column values
+            of each scan once the patient's ID is known.
+
+    Returns:
+        list[int]: The IDs of the new scans, in the order of the built rows.
+    """
+    patient = db.scalar(upsert_patient_statement(db.get_bind().dialect.name, patient_data))
+    return insert_scan_rows(db, build_rows(patient))
+
+
 def get_scan(db: Session, scan_id: int) -> Scan | None:
     """
     Retrieves a specific MRI scan by its ID.
@@ -0,0 +1,64 @@
+"""
+CRUD operations for the statistics rollups.
+
+This module provides:
+- Rebuilding every rollup table from the scans and predictions.
+
+Day-to-day the rollups are kept current by database triggers (see migration
+0004); a rebuild is only needed after the triggers were bypassed, e.g. when
+rows were edited with the triggers dropped or restored from a partial dump.
+"""
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.orm import Session
+from app.db.models.prediction import Prediction
+from app.db.models.scan import Scan
+from app.db.models.stats import PatientPredictions, UserDailyScans, UserPatientScans, UserPredictions
+
+
+def rebuild_stats(db: Session) -> dict:
+    """
+    Recomputes every rollup table from the base tables in one transaction.
+
+    On PostgreSQL, scans and predictions are locked against writes while the
+    counts are taken, so no concurrent trigger update is lost.
+
+    Args:
+        db (Session): The database session.
+
+    Returns:
+        dict: The number of rollup rows written per table.
+    """
+    status = func.coalesce(Prediction.status, "pending")
+    tumor_type = func.coalesce(Prediction.tumor_type, "")
+    day = func.date(Scan.uploaded_at)
+
+    sources = {
+        UserDailyScans: select(Scan.user_id, day, func.count())
+        .where(Scan.uploaded_at.is_not(None))
+        .group_by(Scan.user_id, day),
+        UserPatientScans: select(Scan.user_id, Scan.patient_id, func.count())
+        .group_by(Scan.user_id, Scan.patient_id),
+        UserPredictions: select(Scan.user_id, status, tumor_type, func.count())
+        .join(Scan, Scan.id == Prediction.scan_id)
+        .group_by(Scan.user_id, status, tumor_type),
+        PatientPredictions: select(Scan.patient_id, status, tumor_type, func.count())
+        .join(Scan, Scan.id == Prediction.scan_id)
+        .group_by(Scan.patient_id, status, tumor_type),
+    }
+
+    try:
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(text("LOCK TABLE scans, predictions IN SHARE MODE"))
+
+        counts = {}
+        for model, source in sources.items():
+            table = model.__table__
+            db.execute(delete(model))
+            db.execute(insert(model).from_select([column.name for column in table.columns], source))
+            counts[table.name] = db.scalar(select(func.count()).select_from(model))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return counts
@@ -3,14 +3,38 @@ Database model for storing patient details.
 
 This module defines:
 - Patient demographics.
+- The patient identity key, unique per patient, used to find an existing record on upload.
 - Relationships between patients and their MRI scans.
 """
 
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Index
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
 
+def patient_identity_key(name: str, age: int, sex: str) -> str:
+    """
+    Builds the identity key of a patient from their demographics.
+
+    Names are compared case-insensitively with whitespace collapsed, so
+    "Jane  Doe" and "jane doe" of the same age and sex are one patient.
+
+    Args:
+        name (str): Full name of the patient.
+        age (int): Age of the patient.
+        sex (str): Gender of the patient.
+
+    Returns:
+        str: The identity key.
+    """
+    return f"{' '.join(name.split()).casefold()}|{age}|{sex.strip().casefold()}"
+
+
+def _default_identity_key(context) -> str:
+    params = context.get_current_parameters()
+    return patient_identity_key(params["name"], params["age"], params["sex"])
+
+
 class Patient(Base):
     """
     Represents a patient in the system.
@@ -20,6 +44,7 @@ class Patient(Base):
         name (str): Full name of the patient.
         age (int): Age of the patient.
         sex (str): Gender of the patient ('Male', 'Female', 'Other').
+        identity_key (str): Normalized name, age and sex; see `patient_identity_key`.
     """
     __tablename__ = "patients"
 
@@ -27,6 +52,12 @@ class Patient(Base):
     name = Column(String, nullable=False)  # Patient's full name
     age = Column(Integer, nullable=False)  # Patient's age
     sex = Column(String, nullable=False)  # Patient's gender
+    identity_key = Column(String, nullable=False, default=_default_identity_key)  # Derived from name, age and sex
 
     # Relationship to the Scan model (one-to-many)
     scans = relationship("Scan", back_populates="patient", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # One row per patient; upload get-or-create upserts on this key
+        Index("uq_patients_identity_key", "identity_key", unique=True),
+    )
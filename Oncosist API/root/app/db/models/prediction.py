@@ -3,10 +3,11 @@ Database model for tumor detection predictions.
 
 This module defines:
 - Prediction metadata linked to MRI scans.
-- Status tracking for model predictions.
+- Status tracking for model predictions, with the time a worker claimed the job.
+- At most one prediction per scan, enforced by a unique index.
 """
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base import Base
@@ -19,18 +20,30 @@ class Prediction(Base):
     Attributes:
         id (int): Unique identifier for the prediction.
         scan_id (int): ID of the related MRI scan.
-        result_path (str): File path of the generated tumor mask.
-        status (str): Prediction status ('pending', 'completed', 'failed').
+        result_path (str): File path of the generated tumor mask (set once completed).
+        tumor_type (str): Predicted tumor class (set once completed).
+        mask_path (str): File path of the bit-packed segmentation mask(s), if stored.
+        overlay_slice (int): For volumetric scans, the slice shown in the overlay.
+        status (str): Prediction status ('pending', 'processing', 'completed', 'failed').
         created_at (datetime): Timestamp of when the prediction was created.
+        claimed_at (datetime): When a worker last took the job, by claiming it for
+            processing or by re-queueing it on resume.
     """
     __tablename__ = "predictions"
 
     id = Column(Integer, primary_key=True, index=True)
-    scan_id = Column(Integer, ForeignKey("scans.id"), nullable=False)  # Links prediction to a scan
-    result_path = Column(String, nullable=False)  # Path to the generated tumor mask
-    tumor_type = Column(String, nullable=False)
-    status = Column(String, default="pending")  # Possible values: 'pending', 'completed', 'failed'
+    scan_id = Column(Integer, ForeignKey("scans.id"), nullable=False)  # Links prediction to a scan (one per scan)
+    result_path = Column(String, nullable=True, index=True)  # Overlay URL path, looked up when served
+    tumor_type = Column(String, nullable=True)
+    mask_path = Column(String, nullable=True)  # Bit-packed mask (stack for volumetric scans)
+    overlay_slice = Column(Integer, nullable=True)  # Slice rendered in the overlay (volumes only)
+    status = Column(String, default="pending")  # Possible values: 'pending', 'processing', 'completed', 'failed'
     created_at = Column(DateTime, default=datetime.utcnow)  # Timestamp of prediction creation
+    claimed_at = Column(DateTime, nullable=True)  # Jobs claimed long ago by a dead worker may be reclaimed
 
     # Relationship to Scan model
     scan = relationship("Scan", back_populates="prediction")
+
+    __table_args__ = (
+        Index("uq_predictions_scan_id", "scan_id", unique=True),
+    )
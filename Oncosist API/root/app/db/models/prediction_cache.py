@@ -0,0 +1,39 @@
+"""
+Database model for the content-addressed prediction cache.
+
+This module defines:
+- Cached segmentation + classification results keyed by image and model hash.
+- Access timestamps used for LRU eviction.
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, Index
+from datetime import datetime
+from app.db.base import Base
+
+
+class PredictionCacheEntry(Base):
+    """
+    Represents a cached model result for one input image.
+
+    Attributes:
+        id (int): Unique identifier for the entry.
+        image_hash (str): SHA-256 of the normalized 512x512 input pixels.
+        model_version (str): SHA-256 of the model artifacts that produced the result.
+        tumor_type (str): The predicted tumor class.
+        mask (bytes): The bit-packed binary segmentation mask.
+        created_at (datetime): Timestamp of when the entry was stored.
+        last_accessed_at (datetime): Timestamp of the latest cache hit (LRU order).
+    """
+    __tablename__ = "prediction_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    image_hash = Column(String(64), nullable=False)
+    model_version = Column(String(64), nullable=False)
+    tumor_type = Column(String, nullable=False)
+    mask = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_accessed_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    __table_args__ = (
+        Index("ix_prediction_cache_key", "image_hash", "model_version", unique=True),
+    )
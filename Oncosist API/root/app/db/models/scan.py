@@ -6,9 +6,9 @@ This module defines:
 - Relationships to users, patients, and predictions.
 """
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Index
 from sqlalchemy.orm import relationship
-from datetime import datetime, timezone
+from datetime import datetime
 from app.db.base import Base
 
 
@@ -27,6 +27,9 @@ class Scan(Base):
         uploaded_at (datetime): Timestamp when the scan was uploaded.
         file_path (str): The location where the scan file is stored.
         doctor_notes (str): Optional notes added by the doctor.
+        content_hash (str): SHA-256 of the uploaded file, computed while it is written.
+        tensor_path (str): Preprocessed 512x512 uint8 `.npy` tensor (2D scans only).
+        thumbnail_path (str): Downscaled JPEG preview of the scan.
     """
     __tablename__ = "scans"
 
@@ -37,11 +40,20 @@ class Scan(Base):
     age = Column(Integer, nullable=False)
     sex = Column(String, nullable=False)
     scan_date = Column(DateTime, nullable=False)
-    uploaded_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    uploaded_at = Column(DateTime, default=datetime.utcnow)  # Naive UTC, like every other timestamp column
     file_path = Column(String, nullable=False)
     doctor_notes = Column(Text, nullable=True)
+    content_hash = Column(String(64), nullable=True, index=True)
+    tensor_path = Column(String, nullable=True)  # Model-ready image, memory-mapped at inference
+    thumbnail_path = Column(String, nullable=True)
 
     # Relationships
     user = relationship("User", back_populates="scans")
     patient = relationship("Patient", back_populates="scans")
     prediction = relationship("Prediction", back_populates="scan", uselist=False, cascade="all, delete-orphan")
+
+    # History pages filter by uploader or patient and seek on (uploaded_at, id), newest first
+    __table_args__ = (
+        Index("ix_scans_user_id_uploaded_at_id", user_id, uploaded_at.desc(), id.desc()),
+        Index("ix_scans_patient_id_uploaded_at_id", patient_id, uploaded_at.desc(), id.desc()),
+    )
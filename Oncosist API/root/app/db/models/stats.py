@@ -0,0 +1,88 @@
+"""
+Database models for the statistics rollups.
+
+This module defines:
+- Scans uploaded per user and day.
+- Scans per user and patient.
+- Predictions per user, and per patient, by status and tumor type.
+
+The rollups are maintained by database triggers on `scans` and `predictions`
+(see migration 0004), so every write path updates them in its own
+transaction. `rebuild_stats` recomputes them from the base tables.
+"""
+
+from sqlalchemy import Column, Integer, String, Date, Index
+from app.db.base import Base
+
+
+class UserDailyScans(Base):
+    """
+    Number of scans a user uploaded on one day.
+
+    Attributes:
+        user_id (int): ID of the uploader.
+        day (date): Upload date (UTC).
+        scans (int): Scans uploaded that day.
+    """
+    __tablename__ = "stats_user_daily_scans"
+
+    user_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    scans = Column(Integer, nullable=False, default=0)
+
+
+class UserPatientScans(Base):
+    """
+    Number of scans of one patient uploaded by a user.
+
+    Attributes:
+        user_id (int): ID of the uploader.
+        patient_id (int): ID of the patient.
+        scans (int): Scans of the patient uploaded by the user.
+    """
+    __tablename__ = "stats_user_patient_scans"
+
+    user_id = Column(Integer, primary_key=True)
+    patient_id = Column(Integer, primary_key=True)
+    scans = Column(Integer, nullable=False, default=0)
+
+    # Patient statistics sum over the patient's uploaders
+    __table_args__ = (
+        Index("ix_stats_user_patient_scans_patient_id", "patient_id"),
+    )
+
+
+class UserPredictions(Base):
+    """
+    Number of a user's predictions with one status and tumor type.
+
+    Attributes:
+        user_id (int): ID of the uploader of the scans.
+        status (str): Prediction status; NULL is counted as 'pending'.
+        tumor_type (str): Predicted tumor type, or '' while there is none.
+        predictions (int): Matching predictions.
+    """
+    __tablename__ = "stats_user_predictions"
+
+    user_id = Column(Integer, primary_key=True)
+    status = Column(String, primary_key=True)
+    tumor_type = Column(String, primary_key=True)
+    predictions = Column(Integer, nullable=False, default=0)
+
+
+class PatientPredictions(Base):
+    """
+    Number of a patient's predictions with one status and tumor type.
+
+    Attributes:
+        patient_id (int): ID of the patient.
+        status (str): Prediction status; NULL is counted as 'pending'.
+        tumor_type (str): Predicted tumor type, or '' while there is none.
+        predictions (int): Matching predictions.
+    """
+    __tablename__ = "stats_patient_predictions"
+
+    patient_id = Column(Integer, primary_key=True)
+    status = Column(String, primary_key=True)
+    tumor_type = Column(String, primary_key=True)
+    predictions = Column(Integer, nullable=False, default=0)
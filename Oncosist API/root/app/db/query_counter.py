@@ -0,0 +1,47 @@
+"""
+SQL statement counting.
+
+This module provides:
+- A context manager recording every statement one or more engines execute while it is active.
+
+Used to hold endpoints to a query budget, so a lazy load reintroduced inside
+a per-row loop shows up as a count that grows with the number of rows.
+"""
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryCounter:
+    """
+    Records the SQL statements executed on one or more engines.
+
+    Statements from every thread are recorded (sync endpoints run in a
+    worker thread), so nothing else should use the engine while counting.
+
+    Attributes:
+        statements (list[str]): The executed statements, in order.
+    """
+
+    def __init__(self, *engines):
+        # Async engines emit their events on the underlying sync engine
+        self.engines: list[Engine] = [getattr(engine, "sync_engine", engine) for engine in engines]
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        """Number of statements executed so far."""
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._record)
+        return False
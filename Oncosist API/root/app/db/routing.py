@@ -0,0 +1,106 @@
+"""
+Read-replica routing for database sessions.
+
+This module provides:
+- A session class that sends read-only queries to a replica and everything else to the primary.
+- Read-your-writes tracking, so a user's reads stay on the primary right after they write.
+
+A session only reads from the replica when it is opened with
+`info={"use_replica": True}`. Once it flushes or runs an INSERT, UPDATE or
+DELETE, every later statement in it goes to the primary, so it always sees its
+own changes.
+"""
+
+import threading
+import time
+from sqlalchemy import Delete, Insert, Select, Update
+from sqlalchemy.orm import Session
+
+# Local Imports
+from app.core.config import settings
+
+
+class RoutingSession(Session):
+    """
+    A session bound to the primary that can route plain SELECTs to a replica.
+
+    Engines are given as callables, so they are only created (and the database
+    resolved) when the session first runs a statement.
+
+    Args:
+        primary (Callable[[], Engine], optional): Returns the primary engine.
+            Without it, the session's regular `bind` is used.
+        replica (Callable[[], Engine | None], optional): Returns the replica
+            engine, or None to always use the primary.
+    """
+
+    def __init__(self, *args, primary=None, replica=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._primary = primary
+        self._replica = replica
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self.info["has_written"] = True
+
+        if (
+            self._replica is not None
+            and self.info.get("use_replica")
+            and not self.info.get("has_written")
+            and isinstance(clause, Select)
+        ):
+            replica = self._replica()
+            if replica is not None:
+                return replica
+        if self._primary is not None:
+            return self._primary()
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+class RecentWrites:
+    """
+    Remembers which users wrote in the last few seconds.
+
+    Replicas apply the primary's changes with a lag; a user who has just
+    uploaded or deleted a scan reads from the primary until the window passes.
+    Tracking is per process.
+
+    Attributes:
+        window_seconds (float): How long after a write reads stay on the primary.
+    """
+
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._until: dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, user_id: int):
+        """
+        Records a write by a user.
+
+        Args:
+            user_id (int): The user who wrote.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._until[user_id] = now + self.window_seconds
+            # Drop expired entries now and then so the map stays small
+            if len(self._until) > 1024:
+                self._until = {uid: until for uid, until in self._until.items() if until > now}
+
+    def is_recent(self, user_id: int) -> bool:
+        """
+        Checks whether a user wrote within the window.
+
+        Args:
+            user_id (int): The user to check.
+
+        Returns:
+            bool: True if the user's reads must go to the primary.
+        """
+        with self._lock:
+            return self._until.get(user_id, 0.0) > time.monotonic()
+
+
+# Process-wide read-your-writes tracker
+recent_writes = RecentWrites(settings.READ_YOUR_WRITES_SECONDS)
@@ -2,37 +2,218 @@
 Database session and engine configuration.
 
 This module handles:
-- Database connection setup.
-- Creating a session factory.
-- Ensuring tables are initialized.
-- Providing a dependency function for database sessions.
+- Database connection setup (a sync engine, and an async engine on the same database),
+  created on first use.
+- Connection pool sizing, pre-ping and recycling for server databases.
+- Routing read-only history and listing queries to an optional read replica.
+- The SQLite production profile (WAL, tuned pragmas) on every SQLite connection.
+- Creating session factories.
+- Bringing the schema up to date with Alembic migrations.
+- Providing dependency functions for sync and async database sessions.
+
+Request handlers use `AsyncSession` so I/O-bound traffic does not hold a
+threadpool thread while waiting on the database. The sync engine remains for
+migrations, scripts such as `reset_db.py`, and the inference workers.
 """
 
+import threading
+from pathlib import Path
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from fastapi import Depends, HTTPException, status
+from colorama import Fore, Style
 
 # Local Imports
 from app.core.config import settings
-from app.db.base import Base  # Import all models to ensure table creation
+from app.db.base import Base  # noqa: F401 - imports all models for the migration environment
+from app.db.routing import RoutingSession
+from app.db.sqlite_profile import configure_sqlite_engine
+
+# Async drivers for each supported backend
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def get_async_database_url(url: str) -> str:
+    """
+    Converts a database URL to its async driver equivalent.
+
+    Args:
+        url (str): A sync URL (e.g. 'postgresql://...' or 'sqlite:///./db.sqlite3').
+
+    Returns:
+        str: The URL with the async driver (e.g. 'postgresql+asyncpg://...').
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def get_engine_options(url: str) -> dict:
+    """
+    Returns the engine arguments for a database URL.
+
+    SQLite connections may be shared across threads; server databases get the
+    configured connection pool, with pre-ping and recycling so connections
+    dropped by the server or a proxy are replaced instead of failing a request.
+
+    Args:
+        url (str): The database URL.
+
+    Returns:
+        dict: Keyword arguments for `create_engine` / `create_async_engine`.
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def create_database_engines(url: str):
+    """
+    Creates the sync and async engines of one database.
+
+    Args:
+        url (str): The (sync) database URL.
+
+    Returns:
+        tuple[Engine, AsyncEngine]: The sync engine and the async engine.
+    """
+    options = get_engine_options(url)
+    sync_engine = create_engine(url, **options)
+    async_engine = create_async_engine(get_async_database_url(url), **options)
+    if make_url(url).get_backend_name() == "sqlite" and settings.SQLITE_TUNED:
+        configure_sqlite_engine(sync_engine)
+        configure_sqlite_engine(async_engine)
+    return sync_engine, async_engine
+
+
+def get_replica_url() -> str | None:
+    """
+    Returns the read replica URL, if one is configured for the active database.
+
+    A replica of another backend (e.g. a Postgres replica while the primary
+    has fallen back to SQLite) is ignored.
+
+    Returns:
+        str | None: The replica URL, or None.
+    """
+    if not settings.DATABASE_URL_REPLICA:
+        return None
+    if make_url(settings.DATABASE_URL_REPLICA).get_backend_name() != make_url(settings.DATABASE_URL).get_backend_name():
+        print(f"{Fore.YELLOW}[Database Warning]:{Style.RESET_ALL} Replica is not on the primary's backend; reading from the primary.")
+        return None
+    return settings.DATABASE_URL_REPLICA
+
+
+_engines: dict = {}
+_engines_lock = threading.Lock()
+
+
+def get_engines() -> dict:
+    """
+    Returns the database engines, creating them on first use.
+
+    Resolving the database (and probing PostgreSQL) is deferred to the first
+    query, so importing this module never touches the network.
+
+    Returns:
+        dict: 'engine' and 'async_engine' on the primary, and 'replica_engine'
+        and 'async_replica_engine' on the read replica (None without one).
+    """
+    if not _engines:
+        with _engines_lock:
+            if not _engines:
+                engines = {}
+                engines["engine"], engines["async_engine"] = create_database_engines(settings.DATABASE_URL)
+                replica_url = get_replica_url()
+                engines["replica_engine"], engines["async_replica_engine"] = (
+                    create_database_engines(replica_url) if replica_url else (None, None)
+                )
+                _engines.update(engines)
+    return _engines
 
-# Configure database engine
-if "sqlite" in settings.DATABASE_URL:
-    engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False})
-else:
-    engine = create_engine(settings.DATABASE_URL)
 
-# Create a session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def __getattr__(name: str):
+    # `from app.db.session import engine` creates the engines on demand
+    if name in ("engine", "async_engine", "replica_engine", "async_replica_engine"):
+        return get_engines()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def engine_resolver(name: str):
+    """
+    Returns a callable giving one of the engines, for binding sessions lazily.
+
+    Args:
+        name (str): A key of `get_engines()`.
+
+    Returns:
+        Callable[[], Engine | None]: Resolves to the sync engine; for async
+        engines, the sync facade that `AsyncSession` binds through.
+    """
+    def resolve():
+        engine = get_engines()[name]
+        return getattr(engine, "sync_engine", engine)
+    return resolve
+
+
+# Create session factories; sessions opened with info={"use_replica": True} read from the replica
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    class_=RoutingSession,
+    primary=engine_resolver("engine"),
+    replica=engine_resolver("replica_engine"),
+)
+
+# Objects stay readable after commit without another round trip
+AsyncSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    primary=engine_resolver("async_engine"),
+    replica=engine_resolver("async_replica_engine"),
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+def run_migrations(revision: str = "head"):
+    """
+    Upgrades the database schema to the given Alembic revision.
+
+    Args:
+        revision (str, optional): The target revision. Defaults to "head".
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    config.attributes["configure_logger"] = False
+    with get_engines()["engine"].begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, revision)
 
 
 def init_db():
     """
-    Initializes the database by creating all tables if they do not exist.
+    Initializes the database by applying any pending migrations.
 
     This function should be called at application startup.
     """
-    Base.metadata.create_all(bind=engine)
+    run_migrations()
 
 
 def get_db():
@@ -49,3 +230,30 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Provides an async database session dependency for FastAPI routes.
+
+    Yields:
+        AsyncSession: An async database session.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db():
+    """
+    Provides a database session dependency for read-only listing routes.
+
+    Queries run on the read replica when one is configured.
+
+    Yields:
+        Session: A database session reading from the replica.
+    """
+    db = SessionLocal(info={"use_replica": True})
+    try:
+        yield db
+    finally:
+        db.close()
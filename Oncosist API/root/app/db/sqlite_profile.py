@@ -0,0 +1,67 @@
+"""
+SQLite connection profile.
+
+This module provides:
+- The PRAGMA statements of the production profile, built from settings.
+- A hook applying them to every new connection of an engine (sync or async).
+
+Journal mode is stored in the database file; the other pragmas are
+per-connection and must be set each time the pool opens a connection.
+"""
+
+from sqlalchemy import event
+
+# Local Imports
+from app.core.config import settings
+
+JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+
+def sqlite_pragmas() -> list[str]:
+    """
+    Builds the PRAGMA statements of the configured profile.
+
+    Returns:
+        list[str]: The statements, in the order they are applied.
+
+    Raises:
+        ValueError: If the journal or synchronous mode is not a SQLite mode.
+    """
+    journal_mode = settings.SQLITE_JOURNAL_MODE.upper()
+    synchronous = settings.SQLITE_SYNCHRONOUS.upper()
+    if journal_mode not in JOURNAL_MODES:
+        raise ValueError(f"Unknown SQLite journal mode: {settings.SQLITE_JOURNAL_MODE}")
+    if synchronous not in SYNCHRONOUS_MODES:
+        raise ValueError(f"Unknown SQLite synchronous mode: {settings.SQLITE_SYNCHRONOUS}")
+
+    return [
+        f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        f"PRAGMA journal_mode = {journal_mode}",
+        f"PRAGMA synchronous = {synchronous}",
+        f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE_MB) * 1024 * 1024}",
+        # A negative cache size is in KiB rather than pages
+        f"PRAGMA cache_size = -{int(settings.SQLITE_CACHE_SIZE_MB) * 1024}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+
+
+def configure_sqlite_engine(engine, pragmas: list[str] | None = None):
+    """
+    Applies the SQLite profile to every connection the engine opens.
+
+    Args:
+        engine (Engine | AsyncEngine): A SQLite engine.
+        pragmas (list[str], optional): Statements to run instead of the configured profile.
+    """
+    statements = sqlite_pragmas() if pragmas is None else pragmas
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
@@ -1,69 +1,171 @@
-""" 
+"""
 Main entry point for the Oncosist API.
 
 This module initializes:
-- FastAPI application with middleware and error handling.
+- FastAPI application with middleware and error handling, built by `create_app()`.
 - Database setup.
 - API route registration.
-- Static file serving for prediction overlays.
+- Static file serving for uploaded scans and on-demand prediction overlays.
+- Cached, resized image variants for scan and overlay previews.
+- Resumption of interrupted prediction jobs.
+- Background ML model loading with liveness/readiness probes.
+
+Importing this module has no side effects beyond building the app: storage
+directories, schema migrations, job resumption and model loading all run in
+the lifespan hook, each bounded so a slow dependency cannot stall startup.
 """
 
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-import os
 
 # Local Imports
 from app.api.v1.router import router
+from app.core.config import settings
 from app.db.session import init_db
 from app.middleware.logging import CustomLoggingMiddleware
+from app.middleware.upload_limit import UploadSizeLimitMiddleware
 from app.middleware.error_handler import register_error_handlers
-from app.routers import debug_scans  
+from app.routers import debug_scans, predictions, images
+from app.worker.executor import resume_predictions_in_process
+from app.ml_models.models_loader import start_background_loading, is_ready, get_model_status
 
-# Initialize FastAPI application
-app = FastAPI(title="Oncosist API", version="1.0")
+logger = logging.getLogger(__name__)
 
-# Allow static image previews (e.g., overlay images)
+# Prediction overlays are rendered on demand by the predictions router
 PREDICTION_DIR = "predictions"
-os.makedirs(PREDICTION_DIR, exist_ok=True)
-app.mount("/predictions", StaticFiles(directory=PREDICTION_DIR), name="predictions")
 
 # Optional: if scans are stored in uploads/
 UPLOADS_DIR = "uploads"
-os.makedirs(UPLOADS_DIR, exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=UPLOADS_DIR), name="uploads")
-
-# Allow frontend access via CORS (adjust domains as needed)
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "http://localhost:5173",
-        "http://127.0.0.1:5173"
-    ],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Root endpoint for basic API health check
-@app.get("/", summary="API Root Endpoint")
-async def root():
-    return {"message": "Oncosist API is running! Visit /docs for Swagger UI."}
-
-# Register global error handlers
-register_error_handlers(app)
-
-# Add custom request/response logging middleware
-app.add_middleware(CustomLoggingMiddleware)
-
-# Initialize DB tables on first launch
-try:
-    init_db()
-except Exception as e:
-    print(f"Database initialization failed: {str(e)}")
-
-# Register all versioned API routes
-app.include_router(router)
-
-# Register debug router
-app.include_router(debug_scans.router)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Initializes the expensive subsystems when the server starts.
+
+    Each step's duration is recorded in `app.state.startup_timings`.
+
+    Args:
+        app (FastAPI): The application being started.
+    """
+    timings = {}
+    started = time.perf_counter()
+
+    os.makedirs(PREDICTION_DIR, exist_ok=True)
+    os.makedirs(UPLOADS_DIR, exist_ok=True)
+
+    # Bring the schema up to date. Runs off the event loop and is bounded, so an
+    # unreachable database delays startup by at most STARTUP_DB_TIMEOUT seconds.
+    step = time.perf_counter()
+    try:
+        await asyncio.wait_for(run_in_threadpool(init_db), timeout=settings.STARTUP_DB_TIMEOUT)
+    except asyncio.TimeoutError:
+        print(f"Database initialization timed out after {settings.STARTUP_DB_TIMEOUT}s; continuing in the background")
+    except Exception as e:
+        print(f"Database initialization failed: {str(e)}")
+    timings["database"] = time.perf_counter() - step
+
+    # Resume prediction jobs interrupted by a crash. Celery workers do this on start;
+    # in eager mode there is no worker, so the API process queues them on its
+    # executor. They run in the background; startup only waits for the claim.
+    if settings.CELERY_TASK_ALWAYS_EAGER:
+        step = time.perf_counter()
+        try:
+            await asyncio.wait_for(
+                run_in_threadpool(resume_predictions_in_process), timeout=settings.STARTUP_DB_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            print(f"Resuming prediction jobs timed out after {settings.STARTUP_DB_TIMEOUT}s")
+        except Exception as e:
+            print(f"Resuming prediction jobs failed: {str(e)}")
+        timings["resume_jobs"] = time.perf_counter() - step
+
+    # Load and warm up the ML models in the background so the server can bind
+    # its socket and serve non-ML routes (auth, history) immediately.
+    if settings.ML_PRELOAD_MODELS:
+        start_background_loading()
+
+    timings["total"] = time.perf_counter() - started
+    app.state.startup_timings = timings
+    logger.info("Startup completed in %.3fs (%s)", timings["total"],
+                ", ".join(f"{name} {seconds:.3f}s" for name, seconds in timings.items() if name != "total"))
+    yield
+
+
+def create_app() -> FastAPI:
+    """
+    Builds the FastAPI application.
+
+    Returns:
+        FastAPI: The configured application.
+    """
+    app = FastAPI(title="Oncosist API", version="1.0", lifespan=lifespan)
+    app.state.startup_timings = {}
+
+    # The directory is created at startup, so it is not checked here
+    app.mount("/uploads", StaticFiles(directory=UPLOADS_DIR, check_dir=False), name="uploads")
+
+    # Allow frontend access via CORS (adjust domains as needed)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[
+            "http://localhost:5173",
+            "http://127.0.0.1:5173"
+        ],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Root endpoint for basic API health check
+    @app.get("/", summary="API Root Endpoint")
+    async def root():
+        return {"message": "Oncosist API is running! Visit /docs for Swagger UI."}
+
+    # Liveness probe: the process is up and serving
+    @app.get("/healthz", summary="Liveness probe")
+    async def healthz():
+        return {"status": "ok"}
+
+    # Readiness probe: ML models are loaded and warmed up
+    @app.get("/readyz", summary="Readiness probe")
+    async def readyz():
+        model_status = get_model_status()
+        if not is_ready():
+            return JSONResponse(status_code=503, content={"status": "loading", "models": model_status})
+        return {"status": "ready", "models": model_status}
+
+    # Register global error handlers
+    register_error_handlers(app)
+
+    # Reject oversized uploads while the body is still streaming in
+    app.add_middleware(UploadSizeLimitMiddleware, max_bytes=settings.UPLOAD_MAX_REQUEST_BYTES)
+
+    # Add custom request/response logging middleware
+    app.add_middleware(CustomLoggingMiddleware)
+
+    # Register all versioned API routes
+    app.include_router(router)
+
+    # Register prediction overlay router (serves /predictions/...)
+    app.include_router(predictions.router)
+
+    # Register resized image variant router (serves /images/...)
+    app.include_router(images.router)
+
+    # Register debug router
+    app.include_router(debug_scans.router)
+
+    return app
+
+
+# Application instance for `uvicorn app.main:app`
+app = create_app()
@@ -2,7 +2,7 @@
 Logging middleware for FastAPI.
 
 This module captures:
-- Incoming request details (method, URL, JSON body if applicable).
+- Incoming request details (method, URL, JSON body if applicable; other bodies are not buffered).
 - Outgoing response details (status code, response body if applicable).
 - Processing time for each request.
 """
@@ -56,12 +56,16 @@ class CustomLoggingMiddleware(BaseHTTPMiddleware):
         method = request.method
         url = str(request.url)
 
-        # Attempt to read request body safely
-        request_body = await request.body()
-        try:
-            request_json = json.loads(request_body.decode("utf-8")) if request_body else None
-        except (json.JSONDecodeError, UnicodeDecodeError):
-            request_json = None
+        # Only JSON bodies are read for logging; file uploads keep streaming
+        # straight to the endpoint instead of being buffered in memory here.
+        request_json = None
+        is_json = request.headers.get("content-type", "").startswith("application/json")
+        if is_json:
+            request_body = await request.body()
+            try:
+                request_json = json.loads(request_body.decode("utf-8")) if request_body else None
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                request_json = None
 
         # Log request details
         request_log = (
@@ -75,7 +79,8 @@ class CustomLoggingMiddleware(BaseHTTPMiddleware):
         logger.info(request_log)
 
         # Restore request body in scope for FastAPI after reading
-        request.scope["body"] = request_body
+        if is_json:
+            request.scope["body"] = request_body
 
         # Start processing timer
         start_time = time.time()
@@ -0,0 +1,62 @@
+"""
+Request size limiting middleware.
+
+This module provides:
+- Early rejection of multipart uploads whose declared size exceeds the limit.
+- A byte counter on the incoming body stream that aborts an upload with
+  `413 Request Entity Too Large` as soon as it crosses the limit, even
+  when no Content-Length is sent.
+"""
+
+from fastapi import HTTPException, status
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Pure ASGI middleware bounding the size of multipart request bodies.
+
+    Attributes:
+        max_bytes (int): The largest accepted request body.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        # Declared too large: reject before reading a single body byte
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            response = JSONResponse(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                content={"error": "Upload exceeds the maximum request size.", "status": status.HTTP_413_REQUEST_ENTITY_TOO_LARGE}
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="Upload exceeds the maximum request size."
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
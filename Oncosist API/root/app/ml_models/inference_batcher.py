@@ -0,0 +1,159 @@
+# app/ml_models/inference_batcher.py
+
+"""
+Micro-batching scheduler for U-Net and CNN inference.
+
+This module provides:
+- A background worker that gathers concurrent inference requests.
+- A single batched U-Net and CNN forward pass per gathered group.
+- Per-caller futures carrying each image's mask and class probabilities.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+# Local Imports
+from app.core.config import settings
+from app.ml_models.models_loader import get_unet_model, get_cnn_model
+from app.ml_models.compiled_inference import get_compiled_unet, get_compiled_cnn
+from app.ml_models.preprocessing import InputBuffers
+
+
+def run_models(images: np.ndarray, buffers: InputBuffers | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Runs one batched U-Net and one batched CNN forward pass.
+
+    Args:
+        images (np.ndarray): Normalized uint8 images of shape (N, 512, 512).
+        buffers (InputBuffers, optional): Input buffers to reuse. Defaults to
+            buffers allocated for this call only, so request threads hold no
+            model inputs between calls.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Binary masks of shape (N, 512, 512) and
+        class probabilities of shape (N, num_classes).
+    """
+    buffers = buffers or InputBuffers()
+    batch = buffers.unet_input(images)
+    class_input = buffers.cnn_input(images)
+
+    if settings.INFERENCE_COMPILED:
+        pred_masks = get_compiled_unet()(batch)
+        class_probs = get_compiled_cnn()(class_input)
+    else:
+        pred_masks = get_unet_model().predict(batch, batch_size=len(batch), verbose=0)
+        class_probs = get_cnn_model().predict(class_input, batch_size=len(batch), verbose=0)
+
+    binary_masks = (pred_masks > 0.5).astype(np.uint8).reshape(-1, 512, 512)
+
+    return binary_masks, class_probs
+
+
+class InferenceBatcher:
+    """
+    Groups concurrent single-image requests into batched forward passes.
+
+    The first request to arrive opens a collection window; every request that
+    arrives before the window closes (or until the batch is full) is run
+    together and each caller receives its own slice of the output.
+
+    Attributes:
+        max_batch_size (int): Upper bound on images per forward pass.
+        window (float): Collection window in seconds.
+    """
+
+    def __init__(self, max_batch_size: int, window_ms: float):
+        self.max_batch_size = max(1, max_batch_size)
+        self.window = max(0.0, window_ms) / 1000.0
+        self._queue: queue.Queue = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, image: np.ndarray) -> Future:
+        """
+        Queues a normalized 512x512 image for the next batch.
+
+        Args:
+            image (np.ndarray): Normalized uint8 image of shape (512, 512).
+
+        Returns:
+            Future: Resolves to a (binary_mask, class_probs) tuple.
+        """
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((image, future))
+        return future
+
+    def predict(self, image: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Submits an image and blocks until its batch has been processed.
+
+        Args:
+            image (np.ndarray): Normalized uint8 image of shape (512, 512).
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The binary mask and class probabilities.
+        """
+        return self.submit(image).result()
+
+    def _ensure_worker(self):
+        """Starts the background worker thread on first use."""
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> list:
+        """Blocks for the first request, then gathers more until the window closes."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        """Worker loop: collect a batch, run the models, resolve futures."""
+        # Reused across batches; at most `max_batch_size` images large
+        buffers = InputBuffers()
+        while True:
+            batch = [(image, future) for image, future in self._collect() if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            try:
+                masks, probs = run_models(np.stack([image for image, _ in batch]), buffers)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for i, (_, future) in enumerate(batch):
+                future.set_result((masks[i], probs[i]))
+
+
+# Shared batcher instance for the process
+_batcher: InferenceBatcher | None = None
+_batcher_lock = threading.Lock()
+
+
+def get_inference_batcher() -> InferenceBatcher:
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = InferenceBatcher(
+                    max_batch_size=settings.INFERENCE_BATCH_MAX_SIZE,
+                    window_ms=settings.INFERENCE_BATCH_WINDOW_MS,
+                )
+    return _batcher
@@ -0,0 +1,95 @@
+# app/ml_models/mask_codec.py
+
+"""
+Compact encoding for binary segmentation masks.
+
+Masks are bit-packed (1 bit per pixel), so a 512x512 mask takes 32 KB
+instead of 256 KB as uint8. Writers create the destination directory on
+first use.
+"""
+
+import os
+import numpy as np
+
+MASK_SHAPE = (512, 512)
+
+
+def pack_mask(mask: np.ndarray) -> bytes:
+    """
+    Bit-packs a binary mask.
+
+    Args:
+        mask (np.ndarray): A 0/1 mask of shape (512, 512).
+
+    Returns:
+        bytes: The packed mask.
+    """
+    return np.packbits(mask.astype(bool, copy=False)).tobytes()
+
+
+def unpack_mask(data: bytes, shape: tuple = MASK_SHAPE) -> np.ndarray:
+    """
+    Restores a bit-packed mask.
+
+    Args:
+        data (bytes): The packed mask.
+        shape (tuple, optional): The mask shape. Defaults to (512, 512).
+
+    Returns:
+        np.ndarray: The uint8 0/1 mask.
+    """
+    count = int(np.prod(shape))
+    return np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=count).reshape(shape)
+
+
+def create_mask_stack(path: str, num_slices: int, shape: tuple = MASK_SHAPE) -> np.ndarray:
+    """
+    Creates a memory-mapped `.npy` file for a stack of bit-packed masks.
+
+    Each mask is packed along its last axis, so the stack has shape
+    (num_slices, H, W / 8) and slices can be written as they are produced.
+
+    Args:
+        path (str): Destination `.npy` path.
+        num_slices (int): Number of masks in the stack.
+        shape (tuple, optional): Shape of each mask. Defaults to (512, 512).
+
+    Returns:
+        np.ndarray: The writable memory-mapped stack.
+    """
+    packed_shape = (num_slices, shape[0], (shape[1] + 7) // 8)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    return np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8, shape=packed_shape)
+
+
+def pack_mask_stack(masks: np.ndarray) -> np.ndarray:
+    """Bit-packs masks of shape (N, H, W) along their last axis."""
+    return np.packbits(masks.astype(bool, copy=False), axis=-1)
+
+
+def load_mask_slice(path: str, index: int, width: int = MASK_SHAPE[1]) -> np.ndarray:
+    """
+    Reads one mask from a stack without loading the rest.
+
+    Args:
+        path (str): The `.npy` mask stack.
+        index (int): The slice index.
+        width (int, optional): Mask width. Defaults to 512.
+
+    Returns:
+        np.ndarray: The uint8 0/1 mask of shape (H, W).
+    """
+    stack = np.load(path, mmap_mode="r")
+    return np.unpackbits(stack[index], axis=-1, count=width)
+
+
+def save_mask(path: str, mask: np.ndarray):
+    """
+    Writes a single mask as a one-slice bit-packed stack.
+
+    Args:
+        path (str): Destination `.npy` path.
+        mask (np.ndarray): A 0/1 mask of shape (H, W).
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.save(path, pack_mask_stack(mask[np.newaxis]))
@@ -1,8 +1,22 @@
 # app/ml_models/models_loader.py
 
-import tensorflow as tf
+"""
+Lazy loader for the U-Net and CNN models.
+
+TensorFlow and the `.keras` artifacts are only loaded on first use or by the
+background loader started at application startup, so importing this module
+is cheap and non-ML routes can serve requests immediately.
+"""
+
+import hashlib
+import logging
+import threading
+import time
 from pathlib import Path
-from app.ml_models.loss_functions import iou_metric, dice_loss, combined_loss
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
 
 # Base directory of the model files
 BASE_DIR = Path(__file__).resolve().parent
@@ -11,27 +25,145 @@ BASE_DIR = Path(__file__).resolve().parent
 unet_path = BASE_DIR / "unet_model.keras"
 cnn_path = BASE_DIR / "cnn_model.keras"
 
-# Load U-Net model with custom objects
-unet_model = tf.keras.models.load_model(
-    unet_path,
-    custom_objects={
-        "iou_metric": iou_metric,
-        "dice_loss": dice_loss,
-        "combined_loss": combined_loss
-    }
-)
-
-# Load CNN classification model
-cnn_model = tf.keras.models.load_model(cnn_path)
-
 # Tumor type map
 tumor_map = {0: "Meningioma", 1: "Glioma", 2: "Pituitary Tumor"}
 
+# Loaded models and lifecycle state
+_models = {}
+_load_lock = threading.Lock()
+_loaded = threading.Event()  # Both models are deserialized
+_warmed = threading.Event()  # A warm-up forward pass has completed
+_load_error: str | None = None
+_model_version: str | None = None
+_version_lock = threading.Lock()
+
+
+def load_models():
+    """
+    Deserializes both models. Safe to call repeatedly and from several threads;
+    concurrent callers block until the first load finishes.
+    """
+    global _load_error
+    if _loaded.is_set():
+        return
+
+    with _load_lock:
+        if _loaded.is_set():
+            return
+
+        start = time.perf_counter()
+        try:
+            import tensorflow as tf
+            from app.ml_models.loss_functions import iou_metric, dice_loss, combined_loss
+
+            # Load U-Net model with custom objects
+            _models["unet"] = tf.keras.models.load_model(
+                unet_path,
+                custom_objects={
+                    "iou_metric": iou_metric,
+                    "dice_loss": dice_loss,
+                    "combined_loss": combined_loss
+                }
+            )
+
+            # Load CNN classification model
+            _models["cnn"] = tf.keras.models.load_model(cnn_path)
+        except Exception as e:
+            _load_error = str(e)
+            raise
+
+        _load_error = None
+        _loaded.set()
+        logger.info(f"ML models loaded in {time.perf_counter() - start:.2f}s")
+
+
+def get_model_version() -> str:
+    """
+    Returns a content hash of both model artifacts.
+
+    The hash changes whenever `unet_model.keras` or `cnn_model.keras` is
+    replaced, which invalidates results cached for the previous models.
+    It is computed once per process, without loading TensorFlow.
+    """
+    global _model_version
+    if _model_version is None:
+        with _version_lock:
+            if _model_version is None:
+                digest = hashlib.sha256()
+                for path in (unet_path, cnn_path):
+                    with open(path, "rb") as f:
+                        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                            digest.update(chunk)
+                _model_version = digest.hexdigest()
+    return _model_version
+
+
+def warm_up_models():
+    """
+    Runs one forward pass on a synthetic 512x512 input so the first real
+    request doesn't pay graph-tracing latency.
+    """
+    from app.core.config import settings
+    from app.ml_models.inference_batcher import run_models
+
+    start = time.perf_counter()
+    run_models(np.zeros((1, 512, 512), dtype=np.uint8))
+    _warmed.set()
+    logger.info(f"ML models warmed up in {time.perf_counter() - start:.2f}s")
+
+    # Optionally verify the compiled path against Model.predict()
+    if settings.INFERENCE_COMPILED and settings.INFERENCE_PARITY_CHECK:
+        from app.ml_models.compiled_inference import check_parity
+
+        sample = np.random.default_rng(0).integers(0, 256, (1, 512, 512), dtype=np.uint8)
+        logger.info(f"Compiled inference parity: {check_parity(sample)}")
+
+
+def _load_and_warm_up():
+    """Background loader entry point."""
+    global _load_error
+    try:
+        load_models()
+        get_model_version()
+        warm_up_models()
+    except Exception as e:
+        _load_error = str(e)
+        logger.error(f"ML model loading failed: {_load_error}")
+
+
+def start_background_loading() -> threading.Thread:
+    """
+    Loads and warms up the models on a daemon thread.
+
+    Returns:
+        threading.Thread: The loader thread.
+    """
+    thread = threading.Thread(target=_load_and_warm_up, name="model-loader", daemon=True)
+    thread.start()
+    return thread
+
+
+def is_ready() -> bool:
+    """Whether the models are loaded and warmed up."""
+    return _loaded.is_set() and _warmed.is_set()
+
+
+def get_model_status() -> dict:
+    """Reports the loading state of the models for readiness checks."""
+    return {
+        "loaded": _loaded.is_set(),
+        "warmed_up": _warmed.is_set(),
+        "error": _load_error
+    }
+
+
 def get_unet_model():
-    return unet_model
+    load_models()
+    return _models["unet"]
 
 def get_cnn_model():
-    return cnn_model
+    load_models()
+    return _models["cnn"]
 
 def get_tumor_map():
     return tumor_map
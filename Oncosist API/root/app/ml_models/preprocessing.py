@@ -0,0 +1,229 @@
+# app/ml_models/preprocessing.py
+
+"""
+Fused preprocessing pipeline for the U-Net and CNN models.
+
+This module provides:
+- Decoding scans straight to grayscale and resizing once to 512x512.
+- Min-max normalization to uint8 through a 256-entry lookup table (no float64 upcast).
+- Model input tensors built in float32, into buffers the inference batcher reuses.
+- Upload-time preprocessed scans stored as memory-mappable `.npy` tensors,
+  plus downscaled thumbnails.
+
+Outputs match `ImagePreprocessor.normalize` / `cnn_image_preprocessor`
+exactly (up to the float32 cast both models apply to their inputs).
+"""
+
+import os
+
+import cv2
+import numpy as np
+
+IMAGE_SIZE = 512
+
+
+def decode_grayscale(image_path: str) -> np.ndarray:
+    """
+    Decodes an image file to a single grayscale channel.
+
+    Grayscale files are decoded as-is with no channel expansion; colour files
+    are converted with the same BGR->GRAY weights as the original pipeline
+    (the codecs' built-in grayscale decoding differs slightly for PNG).
+
+    Args:
+        image_path (str): Path to the image on disk.
+
+    Returns:
+        np.ndarray: The decoded uint8 image of shape (H, W).
+
+    Raises:
+        ValueError: If the file cannot be decoded.
+    """
+    image = cv2.imread(image_path, cv2.IMREAD_ANYCOLOR)
+    if image is None:
+        raise ValueError("Could not load image from disk.")
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return image
+
+
+def normalize(image: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Min-max normalizes an image to the full uint8 range.
+
+    uint8 inputs are mapped through a lookup table computed with exact integer
+    arithmetic, so the result is identical to `ImagePreprocessor.normalize`.
+    Other dtypes are normalized in float32, in place in a scratch buffer.
+
+    Args:
+        image (np.ndarray): The input image.
+        out (np.ndarray, optional): uint8 destination with the same shape.
+
+    Returns:
+        np.ndarray: The normalized uint8 image.
+    """
+    if out is None:
+        out = np.empty(image.shape, dtype=np.uint8)
+
+    min_val, max_val = image.min(), image.max()
+    if max_val == min_val:
+        out.fill(0)
+        return out
+
+    if image.dtype == np.uint8:
+        lo, hi = int(min_val), int(max_val)
+        levels = np.arange(256, dtype=np.int32)
+        lut = (255 * np.clip(levels - lo, 0, None) // (hi - lo)).clip(0, 255).astype(np.uint8)
+        return cv2.LUT(image, lut, dst=out)
+
+    scratch = image.astype(np.float32)
+    np.subtract(scratch, np.float32(min_val), out=scratch)
+    np.multiply(scratch, np.float32(255), out=scratch)
+    np.divide(scratch, np.float32(max_val - min_val), out=scratch)
+    np.copyto(out, scratch, casting="unsafe")
+    return out
+
+
+def prepare_image(image_path: str) -> np.ndarray:
+    """
+    Decodes, resizes and normalizes a scan for both models.
+
+    Args:
+        image_path (str): Path to the image on disk.
+
+    Returns:
+        np.ndarray: The normalized uint8 image of shape (512, 512).
+    """
+    return prepare_decoded(decode_grayscale(image_path))
+
+
+def prepare_decoded(image: np.ndarray) -> np.ndarray:
+    """
+    Resizes and normalizes an already decoded grayscale image.
+
+    Args:
+        image (np.ndarray): The decoded uint8 image of shape (H, W).
+
+    Returns:
+        np.ndarray: The normalized uint8 image of shape (512, 512).
+    """
+    resized = cv2.resize(image, (IMAGE_SIZE, IMAGE_SIZE))
+    return normalize(resized, out=resized)
+
+
+def save_tensor(path: str, image: np.ndarray):
+    """
+    Stores a normalized 512x512 image as an `.npy` file.
+
+    Args:
+        path (str): Destination `.npy` path.
+        image (np.ndarray): The normalized uint8 image.
+    """
+    np.save(path, np.ascontiguousarray(image, dtype=np.uint8))
+
+
+def load_tensor(path: str) -> np.ndarray:
+    """
+    Memory-maps a stored tensor without copying or decoding it.
+
+    Args:
+        path (str): The `.npy` path written by `save_tensor`.
+
+    Returns:
+        np.ndarray: A read-only uint8 view of shape (512, 512).
+
+    Raises:
+        ValueError: If the file does not hold a 512x512 uint8 image.
+    """
+    tensor = np.load(path, mmap_mode="r")
+    if tensor.shape != (IMAGE_SIZE, IMAGE_SIZE) or tensor.dtype != np.uint8:
+        raise ValueError(f"Unexpected tensor {tensor.shape} {tensor.dtype} in {path}")
+    return tensor
+
+
+def prepare_scan_image(image_path: str, tensor_path: str | None = None) -> np.ndarray:
+    """
+    Returns a scan's model-ready image, mapping its stored tensor when available.
+
+    Args:
+        image_path (str): Path to the original image, decoded as a fallback.
+        tensor_path (str, optional): The scan's preprocessed `.npy` tensor.
+
+    Returns:
+        np.ndarray: The normalized uint8 image of shape (512, 512).
+    """
+    if tensor_path and os.path.exists(tensor_path):
+        try:
+            return load_tensor(tensor_path)
+        except ValueError:
+            pass
+    return prepare_image(image_path)
+
+
+def make_thumbnail(image: np.ndarray, max_size: int) -> np.ndarray:
+    """
+    Downscales an image so its longest side is at most `max_size`.
+
+    Args:
+        image (np.ndarray): The source image.
+        max_size (int): The longest side of the thumbnail in pixels.
+
+    Returns:
+        np.ndarray: The thumbnail (the image itself if already small enough).
+    """
+    height, width = image.shape[:2]
+    scale = max_size / max(height, width)
+    if scale >= 1:
+        return image
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+class InputBuffers:
+    """
+    Float32 input buffers for batched model calls.
+
+    Buffers grow to the largest batch seen and are then sliced, so an owner
+    that keeps them performs no allocations for model inputs. Only the
+    inference batcher keeps one, bounded by its maximum batch size; other
+    callers use a fresh instance that is freed with the call.
+    """
+
+    def __init__(self):
+        self._unet = np.empty((0, IMAGE_SIZE, IMAGE_SIZE, 1), dtype=np.float32)
+        self._cnn = np.empty((0, IMAGE_SIZE, IMAGE_SIZE, 3), dtype=np.float32)
+
+    def _reserve(self, n: int):
+        if n > len(self._unet):
+            self._unet = np.empty((n, IMAGE_SIZE, IMAGE_SIZE, 1), dtype=np.float32)
+            self._cnn = np.empty((n, IMAGE_SIZE, IMAGE_SIZE, 3), dtype=np.float32)
+
+    def unet_input(self, images: np.ndarray) -> np.ndarray:
+        """
+        Builds the U-Net input: raw 0-255 intensities as float32.
+
+        Args:
+            images (np.ndarray): Normalized uint8 images of shape (N, 512, 512).
+
+        Returns:
+            np.ndarray: A float32 view of shape (N, 512, 512, 1).
+        """
+        self._reserve(len(images))
+        out = self._unet[:len(images)]
+        np.copyto(out[..., 0], images, casting="unsafe")
+        return out
+
+    def cnn_input(self, images: np.ndarray) -> np.ndarray:
+        """
+        Builds the CNN input: intensities scaled to [0, 1], replicated to 3 channels.
+
+        Args:
+            images (np.ndarray): Normalized uint8 images of shape (N, 512, 512).
+
+        Returns:
+            np.ndarray: A float32 view of shape (N, 512, 512, 3).
+        """
+        self._reserve(len(images))
+        out = self._cnn[:len(images)]
+        np.divide(images[..., np.newaxis], np.float32(255), out=out, dtype=np.float32)
+        return out
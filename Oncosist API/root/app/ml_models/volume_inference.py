@@ -0,0 +1,159 @@
+# app/ml_models/volume_inference.py
+
+"""
+Volumetric (NIfTI) scan inference.
+
+This module provides:
+- Opening `.nii` volumes memory-mapped and `.nii.gz` volumes as a gzip stream.
+- Feeding axial slices to the U-Net/CNN in fixed-size batches.
+- A per-slice bit-packed mask stack and a volume-level tumor classification.
+- Reading single slices back for on-demand overlay rendering.
+
+Only one batch of slices is ever materialized, so memory stays bounded
+regardless of the number of slices in the study.
+"""
+
+import cv2
+import numpy as np
+
+# Local Imports
+from app.ml_models.preprocessing import IMAGE_SIZE, normalize
+from app.ml_models.inference_batcher import run_models
+from app.ml_models.mask_codec import create_mask_stack, pack_mask_stack
+
+VOLUME_EXTENSIONS = (".nii", ".nii.gz")
+
+
+def is_volume(path: str) -> bool:
+    """Whether the file is a NIfTI volume."""
+    return path.lower().endswith(VOLUME_EXTENSIONS)
+
+
+def open_volume(path: str):
+    """
+    Opens a NIfTI volume without reading its voxel data.
+
+    Uncompressed files are memory-mapped; gzip files keep one decompression
+    stream open so consecutive slice batches are read with forward seeks only.
+
+    Args:
+        path (str): Path to the `.nii` / `.nii.gz` file.
+
+    Returns:
+        nibabel.Nifti1Image: The image with a lazy data proxy.
+
+    Raises:
+        ValueError: If the file is not a 3D (or 4D) volume.
+    """
+    import nibabel as nib
+
+    image = nib.load(path, mmap=True, keep_file_open=path.lower().endswith(".gz"))
+    if len(image.shape) not in (3, 4):
+        raise ValueError("NIfTI scan must be a 3D or 4D volume.")
+    return image
+
+
+def iter_slice_batches(image, batch_size: int):
+    """
+    Yields normalized axial slices in batches.
+
+    Args:
+        image (nibabel.Nifti1Image): An opened volume.
+        batch_size (int): Number of slices per batch.
+
+    Yields:
+        tuple[int, np.ndarray]: The index of the first slice and the normalized
+        uint8 slices of shape (n, 512, 512).
+    """
+    num_slices = image.shape[2]
+    out = np.empty((batch_size, IMAGE_SIZE, IMAGE_SIZE), dtype=np.uint8)
+
+    for start in range(0, num_slices, batch_size):
+        stop = min(start + batch_size, num_slices)
+
+        # Only this slab is read (and decompressed) from disk
+        if len(image.shape) == 4:
+            slab = image.dataobj[:, :, start:stop, 0]
+        else:
+            slab = image.dataobj[:, :, start:stop]
+        slab = np.asarray(slab, dtype=np.float32)
+
+        for i in range(stop - start):
+            _prepare_axial(slab[:, :, i], out=out[i])
+
+        yield start, out[:stop - start]
+
+
+def _prepare_axial(voxels: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """Orients, resizes and normalizes one axial slice."""
+    # Voxel (x, y) -> image rows/cols in display orientation
+    axial = np.ascontiguousarray(np.flipud(voxels.T))
+    return normalize(cv2.resize(axial, (IMAGE_SIZE, IMAGE_SIZE)), out=out)
+
+
+def read_axial_slice(path: str, index: int | None = None) -> np.ndarray:
+    """
+    Reads and normalizes a single axial slice of a volume.
+
+    Args:
+        path (str): Path to the `.nii` / `.nii.gz` file.
+        index (int, optional): The slice index. Defaults to the middle slice.
+
+    Returns:
+        np.ndarray: The normalized uint8 slice of shape (512, 512).
+    """
+    image = open_volume(path)
+    if index is None:
+        index = image.shape[2] // 2
+    if len(image.shape) == 4:
+        voxels = image.dataobj[:, :, index, 0]
+    else:
+        voxels = image.dataobj[:, :, index]
+    return _prepare_axial(np.asarray(voxels, dtype=np.float32))
+
+
+def analyze_volume(path: str, mask_path: str, tumor_map: dict, batch_size: int = 16):
+    """
+    Segments every axial slice of a volume and classifies the volume.
+
+    The volume-level class averages per-slice CNN probabilities, weighted by
+    each slice's segmented tumor area (all slices count equally when the
+    U-Net finds no tumor anywhere).
+
+    Args:
+        path (str): Path to the `.nii` / `.nii.gz` file.
+        mask_path (str): Destination `.npy` file for the bit-packed mask stack.
+        tumor_map (dict): Class index to tumor type mapping.
+        batch_size (int, optional): Slices per forward pass. Defaults to 16.
+
+    Returns:
+        tuple[str, int]: The volume-level tumor type and the index of the
+        slice with the largest tumor area.
+    """
+    image = open_volume(path)
+    num_slices = image.shape[2]
+    mask_stack = create_mask_stack(mask_path, num_slices)
+
+    weighted_probs = np.zeros(len(tumor_map), dtype=np.float64)
+    mean_probs = np.zeros(len(tumor_map), dtype=np.float64)
+    best_index, best_area = 0, -1
+
+    for start, slices in iter_slice_batches(image, batch_size):
+        masks, probs = run_models(slices)
+        mask_stack[start:start + len(slices)] = pack_mask_stack(masks)
+
+        areas = masks.reshape(len(masks), -1).sum(axis=1)
+        weighted_probs += (probs * areas[:, np.newaxis]).sum(axis=0)
+        mean_probs += probs.sum(axis=0)
+
+        i = int(np.argmax(areas))
+        if areas[i] > best_area:
+            best_index, best_area = start + i, int(areas[i])
+
+    mask_stack.flush()
+    del mask_stack
+
+    scores = weighted_probs if weighted_probs.any() else mean_probs
+    tumor_type = tumor_map[int(np.argmax(scores))]
+
+    return tumor_type, best_index
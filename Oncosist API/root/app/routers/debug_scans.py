@@ -1,21 +1,19 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from sqlalchemy.orm import Session, joinedload
+from app.db.session import get_read_db
 from app.db.models.scan import Scan
-from app.db.models.patient import Patient
-from app.db.models.user import User
 
 router = APIRouter(prefix="/debug", tags=["Debug"])
 
 
 @router.get("/scans")
-def debug_all_scans(db: Session = Depends(get_db)):
-    scans = db.query(Scan).all()
+def debug_all_scans(db: Session = Depends(get_read_db)):
+    scans = db.query(Scan).options(joinedload(Scan.patient), joinedload(Scan.user)).all()
     results = []
 
     for scan in scans:
-        patient = db.query(Patient).filter(Patient.id == scan.patient_id).first()
-        user = db.query(User).filter(User.id == scan.user_id).first()
+        patient = scan.patient
+        user = scan.user
 
         results.append({
             "scan_id": scan.id,
@@ -0,0 +1,75 @@
+"""
+Image Variant API.
+
+This module provides:
+- Resized WebP/JPEG variants of uploaded scans and prediction overlays.
+- Strong ETags with conditional (304) responses.
+- Immutable caching for versioned URLs, revalidation otherwise.
+"""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import get_db
+from app.services.image_variant_service import (
+    VARIANT_MEDIA_TYPES, negotiate_format, resolve_source, variant_etag, get_variant_file
+)
+
+router = APIRouter(prefix="/images", tags=["Images"])
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "public, no-cache"
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header covers the given ETag."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+@router.get("/{source_path:path}", summary="Serve a resized variant of a scan or overlay image")
+def get_image_variant(
+    source_path: str,
+    w: Optional[int] = Query(None, description="Width preset in pixels"),
+    v: Optional[str] = Query(None, description="Source version; versioned URLs are cached immutably"),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Serves `uploads/...` and `predictions/...` images resized to a width preset
+    and encoded as WebP (when accepted) or JPEG.
+
+    Responses carry a strong ETag and honour `If-None-Match` with `304`.
+    URLs whose `v` matches the current source version are content-addressed
+    and cached as immutable; other responses must be revalidated.
+    """
+    if w is not None and w not in settings.IMAGE_VARIANT_WIDTHS:
+        presets = ", ".join(str(width) for width in settings.IMAGE_VARIANT_WIDTHS)
+        raise HTTPException(status_code=400, detail=f"Unsupported width {w}; use one of {presets}")
+
+    source = resolve_source(db, source_path)
+    if source is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    image_format = negotiate_format(accept)
+    etag = variant_etag(source, w, image_format)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": IMMUTABLE if v == source.version else REVALIDATE,
+        "Vary": "Accept",
+    }
+
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        path = get_variant_file(source, w, image_format, etag)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Image could not be decoded")
+
+    return FileResponse(path, media_type=VARIANT_MEDIA_TYPES[image_format], headers=headers)
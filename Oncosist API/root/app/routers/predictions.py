@@ -0,0 +1,59 @@
+"""
+Prediction Overlay API.
+
+This module provides:
+- Serving the overlay image behind a prediction's `result_path`.
+- Legacy overlays stored on disk, served as-is.
+- Overlays rendered on demand from the stored mask (optionally restyled),
+  kept in an LRU disk cache.
+"""
+
+from typing import Optional
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from app.db.session import get_db
+from app.db.models.prediction import Prediction
+from app.db.models.scan import Scan
+from app.services.overlay_service import get_overlay_file
+from app.services.prediction_service import PREDICTION_DIR
+
+router = APIRouter(prefix="/predictions", tags=["Predictions"])
+
+
+@router.get("/{filename}", summary="Serve a prediction overlay image")
+def get_prediction_overlay(
+    filename: str,
+    format: Optional[str] = Query(None, description="'png' or 'webp'"),
+    color: Optional[str] = Query(None, description="Tumor colour as #rrggbb"),
+    alpha: Optional[float] = Query(None, ge=0.0, le=1.0, description="Tumor colour opacity"),
+    db: Session = Depends(get_db)
+):
+    """
+    Serves the overlay behind a prediction's `result_path`.
+
+    Overlays written to disk by older versions are served as-is; otherwise the
+    overlay is rendered from the stored mask and kept in an LRU disk cache.
+    """
+    if os.path.basename(filename) != filename:
+        raise HTTPException(status_code=404, detail="Overlay not found")
+
+    restyled = format is not None or color is not None or alpha is not None
+    legacy_path = os.path.join(PREDICTION_DIR, filename)
+    if not restyled and os.path.isfile(legacy_path):
+        return FileResponse(legacy_path)
+
+    prediction = db.query(Prediction).filter(Prediction.result_path == legacy_path).first()
+    if not prediction or not prediction.mask_path or not os.path.isfile(prediction.mask_path):
+        if os.path.isfile(legacy_path):
+            return FileResponse(legacy_path)
+        raise HTTPException(status_code=404, detail="Overlay not found")
+
+    scan = db.query(Scan).filter(Scan.id == prediction.scan_id).first()
+    try:
+        path, media_type = get_overlay_file(prediction, scan, format, color, alpha)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return FileResponse(path, media_type=media_type)
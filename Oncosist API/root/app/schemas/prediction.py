@@ -5,10 +5,12 @@ This module defines:
 - Base schema for tumor predictions.
 - Schema for creating a new prediction.
 - Schema for returning prediction details.
+- Schemas for batch prediction requests and results.
 """
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, model_validator
 from datetime import datetime
+from typing import List, Optional
 
 
 class PredictionBase(BaseModel):
@@ -17,13 +19,17 @@ class PredictionBase(BaseModel):
 
     Attributes:
         scan_id (int): The ID of the related MRI scan.
-        result_path (str): File path where the prediction result is stored.
-        status (str): The status of the prediction ('pending', 'completed', 'failed').
+        tumor_type (Optional[str]): The predicted tumor class, once completed.
+        result_path (Optional[str]): File path where the prediction result is stored, once completed.
+        mask_path (Optional[str]): File path of the bit-packed segmentation mask(s), if stored.
+        status (str): The status of the prediction ('pending', 'processing', 'completed', 'failed').
     """
-    tumor_type: str
+    tumor_type: Optional[str] = None
     scan_id: int
-    result_path: str
-    status: str  # 'pending', 'completed', 'failed'
+    result_path: Optional[str] = None
+    mask_path: Optional[str] = None
+    overlay_slice: Optional[int] = None
+    status: str  # 'pending', 'processing', 'completed', 'failed'
 
 
 class PredictionCreate(PredictionBase):
@@ -46,3 +52,40 @@ class PredictionResponse(PredictionBase):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)  # Enables ORM serialization
+
+
+class PredictionBatchRequest(BaseModel):
+    """
+    Schema for requesting predictions for several scans at once.
+
+    Provide either `scan_ids` or `patient_id`. With neither, all of the
+    current user's scans without a completed prediction are processed.
+
+    Attributes:
+        scan_ids (Optional[List[int]]): Explicit scan IDs to process.
+        patient_id (Optional[int]): Process every scan of this patient.
+    """
+    scan_ids: Optional[List[int]] = None
+    patient_id: Optional[int] = None
+
+    @model_validator(mode="after")
+    def check_single_selector(self):
+        if self.scan_ids is not None and self.patient_id is not None:
+            raise ValueError("Provide either scan_ids or patient_id, not both")
+        return self
+
+
+class PredictionBatchItem(BaseModel):
+    """
+    Schema for one scan's result in a batch prediction response.
+
+    Attributes:
+        scan_id (int): The ID of the MRI scan.
+        status (str): The prediction status ('completed', 'failed', or 'not_found').
+        tumor_type (Optional[str]): The predicted tumor class.
+        overlay_image_path (Optional[str]): File path of the overlay image.
+    """
+    scan_id: int
+    status: str
+    tumor_type: Optional[str] = None
+    overlay_image_path: Optional[str] = None
@@ -51,6 +51,7 @@ class ScanResponse(ScanBase):
         file_path (str): The location where the scan file is stored.
         uploaded_at (datetime): The timestamp when the scan was uploaded.
         doctor_notes (Optional[str]): Any notes from the doctor.
+        thumbnail_path (Optional[str]): A downscaled preview of the scan.
     """
     id: int
     user_id: int
@@ -58,5 +59,6 @@ class ScanResponse(ScanBase):
     file_path: str
     uploaded_at: datetime
     doctor_notes: Optional[str] = None  
+    thumbnail_path: Optional[str] = None
 
     model_config = ConfigDict(from_attributes=True)  
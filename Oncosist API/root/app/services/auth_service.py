@@ -7,33 +7,39 @@ This module includes:
 - JWT-based login with access and refresh token generation.
 - Access token refresh handling.
 - Retrieving the current user from the JWT token.
+- Read sessions for the current user's dashboards, on the read replica unless they just wrote.
+
+Database access goes through `AsyncSession`, and bcrypt hashing runs in the
+threadpool, so authentication never blocks the event loop.
 """
 
 from datetime import timedelta
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Local imports
-from app.db.crud.crud_user import get_user_by_email, create_user
+from app.db.crud.async_crud_user import get_user_by_email, get_user_by_username, create_user
 from app.core.security import (
     verify_password, get_password_hash, 
     create_access_token, create_refresh_token, decode_access_token, decode_refresh_token
 )
 from app.schemas.user import UserCreate, UserResponse
-from app.db.session import get_db
+from app.db.routing import recent_writes
+from app.db.session import AsyncSessionLocal, get_async_db
 from app.db.models.user import User
 
 # Token expiration settings
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
-def register_user(db: Session, user_data: UserCreate) -> UserResponse:
+async def register_user(db: AsyncSession, user_data: UserCreate) -> UserResponse:
     """
     Registers a new user (doctor) and ensures uniqueness of email and username.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The async database session.
         user_data (UserCreate): The user data from the request.
 
     Returns:
@@ -43,55 +49,55 @@ def register_user(db: Session, user_data: UserCreate) -> UserResponse:
         HTTPException: If the email or username is already taken.
     """
     # Check if email is already registered
-    if get_user_by_email(db, user_data.email):
+    if await get_user_by_email(db, user_data.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email is already registered"
         )
 
     # Check if username is already taken
-    if db.query(User).filter(User.username == user_data.username).first():
+    if await get_user_by_username(db, user_data.username):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username is already taken"
         )
 
     # Create the user
-    new_user = create_user(db, user_data)
+    new_user = await create_user(db, user_data)
     return UserResponse.model_validate(new_user)
 
 
-def authenticate_user(db: Session, email: str, password: str) -> User | None:
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> User | None:
     """
     Authenticates a user by verifying email and password.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The async database session.
         email (str): The user's email.
         password (str): The user's password.
 
     Returns:
         User | None: The authenticated user object if valid, otherwise None.
     """
-    user = get_user_by_email(db, email)
-    if not user or not verify_password(password, user.hashed_password):
+    user = await get_user_by_email(db, email)
+    if not user or not await run_in_threadpool(verify_password, password, user.hashed_password):
         return None  # Invalid credentials
     return user
 
 
-def login_user(db: Session, email: str, password: str) -> dict | None:
+async def login_user(db: AsyncSession, email: str, password: str) -> dict | None:
     """
     Handles user login and token generation.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The async database session.
         email (str): The user's email.
         password (str): The user's password.
 
     Returns:
         dict | None: Dictionary containing access & refresh tokens if authentication is successful.
     """
-    user = authenticate_user(db, email, password)
+    user = await authenticate_user(db, email, password)
     if not user:
         return None  # Authentication failed
 
@@ -138,13 +144,13 @@ def refresh_access_token(refresh_token: str) -> dict | None:
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> User:
     """
     Extracts the user from the JWT access token and verifies existence.
 
     Args:
         token (str): The JWT access token.
-        db (Session): The database session.
+        db (AsyncSession): The async database session.
 
     Returns:
         User: The authenticated user.
@@ -166,7 +172,7 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     if not email:
         raise credentials_exception
 
-    user = db.query(User).filter(User.email == email).first()
+    user = await get_user_by_email(db, email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -174,3 +180,21 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         )
 
     return user
+
+
+
+async def get_user_read_db(current_user: User = Depends(get_current_user)):
+    """
+    Provides an async session for the current user's read-only history and listing routes.
+
+    Queries run on the read replica when one is configured, except right after
+    the user wrote (see `recent_writes`), so an upload shows up immediately.
+
+    Args:
+        current_user (User): The authenticated user.
+
+    Yields:
+        AsyncSession: An async database session.
+    """
+    async with AsyncSessionLocal(info={"use_replica": not recent_writes.is_recent(current_user.id)}) as db:
+        yield db
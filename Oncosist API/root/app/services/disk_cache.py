@@ -0,0 +1,122 @@
+"""
+Size-bounded LRU cache of files on disk.
+
+This module includes:
+- Content storage under hashed file names with atomic writes.
+- Recency tracking through file modification times (survives restarts).
+- Eviction of least recently used files once the size bound is exceeded.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+
+
+class DiskLRUCache:
+    """
+    A directory of cached files with a total size limit.
+
+    Attributes:
+        directory (str): Where cached files are stored.
+        max_bytes (int): The size bound; older files are evicted beyond it.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes: int | None = None
+
+    def path_for(self, key: str, extension: str = "") -> str:
+        """
+        Maps a cache key to its file path.
+
+        Args:
+            key (str): The cache key.
+            extension (str, optional): File extension including the dot.
+
+        Returns:
+            str: The path where the entry is (or would be) stored.
+        """
+        name = hashlib.sha256(key.encode()).hexdigest()[:40]
+        return os.path.join(self.directory, f"{name}{extension}")
+
+    def get(self, key: str, extension: str = "") -> str | None:
+        """
+        Looks up an entry and marks it as recently used.
+
+        Args:
+            key (str): The cache key.
+            extension (str, optional): File extension including the dot.
+
+        Returns:
+            str | None: The cached file path on a hit, otherwise None.
+        """
+        path = self.path_for(key, extension)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, data: bytes, extension: str = "") -> str:
+        """
+        Stores an entry, then evicts least recently used files over the bound.
+
+        Args:
+            key (str): The cache key.
+            data (bytes): The file content.
+            extension (str, optional): File extension including the dot.
+
+        Returns:
+            str: The path of the stored file.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(key, extension)
+
+        # Write to a temp file first so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+
+        with self._lock:
+            total = self._current_size()
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            self._total_bytes = total - previous + len(data)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+        return path
+
+    def _current_size(self) -> int:
+        """Total size of cached files, scanned once and then tracked incrementally."""
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, _, size in self._entries())
+        return self._total_bytes
+
+    def _entries(self) -> list[tuple[float, str, int]]:
+        """Lists (mtime, path, size) for every cached file."""
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return entries
+
+    def _evict(self):
+        """Deletes least recently used files until the cache fits its bound."""
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+        for _, path, size in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._total_bytes = total
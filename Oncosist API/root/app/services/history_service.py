@@ -0,0 +1,165 @@
+"""
+Service module for paginated scan history.
+
+This module includes:
+- Opaque keyset cursors over `(uploaded_at, id)`.
+- Date range, tumor type and prediction status filters applied in SQL.
+- Fetching one page of scans with the relations the response needs.
+
+Pages are read with a keyset predicate rather than OFFSET, so the cost of a
+page does not depend on how deep into the history it is.
+"""
+
+import base64
+import binascii
+from datetime import date, datetime, time, timedelta
+from fastapi import HTTPException, status
+from sqlalchemy import or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Local Imports
+from app.db.models.prediction import Prediction
+from app.db.models.scan import Scan
+from app.services.scan_service import scan_response_options
+
+PREDICTION_STATUSES = ("pending", "processing", "completed", "failed")
+
+
+def encode_cursor(scan: Scan) -> str:
+    """
+    Encodes the position just after a scan as an opaque cursor.
+
+    Args:
+        scan (Scan): The last scan of a page.
+
+    Returns:
+        str: A URL-safe cursor string.
+    """
+    raw = f"{scan.uploaded_at.isoformat()}|{scan.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decodes a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (str): The cursor string.
+
+    Returns:
+        tuple[datetime, int]: The upload time and id of the last scan seen.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        uploaded_at, scan_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(uploaded_at), int(scan_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def filter_scans(
+    statement,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    tumor_type: str | None = None,
+    prediction_status: str | None = None,
+):
+    """
+    Applies history filters to a scan query.
+
+    Args:
+        statement (Select): A SELECT over `Scan`.
+        date_from (date, optional): Earliest upload date, inclusive.
+        date_to (date, optional): Latest upload date, inclusive.
+        tumor_type (str, optional): Predicted tumor type.
+        prediction_status (str, optional): Prediction status; scans without a
+            prediction count as 'pending'.
+
+    Returns:
+        Select: The filtered statement.
+
+    Raises:
+        HTTPException: If the prediction status is unknown.
+    """
+    if date_from is not None:
+        statement = statement.where(Scan.uploaded_at >= datetime.combine(date_from, time.min))
+    if date_to is not None:
+        statement = statement.where(Scan.uploaded_at < datetime.combine(date_to + timedelta(days=1), time.min))
+    if tumor_type is not None:
+        statement = statement.where(Scan.prediction.has(Prediction.tumor_type == tumor_type))
+    if prediction_status is not None:
+        if prediction_status not in PREDICTION_STATUSES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown prediction status. Use one of: {', '.join(PREDICTION_STATUSES)}",
+            )
+        condition = Scan.prediction.has(Prediction.status == prediction_status)
+        if prediction_status == "pending":
+            condition = or_(condition, ~Scan.prediction.has())
+        statement = statement.where(condition)
+    return statement
+
+
+def scan_page_query(
+    owner_filter,
+    limit: int,
+    cursor: str | None = None,
+    include_patient: bool = False,
+    include_uploader: bool = False,
+    **filters,
+):
+    """
+    Builds the query for one page of scans, newest first.
+
+    Args:
+        owner_filter: The criterion selecting whose history this is
+            (e.g. `Scan.user_id == 1`).
+        limit (int): Maximum number of scans in the page.
+        cursor (str, optional): The `next_cursor` of the previous page.
+        include_patient (bool, optional): Load each scan's patient.
+        include_uploader (bool, optional): Load each scan's uploader.
+        **filters: Keyword filters accepted by `filter_scans`.
+
+    Returns:
+        Select: The statement, fetching one row more than `limit`.
+    """
+    statement = filter_scans(select(Scan).where(owner_filter), **filters)
+
+    if cursor is not None:
+        uploaded_at, scan_id = decode_cursor(cursor)
+        statement = statement.where(tuple_(Scan.uploaded_at, Scan.id) < tuple_(uploaded_at, scan_id))
+
+    # One extra row tells whether another page follows
+    return (
+        statement.options(*scan_response_options(include_patient, include_uploader))
+        .order_by(Scan.uploaded_at.desc(), Scan.id.desc())
+        .limit(limit + 1)
+    )
+
+
+async def get_scan_page(
+    db: AsyncSession, owner_filter, limit: int, cursor: str | None = None, **kwargs
+) -> tuple[list[Scan], str | None]:
+    """
+    Fetches one page of scans, newest first.
+
+    Args:
+        db (AsyncSession): Async database session.
+        owner_filter: The criterion selecting whose history this is.
+        limit (int): Maximum number of scans in the page.
+        cursor (str, optional): The `next_cursor` of the previous page.
+        **kwargs: Loading options and filters accepted by `scan_page_query`.
+
+    Returns:
+        tuple[list[Scan], str | None]: The scans and the cursor of the next
+        page, or None if this is the last page.
+    """
+    scans = list(await db.scalars(scan_page_query(owner_filter, limit, cursor, **kwargs)))
+
+    if len(scans) > limit:
+        scans = scans[:limit]
+        return scans, encode_cursor(scans[-1])
+    return scans, None
@@ -0,0 +1,253 @@
+"""
+Service module for resized, re-encoded image variants.
+
+This module includes:
+- Resolving `/uploads/...` and `/predictions/...` paths to a source image and version.
+- Width presets and WebP/JPEG negotiation from the `Accept` header.
+- Strong ETags and versioned (content-addressed) variant URLs.
+- A size-bounded LRU disk cache of generated variants.
+"""
+
+import hashlib
+import os
+import cv2
+import numpy as np
+from sqlalchemy.orm import Session
+
+# Local Imports
+from app.core.config import settings
+from app.db.models.prediction import Prediction
+from app.db.models.scan import Scan
+from app.ml_models.volume_inference import is_volume, read_axial_slice
+from app.services.disk_cache import DiskLRUCache
+from app.services.overlay_service import parse_color, render_prediction_overlay
+
+UPLOAD_DIR = "uploads"
+PREDICTION_DIR = "predictions"
+SOURCE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".nii", ".nii.gz")
+
+# Output formats and their media types, in order of preference
+VARIANT_MEDIA_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+VARIANT_QUALITY = {"webp": cv2.IMWRITE_WEBP_QUALITY, "jpeg": cv2.IMWRITE_JPEG_QUALITY}
+
+# Generated variants, evicted least recently used first
+variant_cache = DiskLRUCache(settings.IMAGE_VARIANT_CACHE_DIR, settings.IMAGE_VARIANT_CACHE_MAX_MB * 1024 * 1024)
+
+
+class ImageSource:
+    """
+    An image that variants are generated from.
+
+    Attributes:
+        path (str): The public path (e.g. 'uploads/patient_1/scan.png').
+        version (str): Changes whenever the image content may have changed.
+    """
+
+    def __init__(self, path: str, version: str, loader):
+        self.path = path
+        self.version = version
+        self._loader = loader
+
+    def load(self) -> np.ndarray:
+        """Decodes the source as a BGR image."""
+        return self._loader()
+
+
+def file_version(path: str) -> str | None:
+    """
+    Fingerprints a file by size and modification time.
+
+    Args:
+        path (str): The file path.
+
+    Returns:
+        str | None: The version string, or None if the file does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+
+def overlay_version(prediction: Prediction) -> str | None:
+    """
+    Versions a rendered overlay by its mask file and the overlay style.
+
+    Args:
+        prediction (Prediction): A completed prediction with a stored mask.
+
+    Returns:
+        str | None: The version string, or None if the mask is missing.
+    """
+    mask_version = file_version(prediction.mask_path) if prediction.mask_path else None
+    if mask_version is None:
+        return None
+    return f"{mask_version}-{settings.OVERLAY_COLOR.lstrip('#')}-{settings.OVERLAY_ALPHA}"
+
+
+def variant_url(source_path: str, version: str | None, width: int | None = None) -> str:
+    """
+    Builds the URL of an image variant.
+
+    URLs carrying the source version are content-addressed and are served
+    with an immutable, long-lived Cache-Control header.
+
+    Args:
+        source_path (str): The public path of the source image.
+        version (str, optional): The source version.
+        width (int, optional): A width preset.
+
+    Returns:
+        str: The variant URL.
+    """
+    params = []
+    if width:
+        params.append(f"w={width}")
+    if version:
+        params.append(f"v={version}")
+    url = f"/images/{source_path.replace(os.sep, '/')}"
+    return f"{url}?{'&'.join(params)}" if params else url
+
+
+def negotiate_format(accept: str | None) -> str:
+    """
+    Picks WebP when the client accepts it, JPEG otherwise.
+
+    Args:
+        accept (str, optional): The request's Accept header.
+
+    Returns:
+        str: 'webp' or 'jpeg'.
+    """
+    for item in (accept or "").split(","):
+        media_type, _, params = item.strip().partition(";")
+        if media_type.strip().lower() != "image/webp":
+            continue
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        return "webp"
+    return "jpeg"
+
+
+def _load_file(path: str):
+    def load():
+        if is_volume(path):
+            return cv2.cvtColor(read_axial_slice(path), cv2.COLOR_GRAY2BGR)
+        image = cv2.imread(path, cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("Could not load image from disk.")
+        return image
+    return load
+
+
+def _local_path(directory: str, relative: str) -> str | None:
+    """Joins a relative path under `directory`, refusing paths that escape it."""
+    root = os.path.abspath(directory)
+    path = os.path.abspath(os.path.join(root, relative))
+    if os.path.commonpath([root, path]) != root:
+        return None
+    return path
+
+
+def resolve_source(db: Session, source_path: str) -> ImageSource | None:
+    """
+    Resolves a public image path to the source variants are generated from.
+
+    Args:
+        db (Session): Database session, used to look up rendered overlays.
+        source_path (str): 'uploads/...' or 'predictions/...'.
+
+    Returns:
+        ImageSource | None: The source, or None if there is no such image.
+    """
+    source_path = source_path.replace("\\", "/")
+    directory, _, relative = source_path.partition("/")
+    if directory not in (UPLOAD_DIR, PREDICTION_DIR) or not relative.lower().endswith(SOURCE_EXTENSIONS):
+        return None
+    if directory == PREDICTION_DIR and "/" in relative:
+        return None
+
+    local_path = _local_path(directory, relative)
+    if local_path is None:
+        return None
+
+    # Files on disk: uploads and legacy overlay images
+    version = file_version(local_path)
+    if version is not None:
+        return ImageSource(source_path, version, _load_file(local_path))
+
+    if directory != PREDICTION_DIR:
+        return None
+
+    # Overlays rendered on demand from the stored mask
+    prediction = (
+        db.query(Prediction)
+        .filter(Prediction.result_path == os.path.join(f"{PREDICTION_DIR}/", relative))
+        .first()
+    )
+    version = overlay_version(prediction) if prediction else None
+    if version is None:
+        return None
+
+    scan = db.query(Scan).filter(Scan.id == prediction.scan_id).first()
+
+    def load():
+        overlay = render_prediction_overlay(
+            prediction, scan, parse_color(settings.OVERLAY_COLOR), settings.OVERLAY_ALPHA
+        )
+        return cv2.cvtColor(overlay, cv2.COLOR_RGB2BGR)
+
+    return ImageSource(source_path, version, load)
+
+
+def variant_etag(source: ImageSource, width: int | None, image_format: str) -> str:
+    """
+    Computes the strong ETag of a variant.
+
+    Args:
+        source (ImageSource): The source image.
+        width (int, optional): The width preset.
+        image_format (str): 'webp' or 'jpeg'.
+
+    Returns:
+        str: The quoted ETag.
+    """
+    key = f"{source.path}|{source.version}|{width or 'full'}|{image_format}"
+    return f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+
+def get_variant_file(source: ImageSource, width: int | None, image_format: str, etag: str) -> str:
+    """
+    Returns a cached variant file, generating and caching it on a miss.
+
+    Args:
+        source (ImageSource): The source image.
+        width (int, optional): The width preset; the source is never upscaled.
+        image_format (str): 'webp' or 'jpeg'.
+        etag (str): The variant's ETag, used as its cache key.
+
+    Returns:
+        str: The cached file path.
+    """
+    extension = f".{image_format}"
+    path = variant_cache.get(etag, extension)
+    if path is not None:
+        return path
+
+    image = source.load()
+    height, source_width = image.shape[:2]
+    if width and width < source_width:
+        size = (width, max(1, round(height * width / source_width)))
+        image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+    quality = settings.IMAGE_VARIANT_QUALITY
+    ok, encoded = cv2.imencode(extension, image, [VARIANT_QUALITY[image_format], quality])
+    if not ok:
+        raise ValueError(f"Could not encode image as {image_format}")
+    return variant_cache.put(etag, encoded.tobytes(), extension)
@@ -0,0 +1,129 @@
+"""
+Service module for on-demand overlay rendering.
+
+This module includes:
+- Rendering a prediction's overlay from its stored bit-packed mask.
+- Encoding overlays as PNG or WebP with a configurable colour and opacity.
+- A size-bounded LRU disk cache of rendered overlays.
+"""
+
+import os
+import re
+import cv2
+import numpy as np
+
+# Local Imports
+from app.core.config import settings
+from app.db.models.prediction import Prediction
+from app.db.models.scan import Scan
+from app.ml_models.mask_codec import load_mask_slice
+from app.ml_models.preprocessing import prepare_scan_image
+from app.ml_models.volume_inference import is_volume, read_axial_slice
+from app.services.disk_cache import DiskLRUCache
+from app.services.prediction_service import render_overlay
+
+# Supported output formats and their media types
+OVERLAY_MEDIA_TYPES = {"png": "image/png", "webp": "image/webp"}
+
+# Rendered overlays, evicted least recently used first
+overlay_cache = DiskLRUCache(settings.OVERLAY_CACHE_DIR, settings.OVERLAY_CACHE_MAX_MB * 1024 * 1024)
+
+
+def parse_color(value: str) -> tuple:
+    """
+    Parses a '#rrggbb' colour.
+
+    Args:
+        value (str): The hex colour string.
+
+    Returns:
+        tuple: The (r, g, b) colour.
+
+    Raises:
+        ValueError: If the value is not a hex colour.
+    """
+    match = re.fullmatch(r"#?([0-9a-fA-F]{6})", value.strip())
+    if not match:
+        raise ValueError(f"Invalid colour '{value}', expected #rrggbb")
+    hex_value = match.group(1)
+    return tuple(int(hex_value[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def encode_image(rgb: np.ndarray, image_format: str) -> bytes:
+    """
+    Encodes an RGB image.
+
+    Args:
+        rgb (np.ndarray): The RGB image.
+        image_format (str): 'png' or 'webp'.
+
+    Returns:
+        bytes: The encoded image.
+    """
+    ok, encoded = cv2.imencode(f".{image_format}", cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR))
+    if not ok:
+        raise ValueError(f"Could not encode image as {image_format}")
+    return encoded.tobytes()
+
+
+def render_prediction_overlay(prediction: Prediction, scan: Scan, color: tuple, alpha: float) -> np.ndarray:
+    """
+    Rebuilds a prediction's overlay from the scan and its stored mask.
+
+    Args:
+        prediction (Prediction): The completed prediction.
+        scan (Scan): The scan the prediction belongs to.
+        color (tuple): RGB colour of the tumor region.
+        alpha (float): Opacity of the tumor colour.
+
+    Returns:
+        np.ndarray: The RGB overlay image.
+    """
+    if is_volume(scan.file_path):
+        index = prediction.overlay_slice or 0
+        normalized = read_axial_slice(scan.file_path, index)
+    else:
+        index = 0
+        normalized = prepare_scan_image(scan.file_path, scan.tensor_path)
+    return render_overlay(normalized, load_mask_slice(prediction.mask_path, index), color, alpha)
+
+
+def get_overlay_file(
+    prediction: Prediction,
+    scan: Scan,
+    image_format: str | None = None,
+    color: str | None = None,
+    alpha: float | None = None
+) -> tuple[str, str]:
+    """
+    Returns a rendered overlay file, rendering and caching it on a miss.
+
+    Args:
+        prediction (Prediction): The completed prediction with a stored mask.
+        scan (Scan): The scan the prediction belongs to.
+        image_format (str, optional): 'png' or 'webp'. Defaults to OVERLAY_FORMAT.
+        color (str, optional): '#rrggbb' tumor colour. Defaults to OVERLAY_COLOR.
+        alpha (float, optional): Tumor colour opacity. Defaults to OVERLAY_ALPHA.
+
+    Returns:
+        tuple[str, str]: The cached file path and its media type.
+
+    Raises:
+        ValueError: If the format or colour is invalid.
+    """
+    image_format = (image_format or settings.OVERLAY_FORMAT).lower()
+    if image_format not in OVERLAY_MEDIA_TYPES:
+        raise ValueError(f"Unsupported overlay format '{image_format}'")
+    rgb = parse_color(color or settings.OVERLAY_COLOR)
+    alpha = settings.OVERLAY_ALPHA if alpha is None else alpha
+
+    # The mask's mtime keys out overlays of a recomputed prediction
+    mask_version = os.stat(prediction.mask_path).st_mtime_ns
+    key = f"{prediction.id}:{prediction.mask_path}:{mask_version}:{image_format}:{rgb}:{alpha}"
+    extension = f".{image_format}"
+
+    path = overlay_cache.get(key, extension)
+    if path is None:
+        overlay = render_prediction_overlay(prediction, scan, rgb, alpha)
+        path = overlay_cache.put(key, encode_image(overlay, image_format), extension)
+    return path, OVERLAY_MEDIA_TYPES[image_format]
@@ -0,0 +1,142 @@
+"""
+Service module for the content-addressed prediction cache.
+
+This module includes:
+- Hashing of normalized input pixels.
+- Cache lookups and inserts keyed by image hash and model version.
+- Recording cache hits (LRU order).
+- Size-bounded LRU eviction and invalidation when the model files change.
+
+Re-uploads of an identical image hit the cache and skip both networks.
+Inserts, hits and evictions are written with the caller's commit, so a
+prediction and its cache entry are stored in one transaction.
+"""
+
+import hashlib
+import logging
+import threading
+import numpy as np
+from sqlalchemy.orm import Session
+
+# Local Imports
+from app.core.config import settings
+from app.db.crud.crud_prediction_cache import (
+    get_cache_entry, touch_cache_entries, create_cache_entries, evict_cache_entries, purge_stale_cache_entries
+)
+from app.ml_models.mask_codec import pack_mask, unpack_mask
+from app.ml_models.models_loader import get_model_version
+
+logger = logging.getLogger(__name__)
+
+# Model versions whose stale entries have already been purged in this process
+_purged_versions = set()
+
+# Cache inserts in this process since the size bound was last enforced
+_inserts_since_eviction = 0
+_eviction_lock = threading.Lock()
+
+
+def hash_image(image: np.ndarray) -> str:
+    """
+    Computes a content hash of decoded, normalized pixel data.
+
+    Args:
+        image (np.ndarray): The normalized uint8 image.
+
+    Returns:
+        str: The SHA-256 hex digest of the shape and pixels.
+    """
+    digest = hashlib.sha256(str(image.shape).encode())
+    digest.update(np.ascontiguousarray(image).data)
+    return digest.hexdigest()
+
+
+def _current_version(db: Session) -> str:
+    """
+    Returns the model version, dropping entries from older models on first use.
+
+    The purge is maintenance, not part of the caller's work, so it runs and
+    commits in a session of its own.
+    """
+    model_version = get_model_version()
+    if model_version not in _purged_versions:
+        with Session(db.get_bind()) as purge_db:
+            purged = purge_stale_cache_entries(purge_db, model_version)
+            purge_db.commit()
+        if purged:
+            logger.info(f"Invalidated {purged} prediction cache entries from previous models")
+        _purged_versions.add(model_version)
+    return model_version
+
+
+def get_cached_result(db: Session, image_hash: str) -> tuple[np.ndarray, str] | None:
+    """
+    Looks up a stored result for an input image.
+
+    Args:
+        db (Session): Active database session.
+        image_hash (str): Hash of the normalized input pixels.
+
+    Returns:
+        tuple[np.ndarray, str] | None: The binary mask and tumor type on a hit.
+    """
+    entry = get_cache_entry(db, image_hash, _current_version(db))
+    if not entry:
+        return None
+    return unpack_mask(entry.mask), entry.tumor_type
+
+
+def mark_results_used(db: Session, image_hashes: list[str]):
+    """
+    Records cache hits for LRU eviction, without committing.
+
+    Lookups do not write; callers mark their hits once and the access times
+    are stored with the commit of their results.
+
+    Args:
+        db (Session): Active database session.
+        image_hashes (list[str]): Hashes of the images that hit the cache.
+    """
+    if image_hashes:
+        touch_cache_entries(db, image_hashes, _current_version(db))
+
+
+def store_result(db: Session, image_hash: str, binary_mask: np.ndarray, tumor_type: str):
+    """
+    Stores a model result, without committing.
+
+    Args:
+        db (Session): Active database session.
+        image_hash (str): Hash of the normalized input pixels.
+        binary_mask (np.ndarray): The binary segmentation mask.
+        tumor_type (str): The predicted tumor class.
+    """
+    store_results(db, [(image_hash, binary_mask, tumor_type)])
+
+
+def store_results(db: Session, results: list[tuple[str, np.ndarray, str]]):
+    """
+    Stores several model results with one INSERT, without committing.
+
+    Images a concurrent request cached first are skipped. Every
+    `PREDICTION_CACHE_EVICT_EVERY` inserts, least recently used entries over
+    the size bound are evicted in the same transaction.
+
+    Args:
+        db (Session): Active database session.
+        results (list[tuple[str, np.ndarray, str]]): (image_hash, binary_mask, tumor_type) tuples.
+    """
+    global _inserts_since_eviction
+
+    model_version = _current_version(db)
+    inserted = create_cache_entries(db, [
+        (image_hash, model_version, tumor_type, pack_mask(binary_mask))
+        for image_hash, binary_mask, tumor_type in results
+    ])
+
+    with _eviction_lock:
+        _inserts_since_eviction += inserted
+        if _inserts_since_eviction < settings.PREDICTION_CACHE_EVICT_EVERY:
+            return
+        _inserts_since_eviction = 0
+    evict_cache_entries(db, settings.PREDICTION_CACHE_MAX_ENTRIES)
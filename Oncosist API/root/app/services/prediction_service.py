@@ -3,28 +3,39 @@ Service module for processing tumor predictions.
 
 This module includes:
 - Generating dummy tumor segmentation masks (simulating a UNet model).
+- Running segmentation + classification for single scans and batches of scans.
 - Storing predictions in the database.
 """
 
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import numpy as np
 from PIL import Image
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 # Local Imports
 from app.db.models.scan import Scan
 from app.db.models.prediction import Prediction
-from app.db.crud.crud_prediction import create_prediction
+from app.db.crud.crud_prediction import (
+    create_prediction, get_prediction_by_scan, complete_prediction, claim_predictions_for_scans
+)
+from app.db.group_commit import get_group_commit_writer
 from app.schemas.prediction import PredictionCreate
 
 import cv2
-from app.ml_models.models_loader import get_unet_model, get_cnn_model, get_tumor_map
-from app.ml_models.image_preprocessor import ImagePreprocessor
+from app.ml_models.models_loader import get_tumor_map
+from app.ml_models.preprocessing import prepare_scan_image
+from app.ml_models.inference_batcher import get_inference_batcher, run_models
+from app.ml_models.volume_inference import is_volume, analyze_volume
+from app.ml_models.mask_codec import save_mask
+from app.core.config import settings
+from app.services.prediction_cache import hash_image, get_cached_result, mark_results_used, store_result, store_results
 
-# Directory for storing generated tumor masks
+# Directory for storing generated tumor masks (created on first write)
 PREDICTION_DIR = "predictions/"
-os.makedirs(PREDICTION_DIR, exist_ok=True)  # Ensure the directory exists
 
 
 def generate_dummy_mask(image_path: str) -> str:
@@ -47,76 +58,317 @@ def generate_dummy_mask(image_path: str) -> str:
     # Save generated mask
     mask_filename = f"mask_{os.path.basename(image_path)}"
     mask_path = os.path.join(PREDICTION_DIR, mask_filename)
+    os.makedirs(PREDICTION_DIR, exist_ok=True)
     mask.save(mask_path)
 
     return mask_path
 
 
-def process_prediction(scan: Scan, db: Session) -> Prediction:
+def process_prediction(scan: Scan, db: Session, prediction: Prediction | None = None) -> Prediction:
     """
-    Runs tumor segmentation and classification, saves the overlay image,
+    Runs tumor segmentation and classification, stores the bit-packed mask,
     and stores the prediction in the database.
 
+    The overlay image is not encoded here; it is rendered on demand when its
+    `/predictions/...` URL is first requested.
+
     Args:
         scan (Scan): The MRI scan to process.
         db (Session): Active database session.
+        prediction (Prediction, optional): An existing pending prediction job
+            to complete instead of creating a new record.
 
     Returns:
         Prediction: The stored prediction record.
     """
-    # Run segmentation + classification
-    overlay, tumor_type = analyze_mri(scan.file_path)
+    scan_filename = os.path.basename(scan.file_path)
+    mask_path = get_mask_path(scan.file_path)
+    overlay_slice = None
 
-    # Save the overlay image
-    overlay_filename = f"overlay_{os.path.basename(scan.file_path)}"
-    result_path = os.path.join(PREDICTION_DIR, overlay_filename)
+    if is_volume(scan.file_path):
+        # Volumetric scan: per-slice mask stack + volume-level classification
+        tumor_type, overlay_slice = analyze_volume(
+            scan.file_path, mask_path, get_tumor_map(), batch_size=settings.VOLUME_SLICE_BATCH_SIZE
+        )
+        overlay_filename = f"overlay_{scan_filename}.png"
+    else:
+        # Run segmentation + classification (or reuse a cached result)
+        _, binary_mask, tumor_type = segment_and_classify(scan.file_path, db, tensor_path=scan.tensor_path)
+        save_mask(mask_path, binary_mask)
+        overlay_filename = f"overlay_{scan_filename}"
 
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(result_path), exist_ok=True)
+    # URL path the overlay is served (and lazily rendered) from
+    result_path = os.path.join(PREDICTION_DIR, overlay_filename)
 
-    # Convert overlay to image and save
-    overlay_img = Image.fromarray(overlay.astype(np.uint8))
-    overlay_img.save(result_path)
+    if prediction is None:
+        # Create DB record
+        prediction_data = PredictionCreate(
+            scan_id=scan.id,
+            tumor_type=tumor_type,
+            result_path=result_path,
+            mask_path=mask_path,
+            overlay_slice=overlay_slice,
+            status="completed",
+            created_at=datetime.utcnow()
+        )
 
-    # Create DB record
-    prediction_data = PredictionCreate(
-        scan_id=scan.id,
-        tumor_type=tumor_type,
-        result_path=result_path,
-        status="completed",
-        created_at=datetime.utcnow()
-    )
+        # Save to DB
+        try:
+            return create_prediction(db, prediction_data)
+        except IntegrityError:
+            # The scan got its prediction concurrently; complete that record instead
+            db.rollback()
+            prediction = get_prediction_by_scan(db, scan.id)
 
-    # Save to DB
-    prediction = create_prediction(db, prediction_data)
+    # Complete an existing job record
+    values = {
+        "tumor_type": tumor_type,
+        "result_path": result_path,
+        "mask_path": mask_path,
+        "overlay_slice": overlay_slice,
+    }
+    writer = get_group_commit_writer()
+    if writer is not None:
+        # End any open transaction so the writer never waits on this session's lock
+        db.commit()
+        writer.submit(complete_prediction, prediction.id, values).result()
+    else:
+        for column, value in values.items():
+            setattr(prediction, column, value)
+        prediction.status = "completed"
+        db.commit()
+    db.refresh(prediction)
     return prediction
 
-def analyze_mri(image_path: str):
-    image = cv2.imread(image_path)  # Load in color (default BGR)
-    if image is None:
-        raise ValueError("Could not load image from disk.")
+def segment_and_classify(image_path: str, db: Session | None = None, tensor_path: str | None = None):
+    """
+    Segments and classifies a 2D MRI scan.
+
+    Args:
+        image_path (str): Path to the scan image.
+        db (Session, optional): Database session; when given, results are
+            looked up in and stored to the content-addressed prediction cache.
+            A hit is marked as used but not committed; the caller commits it.
+        tensor_path (str, optional): The scan's preprocessed tensor; when it
+            exists it is memory-mapped and the image is not decoded at all.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, str]: The normalized image, the binary
+        mask and the predicted tumor type.
+    """
+    # Map the upload-time tensor, or decode, resize and normalize for both models
+    normalized = prepare_scan_image(image_path, tensor_path)
+
+    use_cache = db is not None and settings.PREDICTION_CACHE_ENABLED
+    cached = None
+    if use_cache:
+        image_hash = hash_image(normalized)
+        cached = get_cached_result(db, image_hash)
+
+    if cached:
+        binary_mask, tumor_type = cached
+        mark_results_used(db, [image_hash])  # Stored with the caller's commit
+    else:
+        # Segmentation + classification run batched with concurrent requests
+        binary_mask, class_probs = get_inference_batcher().predict(normalized)
+
+        # Predict tumor type
+        pred_class = int(np.argmax(class_probs))
+        tumor_type = get_tumor_map()[pred_class]
+
+        if use_cache:
+            store_result(db, image_hash, binary_mask, tumor_type)
+
+    return normalized, binary_mask, tumor_type
+
+
+def analyze_mri(image_path: str, db: Session | None = None, tensor_path: str | None = None):
+    """
+    Segments and classifies an MRI scan.
+
+    Args:
+        image_path (str): Path to the scan image.
+        db (Session, optional): Database session used for the prediction cache.
+        tensor_path (str, optional): The scan's preprocessed tensor, if any.
+
+    Returns:
+        tuple[np.ndarray, str]: The RGB overlay image and the predicted tumor type.
+    """
+    normalized, binary_mask, tumor_type = segment_and_classify(image_path, db, tensor_path)
+    return render_overlay(normalized, binary_mask), tumor_type
+
+
+def get_mask_path(scan_path: str) -> str:
+    """
+    Returns where the bit-packed mask of a scan is stored.
+
+    Args:
+        scan_path (str): Path to the scan file.
+
+    Returns:
+        str: The `.npy` mask path inside the predictions directory.
+    """
+    return os.path.join(PREDICTION_DIR, "masks", f"mask_{os.path.basename(scan_path)}.npy")
+
+
+def render_overlay(
+    normalized: np.ndarray,
+    binary_mask: np.ndarray,
+    color: tuple = (255, 0, 0),
+    alpha: float = 1.0
+) -> np.ndarray:
+    """
+    Paints the segmented tumor region on top of the grayscale scan.
+
+    Args:
+        normalized (np.ndarray): The normalized uint8 image of shape (512, 512).
+        binary_mask (np.ndarray): The 0/1 mask of shape (512, 512).
+        color (tuple, optional): RGB colour of the tumor region. Defaults to red.
+        alpha (float, optional): Opacity of the tumor colour. Defaults to 1.0.
+
+    Returns:
+        np.ndarray: The RGB overlay image.
+    """
+    overlay = cv2.cvtColor(normalized, cv2.COLOR_GRAY2RGB)
+    region = binary_mask == 1
+    if alpha >= 1.0:
+        overlay[region] = color
+    else:
+        blended = (1 - alpha) * overlay[region] + alpha * np.asarray(color, dtype=np.float32)
+        overlay[region] = blended.astype(np.uint8)
+    return overlay
+
+
+def _prepare_or_error(scan: Scan):
+    """Prepares a scan's image, returning the exception instead of raising it."""
+    try:
+        return prepare_scan_image(scan.file_path, scan.tensor_path)
+    except Exception as e:
+        return e
+
+
+def _store_outcomes(db: Session, predictions: dict, outcomes: dict):
+    """Applies batch outcomes to the claimed prediction rows and commits once."""
+    for scan_id, outcome in outcomes.items():
+        prediction = predictions[scan_id]
+        if outcome is None:
+            prediction.status = "failed"
+        else:
+            prediction.tumor_type, prediction.result_path, prediction.mask_path, prediction.overlay_slice = outcome
+            prediction.status = "completed"
+    db.commit()
+
+
+def process_predictions_batch(scans: list[Scan], db: Session) -> list[Prediction]:
+    """
+    Runs tumor segmentation and classification for many scans at once.
+
+    The scans' jobs are claimed first, in one transaction, so a job that a
+    worker or a concurrent `/predict` request is computing is not computed
+    again; such scans, and scans with a completed prediction, are returned
+    as they are. Images are decoded and preprocessed concurrently, cache
+    misses go through the models in large batches, and every result is
+    written in a single transaction.
+
+    Args:
+        scans (list[Scan]): The MRI scans to process.
+        db (Session): Active database session.
+
+    Returns:
+        list[Prediction]: One prediction per scan, in input order. Scans that
+        could not be processed get a 'failed' prediction; scans computed
+        elsewhere keep their 'pending' or 'processing' one.
+    """
+    scan_ids = [scan.id for scan in scans]
+    owned = claim_predictions_for_scans(db, scan_ids, settings.PREDICTION_STALE_SECONDS)
+    todo = [s for s in scans if s.id in owned]
+
+    try:
+        outcomes = _compute_outcomes(todo, db)
+    except Exception:
+        # Mark the claimed jobs failed so they can be retried right away
+        db.rollback()
+        db.execute(update(Prediction).where(Prediction.scan_id.in_(list(owned))).values(status="failed"))
+        db.commit()
+        raise
+
+    predictions = {
+        p.scan_id: p for p in db.query(Prediction).filter(Prediction.scan_id.in_(scan_ids)).all()
+    }
+    # Write every claimed prediction row in one transaction
+    _store_outcomes(db, predictions, outcomes)
+
+    return [predictions[scan_id] for scan_id in scan_ids if scan_id in predictions]
+
+
+def _compute_outcomes(scans: list[Scan], db: Session) -> dict:
+    """
+    Runs the models for claimed scans.
+
+    New cache entries and cache hits are written but not committed; the
+    caller commits them together with the outcomes.
+
+    Returns:
+        dict: scan_id -> (tumor_type, result_path, mask_path, overlay_slice),
+        or None when the scan failed.
+    """
+    images = [s for s in scans if not is_volume(s.file_path)]
+    volumes = [s for s in scans if is_volume(s.file_path)]
+
+    outcomes = {}
+
+    with ThreadPoolExecutor(max_workers=settings.PREPROCESS_WORKERS) as pool:
+        # Map stored tensors, or decode + preprocess concurrently (cv2 releases the GIL)
+        prepared = dict(zip([s.id for s in images], pool.map(_prepare_or_error, images)))
+        ready = [s for s in images if not isinstance(prepared[s.id], Exception)]
+        outcomes.update({s.id: None for s in images if isinstance(prepared[s.id], Exception)})
 
-    # Match Gradio behavior: Convert to grayscale explicitly
-    if len(image.shape) == 3:
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        # Reuse cached results, batch everything else through the models
+        results, misses, hits = {}, [], []
+        for scan in ready:
+            image_hash = hash_image(prepared[scan.id]) if settings.PREDICTION_CACHE_ENABLED else None
+            cached = get_cached_result(db, image_hash) if image_hash else None
+            if cached:
+                results[scan.id] = cached
+                hits.append(image_hash)
+            else:
+                misses.append((scan, image_hash))
 
-    # Resize for both models
-    resized = cv2.resize(image, (512, 512))
-    normalized = ImagePreprocessor.normalize(resized)
+        chunk_size = settings.BATCH_PREDICT_CHUNK_SIZE
+        to_cache = []
+        for start in range(0, len(misses), chunk_size):
+            chunk = misses[start:start + chunk_size]
+            masks, probs = run_models(np.stack([prepared[scan.id] for scan, _ in chunk]))
+            for i, (scan, image_hash) in enumerate(chunk):
+                tumor_type = get_tumor_map()[int(np.argmax(probs[i]))]
+                results[scan.id] = (masks[i], tumor_type)
+                if image_hash:
+                    to_cache.append((image_hash, masks[i], tumor_type))
 
-    # Predict segmentation
-    seg_input = normalized.reshape(1, 512, 512, 1)
-    pred_mask = get_unet_model().predict(seg_input)[0]
-    binary_mask = (pred_mask > 0.5).astype(np.uint8).squeeze()
+        # Store bit-packed masks; overlays are rendered on demand
+        def finish(scan):
+            binary_mask, tumor_type = results[scan.id]
+            mask_path = get_mask_path(scan.file_path)
+            save_mask(mask_path, binary_mask)
+            return tumor_type, os.path.join(PREDICTION_DIR, f"overlay_{os.path.basename(scan.file_path)}"), mask_path, None
 
-    # Create overlay
-    overlay = np.stack([normalized]*3, axis=-1)
-    overlay[binary_mask == 1] = [255, 0, 0]  # Red
+        outcomes.update(zip([s.id for s in ready], pool.map(finish, ready)))
 
-    # Predict tumor type
-    class_input = normalized.reshape(1, 512, 512, 1)
-    class_input = ImagePreprocessor.cnn_image_preprocessor(class_input)
-    pred_class = np.argmax(get_cnn_model().predict(class_input), axis=1)[0]
-    tumor_type = get_tumor_map()[pred_class]
+    # Volumes are already slice-batched internally
+    for scan in volumes:
+        mask_path = get_mask_path(scan.file_path)
+        try:
+            tumor_type, overlay_slice = analyze_volume(
+                scan.file_path, mask_path, get_tumor_map(), batch_size=settings.VOLUME_SLICE_BATCH_SIZE
+            )
+            result_path = os.path.join(PREDICTION_DIR, f"overlay_{os.path.basename(scan.file_path)}.png")
+            outcomes[scan.id] = (tumor_type, result_path, mask_path, overlay_slice)
+        except Exception:
+            outcomes[scan.id] = None
 
-    return overlay, tumor_type
+    # New results and the hits' access times are written last (no lock is
+    # held while the models run) and committed with the outcomes
+    if to_cache:
+        store_results(db, to_cache)
+    mark_results_used(db, hits)
+    return outcomes
@@ -2,79 +2,414 @@
 Service module for handling MRI scan uploads and formatting scan responses.
 
 This module includes:
-- File validation and storage for MRI scans.
-- Database operations for storing scan details.
-- Formatting scan data for API responses.
+- File validation (extension and content signature) and streaming storage for MRI scans.
+- Upload-time preprocessed tensors and thumbnails.
+- Database operations for storing a patient and their scans (one transaction per upload).
+- Removal of a deleted scan's files (upload, derivatives, mask and overlay).
+- Eager-loading options and formatting scan data for API responses (off the event loop for async handlers).
 """
 
+import hashlib
+import logging
 import os
 import shutil
+import uuid
+import zlib
+
+import cv2
 from datetime import datetime, date
-from fastapi import UploadFile, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import UploadFile, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 # Local Imports
+from app.core.config import settings
+from app.db.crud.async_crud_scan import create_patient_scans
 from app.db.models.scan import Scan
+from app.ml_models.preprocessing import decode_grayscale, prepare_decoded, save_tensor, make_thumbnail
+from app.ml_models.volume_inference import is_volume, read_axial_slice
+from app.schemas.patient import PatientCreate
 from app.schemas.scan import ScanCreate
+from app.services.image_variant_service import file_version, overlay_version, variant_url
+
+logger = logging.getLogger(__name__)
 
 # Constants
 UPLOAD_DIR = "uploads"
+PREVIEW_WIDTH = 256  # Width preset of history previews
+DERIVED_DIRNAME = "derived"  # Per-patient folder for tensors and thumbnails
+STAGING_DIRNAME = ".staging"  # Uploads are validated here before their patient is stored
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "nii", "nii.gz"}
 
+# File signatures checked against the first chunk of each upload
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+JPEG_SIGNATURE = b"\xff\xd8\xff"
+GZIP_SIGNATURE = b"\x1f\x8b"
+NIFTI1_MAGICS = (b"n+1\x00", b"ni1\x00")  # At byte offset 344
+NIFTI2_MAGICS = (b"n+2\x00", b"ni2\x00")  # At byte offset 4
 
-async def save_scan(
-    file: UploadFile,
-    patient,
-    user_id: int,
-    scan_date: date,
-    db: Session,
-    doctor_notes: str = None  # Accept doctor notes
-) -> Scan:
+
+def get_file_extension(filename: str) -> str:
     """
-    Saves an MRI scan file to the filesystem and creates a database entry.
+    Extracts the lowercase file extension, keeping compound ones like 'nii.gz'.
+
+    Args:
+        filename (str): The uploaded file name.
+
+    Returns:
+        str: The extension without the leading dot.
+    """
+    filename = filename.lower()
+    if filename.endswith(".nii.gz"):
+        return "nii.gz"
+    return filename.split(".")[-1]
+
+
+def is_nifti_header(header: bytes) -> bool:
+    """Whether the bytes start with a NIfTI-1 or NIfTI-2 header."""
+    return header[344:348] in NIFTI1_MAGICS or header[4:8] in NIFTI2_MAGICS
+
+
+def matches_signature(header: bytes, file_extension: str) -> bool:
+    """
+    Checks the leading bytes of a file against its claimed extension.
+
+    Args:
+        header (bytes): The first chunk of the file.
+        file_extension (str): The extension from `get_file_extension`.
+
+    Returns:
+        bool: True if the content matches the extension.
+    """
+    if file_extension == "png":
+        return header.startswith(PNG_SIGNATURE)
+    if file_extension in ("jpg", "jpeg"):
+        return header.startswith(JPEG_SIGNATURE)
+    if file_extension == "nii":
+        return is_nifti_header(header)
+    if file_extension == "nii.gz":
+        if not header.startswith(GZIP_SIGNATURE):
+            return False
+        try:
+            # Inflate just enough of the stream to see the NIfTI header
+            inflated = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(header, 348)
+        except zlib.error:
+            return False
+        return is_nifti_header(inflated)
+    return False
+
+
+def _write_chunk(out, hasher, chunk: bytes):
+    """Writes and hashes one chunk (run in a worker thread)."""
+    out.write(chunk)
+    hasher.update(chunk)
+
+
+async def write_upload(file: UploadFile, destination: str, file_extension: str) -> str:
+    """
+    Streams an uploaded file to disk in chunks without blocking the event loop.
+
+    The first chunk is checked against the file type's signature, the size
+    limit is enforced as chunks arrive, and the SHA-256 digest is computed
+    along the way. The file only appears at `destination` once complete.
+
+    Args:
+        file (UploadFile): The uploaded file.
+        destination (str): Where the file is stored.
+        file_extension (str): The extension from `get_file_extension`.
+
+    Returns:
+        str: The hex SHA-256 digest of the file content.
+
+    Raises:
+        HTTPException: 400 if the content does not match the extension or is
+        empty, 413 if the file exceeds the size limit, 500 on write errors.
+    """
+    partial_path = f"{destination}.part"
+    hasher = hashlib.sha256()
+    size = 0
+
+    await file.seek(0)
+    out = await run_in_threadpool(open, partial_path, "wb")
+    try:
+        while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+            if size == 0 and not matches_signature(chunk, file_extension):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"File content of '{file.filename}' does not match its format."
+                )
+            size += len(chunk)
+            if size > settings.UPLOAD_MAX_FILE_BYTES:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"File '{file.filename}' exceeds the maximum upload size."
+                )
+            await run_in_threadpool(_write_chunk, out, hasher, chunk)
+
+        if size == 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"File '{file.filename}' is empty.")
+
+        await run_in_threadpool(out.close)
+        await run_in_threadpool(os.replace, partial_path, destination)
+    except HTTPException:
+        await run_in_threadpool(_discard, out, partial_path)
+        raise
+    except Exception as e:
+        await run_in_threadpool(_discard, out, partial_path)
+        raise HTTPException(status_code=500, detail=f"Error saving file: {str(e)}")
+
+    return hasher.hexdigest()
+
+
+def _discard(out, path: str):
+    """Closes and removes a partially written file."""
+    out.close()
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def build_scan_derivatives(file_location: str) -> tuple[str | None, str | None]:
+    """
+    Decodes a stored scan once and writes its preprocessed tensor and thumbnail.
+
+    2D scans get a normalized 512x512 uint8 `.npy` tensor that inference maps
+    directly instead of decoding the original again. Volumes only get a
+    thumbnail of their middle axial slice. Failures are logged and leave the
+    paths empty, in which case callers fall back to the original file.
+
+    Args:
+        file_location (str): Path of the stored scan.
+
+    Returns:
+        tuple[str | None, str | None]: The tensor and thumbnail paths.
+    """
+    directory = os.path.join(os.path.dirname(file_location), DERIVED_DIRNAME)
+    os.makedirs(directory, exist_ok=True)
+    basename = os.path.basename(file_location)
+    tensor_path = None
+
+    try:
+        if is_volume(file_location):
+            preview = read_axial_slice(file_location)
+        else:
+            preview = decode_grayscale(file_location)
+            tensor_path = os.path.join(directory, f"{basename}.npy")
+            save_tensor(tensor_path, prepare_decoded(preview.copy()))
+
+        thumbnail_path = os.path.join(directory, f"{basename}.thumb.jpg")
+        thumbnail = make_thumbnail(preview, settings.THUMBNAIL_MAX_SIZE)
+        if not cv2.imwrite(thumbnail_path, thumbnail, [cv2.IMWRITE_JPEG_QUALITY, 85]):
+            raise ValueError("Could not write thumbnail")
+    except Exception as e:
+        logger.warning(f"Could not preprocess {file_location}: {e}")
+        _remove_files([path for path in (tensor_path,) if path])
+        return None, None
+
+    return tensor_path, thumbnail_path
+
+
+async def stage_scan_file(file: UploadFile, directory: str) -> tuple[str, str, str | None, str | None]:
+    """
+    Validates an uploaded scan, writes it to a staging directory and builds
+    its preprocessed tensor and thumbnail.
 
     Args:
         file (UploadFile): The uploaded MRI scan file.
-        patient (Patient): The patient associated with the scan.
-        user_id (int): The ID of the user uploading the scan.
-        scan_date (date): The date of the scan.
-        db (Session): Database session instance.
-        doctor_notes (str, optional): Notes entered by the doctor.
+        directory (str): The upload's staging directory.
 
     Returns:
-        Scan: The created scan entry in the database.
+        tuple[str, str, str | None, str | None]: The staged file path, its
+        SHA-256 digest, and the tensor and thumbnail paths.
     """
-    file_extension = file.filename.split(".")[-1].lower()
+    file_extension = get_file_extension(file.filename)
     if file_extension not in ALLOWED_EXTENSIONS:
         raise HTTPException(status_code=400, detail="Invalid file format.")
 
-    patient_upload_dir = os.path.join(UPLOAD_DIR, f"patient_{patient.id}")
-    os.makedirs(patient_upload_dir, exist_ok=True)
+    os.makedirs(directory, exist_ok=True)
+
+    file_location = os.path.join(directory, f"{datetime.utcnow().timestamp()}_{file.filename}")
+    content_hash = await write_upload(file, file_location, file_extension)
+    tensor_path, thumbnail_path = await run_in_threadpool(build_scan_derivatives, file_location)
+    return file_location, content_hash, tensor_path, thumbnail_path
 
-    file_location = os.path.join(patient_upload_dir, f"{datetime.utcnow().timestamp()}_{file.filename}")
+
+def _move_staged_file(path: str | None, staging_dir: str, destination_dir: str, moved: list[str]) -> str | None:
+    """
+    Moves a staged file to the same relative location under `destination_dir`.
+
+    Args:
+        path (str | None): The staged file, if any.
+        staging_dir (str): The upload's staging directory.
+        destination_dir (str): The patient's upload directory.
+        moved (list[str]): Receives the new path, for cleanup on failure.
+
+    Returns:
+        str | None: The new path.
+    """
+    if path is None:
+        return None
+    destination = os.path.join(destination_dir, os.path.relpath(path, staging_dir))
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    os.replace(path, destination)
+    moved.append(destination)
+    return destination
+
+
+def _remove_files(paths: list[str]):
+    """Deletes staged files, ignoring ones already gone."""
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def scan_files(scan) -> list[str]:
+    """
+    Lists every file stored for a scan.
+
+    Args:
+        scan (Scan): The scan, with its prediction loaded.
+
+    Returns:
+        list[str]: The upload, its tensor and thumbnail, and the prediction's
+        mask and (legacy, pre-rendered) overlay.
+    """
+    paths = [scan.file_path, scan.tensor_path, scan.thumbnail_path]
+    if scan.prediction:
+        paths += [scan.prediction.mask_path, scan.prediction.result_path]
+    return [path for path in paths if path]
+
+
+def delete_scan_files(paths: list[str]):
+    """
+    Removes a deleted scan's files, logging the ones that cannot be removed.
+
+    Rendered overlays and image variants in the disk caches are not removed
+    here: they are keyed by their source's path and content version, so
+    nothing links to them once the rows are gone, and the size-bounded LRU
+    caches (`overlay_cache`, `variant_cache`) evict them as they age out.
+
+    Args:
+        paths (list[str]): The files listed by `scan_files`.
+    """
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove {path}: {e}")
+
+
+async def save_scans(
+    files: list[UploadFile],
+    patient_data: PatientCreate,
+    user_id: int,
+    scan_date: date,
+    db: AsyncSession,
+    doctor_notes: str = None  # Accept doctor notes
+) -> list[Scan]:
+    """
+    Saves MRI scan files to the filesystem and stores them with their patient.
+
+    All files are validated and staged first. Only then is the patient looked
+    up or created, the files moved into the patient's upload directory and
+    every scan row inserted, all in one transaction. If any file or row fails,
+    nothing is kept: no files, no scans and no new patient.
+
+    Args:
+        files (list[UploadFile]): The uploaded MRI scan files.
+        patient_data (PatientCreate): The patient details.
+        user_id (int): The ID of the user uploading the scans.
+        scan_date (date): The date of the scans.
+        db (AsyncSession): Async database session instance.
+        doctor_notes (str, optional): Notes entered by the doctor.
+
+    Returns:
+        list[Scan]: The created scan entries, in upload order.
+    """
+    staging_dir = os.path.join(UPLOAD_DIR, STAGING_DIRNAME, uuid.uuid4().hex)
+    staged, moved = [], []
+
+    def build_rows(patient) -> list[dict]:
+        patient_upload_dir = os.path.join(UPLOAD_DIR, f"patient_{patient.id}")
+        rows = []
+        for file_location, content_hash, tensor_path, thumbnail_path in staged:
+            scan_data = ScanCreate(
+                patient_name=patient.name,
+                age=patient.age,
+                sex=patient.sex,
+                scan_date=scan_date,
+                file_path=_move_staged_file(file_location, staging_dir, patient_upload_dir, moved),
+                doctor_notes=doctor_notes  # Pass doctor notes to schema
+            )
+            rows.append({
+                **scan_data.model_dump(),
+                "patient_id": patient.id,
+                "user_id": user_id,
+                "content_hash": content_hash,
+                "tensor_path": _move_staged_file(tensor_path, staging_dir, patient_upload_dir, moved),
+                "thumbnail_path": _move_staged_file(thumbnail_path, staging_dir, patient_upload_dir, moved),
+            })
+        return rows
 
     try:
-        with open(file_location, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error saving file: {str(e)}")
+        for file in files:
+            staged.append(await stage_scan_file(file, staging_dir))
+
+        return await create_patient_scans(db, patient_data, build_rows)
+    except Exception:
+        await run_in_threadpool(_remove_files, moved)
+        raise
+    finally:
+        await run_in_threadpool(shutil.rmtree, staging_dir, True)
+
+
+def get_preview_url(scan) -> str | None:
+    """
+    Builds the versioned URL of a scan's history preview.
+
+    The preview is the overlay once a prediction has completed, otherwise the
+    upload thumbnail (or the original scan).
+
+    Args:
+        scan (Scan): The scan, with its prediction loaded.
+
+    Returns:
+        str | None: The `/images/...` variant URL, or None if there is no image.
+    """
+    prediction = scan.prediction
+    if prediction and prediction.status == "completed" and prediction.result_path:
+        version = overlay_version(prediction) or file_version(prediction.result_path)
+        if version:
+            return variant_url(prediction.result_path, version, PREVIEW_WIDTH)
+
+    source_path = scan.thumbnail_path or scan.file_path
+    version = file_version(source_path)
+    return variant_url(source_path, version, PREVIEW_WIDTH) if version else None
+
 
-    scan_data = ScanCreate(
-        patient_name=patient.name,
-        age=patient.age,
-        sex=patient.sex,
-        scan_date=scan_date,
-        file_path=file_location,
-        doctor_notes=doctor_notes  # Pass doctor notes to schema
-    )
+def scan_response_options(include_patient: bool, include_uploader: bool = False) -> list:
+    """
+    Loader options for the relations `format_scan_response` reads.
 
-    new_scan = Scan(**scan_data.dict(), patient_id=patient.id, user_id=user_id)
+    Passing these to the scan query loads each scan's prediction (and
+    patient/uploader when requested) in the same statement, instead of one
+    lazy load per scan.
 
-    db.add(new_scan)
-    db.commit()
-    db.refresh(new_scan)
+    Args:
+        include_patient (bool): Whether patient details will be included.
+        include_uploader (bool, optional): Whether uploader details will be included.
 
-    return new_scan
+    Returns:
+        list: Options for `Query.options()`.
+    """
+    options = [joinedload(Scan.prediction)]
+    if include_patient:
+        options.append(joinedload(Scan.patient))
+    if include_uploader:
+        options.append(joinedload(Scan.user))
+    return options
 
 
 def format_scan_response(scans, include_patient: bool, include_uploader: bool = False) -> list:
@@ -82,7 +417,7 @@ def format_scan_response(scans, include_patient: bool, include_uploader: bool =
     Formats scan data for API responses.
 
     Args:
-        scans (List[Scan]): List of scan objects from the database.
+        scans (List[Scan]): Scans loaded with `scan_response_options()`.
         include_patient (bool): Whether to include patient details in the response.
         include_uploader (bool, optional): Whether to include uploader details. Defaults to False.
 
@@ -95,6 +430,8 @@ def format_scan_response(scans, include_patient: bool, include_uploader: bool =
         scan_data = {
             "scan_id": scan.id,
             "file_path": scan.file_path.replace("\\", "/"),
+            "thumbnail_path": scan.thumbnail_path.replace("\\", "/") if scan.thumbnail_path else None,
+            "preview_url": get_preview_url(scan),
             "uploaded_at": scan.uploaded_at,
             "prediction_status": prediction.status if prediction else "pending",
             "prediction_result_path": prediction.result_path.replace("\\", "/") if prediction and prediction.result_path else None,
@@ -120,3 +457,21 @@ def format_scan_response(scans, include_patient: bool, include_uploader: bool =
         formatted_scans.append(scan_data)
 
     return formatted_scans
+
+
+async def format_scan_page(scans, include_patient: bool, include_uploader: bool = False) -> list:
+    """
+    Formats scan data for API responses in a worker thread.
+
+    Building preview URLs stats each scan's preview file, so async handlers
+    format their page here instead of blocking the event loop.
+
+    Args:
+        scans (List[Scan]): Scans loaded with `scan_response_options()`.
+        include_patient (bool): Whether to include patient details in the response.
+        include_uploader (bool, optional): Whether to include uploader details. Defaults to False.
+
+    Returns:
+        list: Formatted scan data for API responses.
+    """
+    return await run_in_threadpool(format_scan_response, scans, include_patient, include_uploader)
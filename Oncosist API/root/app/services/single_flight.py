@@ -0,0 +1,65 @@
+"""
+In-process single-flight call deduplication.
+
+This module includes:
+- Running a function once per key while concurrent callers with the same key
+  wait for, and share, that call's result (or exception).
+"""
+
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    runs block until it finishes and receive the same result. Once the call
+    completes the key is released, so later calls run again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict = {}
+
+    def do(self, key, fn):
+        """
+        Runs `fn` once for all concurrent callers using `key`.
+
+        Args:
+            key: Identifies the shared computation.
+            fn (Callable): The function to run; takes no arguments.
+
+        Returns:
+            The result of the shared call.
+
+        Raises:
+            Exception: Whatever the shared call raised, re-raised in every caller.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self, key) -> bool:
+        """Whether a call for `key` is currently running."""
+        with self._lock:
+            return key in self._calls
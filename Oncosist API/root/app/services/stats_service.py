@@ -0,0 +1,115 @@
+"""
+Service module for scan and prediction statistics.
+
+This module includes:
+- Per-user statistics: scans per day, per patient, and predictions by status and tumor type.
+- Per-patient statistics: scans and predictions by status and tumor type.
+
+Everything is read from the rollup tables, which triggers keep current, so
+the cost of a dashboard load does not grow with the number of scans.
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Local Imports
+from app.db.models.patient import Patient
+from app.db.models.stats import PatientPredictions, UserDailyScans, UserPatientScans, UserPredictions
+from app.services.history_service import PREDICTION_STATUSES
+
+
+def summarize_predictions(rows, total_scans: int) -> dict:
+    """
+    Folds (status, tumor type, count) rollup rows into the response counts.
+
+    Scans without a prediction count as pending, as in the history filters.
+
+    Args:
+        rows (Iterable[tuple[str, str, int]]): Rollup rows.
+        total_scans (int): Number of scans the rows belong to.
+
+    Returns:
+        dict: Counts per prediction status and per predicted tumor type.
+    """
+    by_status = dict.fromkeys(PREDICTION_STATUSES, 0)
+    tumor_types = {}
+    for prediction_status, tumor_type, count in rows:
+        by_status[prediction_status] = by_status.get(prediction_status, 0) + count
+        if tumor_type:
+            tumor_types[tumor_type] = tumor_types.get(tumor_type, 0) + count
+
+    by_status["pending"] += max(total_scans - sum(by_status.values()), 0)
+    return {"predictions_by_status": by_status, "tumor_types": tumor_types}
+
+
+async def get_user_stats(db: AsyncSession, user_id: int, days: int) -> dict:
+    """
+    Retrieves the statistics of the scans a user uploaded.
+
+    Args:
+        db (AsyncSession): Async database session instance.
+        user_id (int): The uploader.
+        days (int): Number of days, ending today (UTC), in `scans_per_day`.
+
+    Returns:
+        dict: Total scans, scans per day (every day included), counts per
+        prediction status and tumor type, and scans per patient.
+    """
+    today = datetime.utcnow().date()
+    first_day = today - timedelta(days=days - 1)
+
+    daily = dict((await db.execute(
+        select(UserDailyScans.day, UserDailyScans.scans)
+        .where(UserDailyScans.user_id == user_id, UserDailyScans.day >= first_day)
+    )).all())
+
+    patients = (await db.execute(
+        select(UserPatientScans.patient_id, Patient.name, UserPatientScans.scans)
+        .join(Patient, Patient.id == UserPatientScans.patient_id)
+        .where(UserPatientScans.user_id == user_id)
+        .order_by(UserPatientScans.scans.desc(), UserPatientScans.patient_id)
+    )).all()
+    total_scans = sum(scans for _, _, scans in patients)
+
+    predictions = await db.execute(
+        select(UserPredictions.status, UserPredictions.tumor_type, UserPredictions.predictions)
+        .where(UserPredictions.user_id == user_id)
+    )
+
+    return {
+        "total_scans": total_scans,
+        "scans_per_day": [
+            {"day": day.isoformat(), "scans": daily.get(day, 0)}
+            for day in (first_day + timedelta(days=offset) for offset in range(days))
+        ],
+        **summarize_predictions(predictions.all(), total_scans),
+        "patients": [
+            {"patient_id": patient_id, "patient_name": name, "scans": scans}
+            for patient_id, name, scans in patients
+        ],
+    }
+
+
+async def get_patient_stats(db: AsyncSession, patient_id: int) -> dict:
+    """
+    Retrieves the statistics of a patient's scans.
+
+    Args:
+        db (AsyncSession): Async database session instance.
+        patient_id (int): The patient.
+
+    Returns:
+        dict: Total scans and counts per prediction status and tumor type.
+    """
+    total_scans = await db.scalar(
+        select(func.coalesce(func.sum(UserPatientScans.scans), 0))
+        .where(UserPatientScans.patient_id == patient_id)
+    )
+
+    predictions = await db.execute(
+        select(PatientPredictions.status, PatientPredictions.tumor_type, PatientPredictions.predictions)
+        .where(PatientPredictions.patient_id == patient_id)
+    )
+
+    return {"total_scans": total_scans, **summarize_predictions(predictions.all(), total_scans)}
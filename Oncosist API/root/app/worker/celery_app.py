@@ -0,0 +1,33 @@
+# app/worker/celery_app.py
+
+"""
+Celery application for asynchronous prediction jobs.
+
+Start a worker pool with:
+    celery -A app.worker.celery_app worker --loglevel=info
+"""
+
+from celery import Celery
+
+# Local Imports
+from app.core.config import settings
+
+celery_app = Celery(
+    "oncosist",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND,
+    include=["app.worker.tasks"],
+)
+
+celery_app.conf.update(
+    task_always_eager=settings.CELERY_TASK_ALWAYS_EAGER,
+    task_eager_propagates=False,
+    task_serializer="json",
+    accept_content=["json"],
+    result_serializer="json",
+    # Acknowledge only after the job finished so a crashed worker's job is redelivered
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    # Inference jobs are long and CPU-bound; don't let one worker hoard the queue
+    worker_prefetch_multiplier=1,
+)
@@ -0,0 +1,172 @@
+# app/worker/executor.py
+
+"""
+In-process executor for predictions scheduled at upload time.
+
+This module includes:
+- A bounded thread pool that runs pending prediction jobs next to the API.
+- A registry of in-flight jobs by scan, so `/predict` can wait for them.
+- Scheduling of every scan of an upload as soon as its row is stored.
+- Resuming unfinished jobs in-process when there is no Celery worker (eager mode).
+
+Unlike `BackgroundTasks`, jobs do not run on the request's worker and the
+number of queued jobs is capped; scans over the cap stay 'pending' and are
+picked up by the next `/predict` call or by a resumed job.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+# Local Imports
+from app.core.config import settings
+from app.db.crud.crud_prediction import create_pending_predictions
+from app.db.crud.async_crud_prediction import create_pending_predictions as create_pending_predictions_async
+from app.worker.tasks import process_prediction_job, take_stalled_predictions
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionExecutor:
+    """
+    A bounded pool of prediction workers with an in-flight registry.
+
+    Attributes:
+        max_workers (int): Jobs processed concurrently.
+        max_pending (int): Jobs queued or running at most.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="analyze")
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._in_flight: dict[int, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, scan_id: int, prediction_id: int) -> Future | None:
+        """
+        Schedules a pending prediction job.
+
+        Args:
+            scan_id (int): The scan the prediction belongs to.
+            prediction_id (int): The ID of the pending prediction record.
+
+        Returns:
+            Future | None: The job's future (an existing one if the scan is
+            already in flight), or None if the queue is full.
+        """
+        with self._lock:
+            if scan_id in self._in_flight:
+                return self._in_flight[scan_id]
+            if not self._slots.acquire(blocking=False):
+                return None
+            future = self._pool.submit(process_prediction_job, prediction_id)
+            self._in_flight[scan_id] = future
+
+        future.add_done_callback(lambda done: self._finish(scan_id, done))
+        return future
+
+    def get_in_flight(self, scan_id: int) -> Future | None:
+        """
+        Returns the future of a scan's queued or running job, if any.
+
+        Args:
+            scan_id (int): The scan ID.
+
+        Returns:
+            Future | None: The job's future.
+        """
+        with self._lock:
+            return self._in_flight.get(scan_id)
+
+    def _finish(self, scan_id: int, future: Future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Prediction job of scan {scan_id} failed", exc_info=future.exception())
+        with self._lock:
+            self._in_flight.pop(scan_id, None)
+        self._slots.release()
+
+
+_executor: PredictionExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_prediction_executor() -> PredictionExecutor:
+    """Returns the process-wide prediction executor."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = PredictionExecutor(settings.ANALYZE_WORKERS, settings.ANALYZE_MAX_PENDING)
+    return _executor
+
+
+def schedule_predictions(db: Session, scan_ids: list[int]) -> list[int]:
+    """
+    Creates pending predictions for new scans and schedules them right away.
+
+    Args:
+        db (Session): Database session instance.
+        scan_ids (list[int]): The IDs of the stored scans, in upload order.
+
+    Returns:
+        list[int]: The IDs of the pending prediction records.
+    """
+    if not scan_ids:
+        return []
+
+    prediction_ids = create_pending_predictions(db, scan_ids)
+    _submit_all(scan_ids, prediction_ids)
+    return prediction_ids
+
+
+async def schedule_predictions_async(db: AsyncSession, scan_ids: list[int]) -> list[int]:
+    """
+    Async variant of `schedule_predictions` for request handlers.
+
+    Args:
+        db (AsyncSession): Async database session instance.
+        scan_ids (list[int]): The IDs of the stored scans, in upload order.
+
+    Returns:
+        list[int]: The IDs of the pending prediction records.
+    """
+    if not scan_ids:
+        return []
+
+    prediction_ids = await create_pending_predictions_async(db, scan_ids)
+    _submit_all(scan_ids, prediction_ids)
+    return prediction_ids
+
+
+def resume_predictions_in_process() -> int:
+    """
+    Schedules the unfinished jobs no live worker owns on the executor.
+
+    Used at startup in eager mode, where no Celery worker resumes them. Jobs
+    are only queued, not run, so this returns as soon as they are taken.
+
+    Returns:
+        int: The number of jobs taken.
+    """
+    jobs = take_stalled_predictions()
+    _submit_all([scan_id for _, scan_id in jobs], [prediction_id for prediction_id, _ in jobs])
+
+    if jobs:
+        logger.info(f"Resumed {len(jobs)} pending prediction job(s)")
+    return len(jobs)
+
+
+def _submit_all(scan_ids: list[int], prediction_ids: list[int]):
+    """Submits each pending prediction, leaving the ones over the queue bound pending."""
+    executor = get_prediction_executor()
+
+    deferred = 0
+    for scan_id, prediction_id in zip(scan_ids, prediction_ids):
+        if executor.submit(scan_id, prediction_id) is None:
+            deferred += 1
+    if deferred:
+        logger.warning(f"Analysis queue is full; {deferred} scan(s) left pending until requested")
@@ -0,0 +1,129 @@
+# app/worker/tasks.py
+
+"""
+Celery tasks for asynchronous tumor prediction.
+
+This module includes:
+- The prediction job that runs segmentation + classification for a pending record,
+  as a plain function (for the in-process executor) and as a Celery task.
+- Enqueueing helpers used by the API.
+- Resumption of jobs left pending, or abandoned mid-run by a dead worker.
+"""
+
+import logging
+from celery.signals import worker_ready
+
+# Local Imports
+from app.core.config import settings
+from app.worker.celery_app import celery_app
+from app.db.session import SessionLocal
+from app.db.models.scan import Scan
+from app.db.crud.crud_prediction import (
+    get_prediction, claim_prediction, update_prediction_status, requeue_stalled_predictions
+)
+from app.services.prediction_service import process_prediction
+
+logger = logging.getLogger(__name__)
+
+
+def process_prediction_job(prediction_id: int) -> str:
+    """
+    Processes a pending prediction job.
+
+    A plain function, so threads can call it without going through Celery's
+    task machinery; `run_prediction_job` is the Celery task wrapping it.
+
+    Args:
+        prediction_id (int): The ID of the pending prediction record.
+
+    Returns:
+        str: The final status of the prediction.
+    """
+    db = SessionLocal()
+    try:
+        # Skip jobs that another live worker already claimed or finished
+        if not claim_prediction(db, prediction_id, stale_after=settings.PREDICTION_STALE_SECONDS):
+            prediction = get_prediction(db, prediction_id)
+            return prediction.status if prediction else "missing"
+
+        prediction = get_prediction(db, prediction_id)
+        scan = db.query(Scan).filter(Scan.id == prediction.scan_id).first()
+        if not scan:
+            update_prediction_status(db, prediction, "failed")
+            return "failed"
+
+        try:
+            process_prediction(scan, db, prediction=prediction)
+        except Exception as e:
+            logger.error(f"Prediction job {prediction_id} failed: {str(e)}")
+            db.rollback()
+            update_prediction_status(db, prediction, "failed")
+
+        return prediction.status
+    finally:
+        db.close()
+
+
+@celery_app.task(name="predictions.run")
+def run_prediction_job(prediction_id: int) -> str:
+    """
+    Celery task running `process_prediction_job`.
+
+    Args:
+        prediction_id (int): The ID of the pending prediction record.
+
+    Returns:
+        str: The final status of the prediction.
+    """
+    return process_prediction_job(prediction_id)
+
+
+def enqueue_prediction(prediction_id: int):
+    """
+    Sends a pending prediction to the worker pool.
+
+    Args:
+        prediction_id (int): The ID of the pending prediction record.
+    """
+    run_prediction_job.delay(prediction_id)
+
+
+def take_stalled_predictions() -> list[tuple[int, int]]:
+    """
+    Takes the unfinished jobs no live worker owns.
+
+    Jobs still 'processing' are only taken once their claim is older than
+    `PREDICTION_STALE_SECONDS`, so a job a worker (or a `/predict` request)
+    is computing right now is never started a second time. Each job is
+    handed to one process only, even when several resume at once.
+
+    Returns:
+        list[tuple[int, int]]: (prediction_id, scan_id) of each job, now 'pending'.
+    """
+    db = SessionLocal()
+    try:
+        return requeue_stalled_predictions(db, settings.PREDICTION_STALE_SECONDS)
+    finally:
+        db.close()
+
+
+def resume_pending_predictions() -> int:
+    """
+    Re-enqueues the unfinished jobs no live worker owns.
+
+    Returns:
+        int: The number of jobs re-enqueued.
+    """
+    jobs = take_stalled_predictions()
+    for prediction_id, _ in jobs:
+        enqueue_prediction(prediction_id)
+
+    if jobs:
+        logger.info(f"Resumed {len(jobs)} pending prediction job(s)")
+    return len(jobs)
+
+
+@worker_ready.connect
+def _resume_on_worker_start(**kwargs):
+    """Resumes unfinished jobs when a worker pool comes up."""
+    resume_pending_predictions()
@@ -0,0 +1,38 @@
+# backfill_scan_derivatives.py
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from app.db.session import SessionLocal
+from app.db.models.scan import Scan
+from app.services.scan_service import build_scan_derivatives
+
+# Import all models so relationships resolve
+from app.db.models import user, patient, prediction  # noqa: F401
+
+
+def backfill_scan_derivatives():
+    """
+    Builds the preprocessed tensor and thumbnail of scans uploaded before
+    they were generated at upload time. Running it again is a no-op.
+    """
+    db = SessionLocal()
+    try:
+        scans = db.query(Scan).filter(Scan.thumbnail_path.is_(None)).all()
+        print(f"Preprocessing {len(scans)} scans...")
+
+        for scan in scans:
+            if not os.path.exists(scan.file_path):
+                print(f"Skipping scan {scan.id}: {scan.file_path} is missing.")
+                continue
+            scan.tensor_path, scan.thumbnail_path = build_scan_derivatives(scan.file_path)
+            db.commit()
+
+        print("Scan derivatives are up to date.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    backfill_scan_derivatives()
@@ -0,0 +1,29 @@
+# backfill_stats.py
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from app.db.session import SessionLocal
+from app.db.crud.crud_stats import rebuild_stats
+
+
+def backfill_stats():
+    """
+    Rebuilds the statistics rollups from the scans and predictions.
+
+    Migration 0004 fills the rollups once and triggers keep them current, so
+    this is only needed to repair them. Running it again is a no-op.
+    """
+    db = SessionLocal()
+    try:
+        print("Rebuilding statistics rollups...")
+        for table, rows in rebuild_stats(db).items():
+            print(f"{table}: {rows} rows")
+        print("Statistics rollups are up to date.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    backfill_stats()
@@ -0,0 +1,389 @@
+# benchmark_inference.py
+
+"""
+Offline CPU benchmark for the MRI analysis pipeline.
+
+Times every stage of `analyze_mri` (decode, preprocess, U-Net, CNN, overlay,
+PNG encode and DB write) over a sweep of batch sizes and TensorFlow
+intra/inter-op thread settings, and writes the p50/p95/p99 latencies and
+images/sec of each stage as JSON.
+
+Each thread setting runs in its own subprocess, because TensorFlow's thread
+pools can only be configured before the runtime initializes.
+
+Usage:
+    python benchmark_inference.py --output bench.json
+    python benchmark_inference.py --source uploads --batch-sizes 1,4,16 --threads 1:1,4:1,0:0
+    python benchmark_inference.py --baseline baseline.json --tolerance 0.15
+
+With `--baseline`, the run is compared against a previous result file and the
+script exits with status 1 if any stage's p50 or p95 latency regressed by more
+than the tolerance.
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import cv2
+import numpy as np
+
+STAGES = ("decode", "preprocess", "unet", "cnn", "overlay", "png_encode", "db_write")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+
+def parse_int_list(value: str) -> list[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def parse_thread_settings(value: str) -> list[tuple[int, int]]:
+    """Parses 'intra:inter,...' pairs; 0 keeps TensorFlow's default."""
+    settings_list = []
+    for item in value.split(","):
+        intra, _, inter = item.strip().partition(":")
+        settings_list.append((int(intra), int(inter or 0)))
+    return settings_list
+
+
+def load_input_paths(source: str, count: int, workdir: str) -> list[str]:
+    """
+    Returns `count` image paths, cycling through the available inputs.
+
+    Args:
+        source (str): 'synthetic', or a directory searched recursively for images.
+        count (int): Number of images per pass.
+        workdir (str): Where synthetic images are written.
+
+    Returns:
+        list[str]: The image paths.
+    """
+    if source == "synthetic":
+        rng = np.random.default_rng(0)
+        paths = []
+        for i in range(count):
+            # Smooth random blobs compress like real scans; pure noise would not
+            image = cv2.GaussianBlur(rng.integers(0, 256, (512, 512), dtype=np.uint8), (15, 15), 0)
+            path = os.path.join(workdir, f"synthetic_{i}.png")
+            cv2.imwrite(path, image)
+            paths.append(path)
+        return paths
+
+    found = sorted(
+        path for path in glob.glob(os.path.join(source, "**", "*"), recursive=True)
+        if path.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    if not found:
+        raise SystemExit(f"No images found under '{source}'")
+    return [found[i % len(found)] for i in range(count)]
+
+
+def summarize(samples_ms: list[float], images_per_sample: int) -> dict:
+    """
+    Summarizes per-batch stage timings.
+
+    Args:
+        samples_ms (list[float]): Latency of each batch in milliseconds.
+        images_per_sample (int): Images processed per batch.
+
+    Returns:
+        dict: p50/p95/p99/mean latency (ms per batch) and images/sec.
+    """
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    mean_ms = float(samples.mean())
+    return {
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "p99_ms": float(np.percentile(samples, 99)),
+        "mean_ms": mean_ms,
+        "images_per_sec": images_per_sample * 1000.0 / mean_ms if mean_ms > 0 else None,
+    }
+
+
+def run_worker(args) -> dict:
+    """
+    Benchmarks every batch size under one TensorFlow thread setting.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+
+    Returns:
+        dict: Results for this thread setting.
+    """
+    import tensorflow as tf
+
+    if args.intra:
+        tf.config.threading.set_intra_op_parallelism_threads(args.intra)
+    if args.inter:
+        tf.config.threading.set_inter_op_parallelism_threads(args.inter)
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.core.config import settings
+    from app.db.base import Base
+    from app.db.models import user, patient, scan, prediction  # noqa: F401
+    from app.db.models.prediction import Prediction
+    from app.ml_models import models_loader
+    from app.ml_models.compiled_inference import get_compiled_unet, get_compiled_cnn
+    from app.ml_models.preprocessing import IMAGE_SIZE, decode_grayscale, normalize, InputBuffers
+    from app.services.prediction_service import render_overlay
+
+    if args.unet:
+        models_loader.unet_path = args.unet
+    if args.cnn:
+        models_loader.cnn_path = args.cnn
+
+    start = time.perf_counter()
+    models_loader.load_models()
+    model_load_ms = (time.perf_counter() - start) * 1000
+    tumor_map = models_loader.get_tumor_map()
+
+    # Predictions go to a throwaway database unless one is given explicitly
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+
+    def forward(name: str, batch: np.ndarray) -> np.ndarray:
+        if settings.INFERENCE_COMPILED:
+            model = get_compiled_unet() if name == "unet" else get_compiled_cnn()
+            return model(batch)
+        model = models_loader.get_unet_model() if name == "unet" else models_loader.get_cnn_model()
+        return model.predict(batch, batch_size=len(batch), verbose=0)
+
+    workdir = tempfile.mkdtemp(prefix="oncosist_bench_")
+    max_batch = max(args.batch_sizes)
+    paths = load_input_paths(args.source, max(max_batch, args.images), workdir)
+    buffers = InputBuffers()  # Reused across batches, as the inference batcher does
+
+    def run_batch(batch_paths: list[str], db) -> dict:
+        timings = {}
+
+        t = time.perf_counter()
+        decoded = [decode_grayscale(path) for path in batch_paths]
+        timings["decode"] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        images = np.empty((len(decoded), IMAGE_SIZE, IMAGE_SIZE), dtype=np.uint8)
+        for i, image in enumerate(decoded):
+            normalize(cv2.resize(image, (IMAGE_SIZE, IMAGE_SIZE)), out=images[i])
+        unet_input = buffers.unet_input(images)
+        cnn_input = buffers.cnn_input(images)
+        timings["preprocess"] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        masks = (forward("unet", unet_input) > 0.5).astype(np.uint8).reshape(-1, IMAGE_SIZE, IMAGE_SIZE)
+        timings["unet"] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        probs = forward("cnn", cnn_input)
+        timings["cnn"] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        overlays = [render_overlay(images[i], masks[i]) for i in range(len(images))]
+        timings["overlay"] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        for overlay in overlays:
+            cv2.imencode(".png", cv2.cvtColor(overlay, cv2.COLOR_RGB2BGR))
+        timings["png_encode"] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        db.add_all([
+            Prediction(
+                scan_id=i + 1,
+                result_path=f"predictions/overlay_bench_{i}.png",
+                tumor_type=tumor_map[int(np.argmax(probs[i]))],
+                status="completed",
+            )
+            for i in range(len(images))
+        ])
+        db.commit()
+        timings["db_write"] = time.perf_counter() - t
+
+        return timings
+
+    results = []
+    db = SessionLocal()
+    try:
+        for batch_size in args.batch_sizes:
+            batches = [paths[i:i + batch_size] for i in range(0, args.images - batch_size + 1, batch_size)]
+            batches = batches or [paths[:batch_size]]
+
+            # Warm-up traces the compiled functions for this batch shape
+            for _ in range(args.warmup):
+                run_batch(batches[0], db)
+
+            samples = {stage: [] for stage in STAGES}
+            samples["total"] = []
+            for _ in range(args.repeats):
+                for batch_paths in batches:
+                    timings = run_batch(batch_paths, db)
+                    for stage, seconds in timings.items():
+                        samples[stage].append(seconds * 1000)
+                    samples["total"].append(sum(timings.values()) * 1000)
+
+            results.append({
+                "batch_size": batch_size,
+                "samples": len(samples["total"]),
+                "stages": {stage: summarize(samples[stage], batch_size) for stage in STAGES},
+                "total": summarize(samples["total"], batch_size),
+            })
+    finally:
+        db.close()
+
+    return {
+        "intra_op_threads": args.intra,
+        "inter_op_threads": args.inter,
+        "model_load_ms": model_load_ms,
+        "compiled": settings.INFERENCE_COMPILED,
+        "jit_compile": settings.INFERENCE_JIT_COMPILE,
+        "results": results,
+    }
+
+
+def run_sweep(args) -> dict:
+    """
+    Runs one worker subprocess per thread setting and merges their results.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+
+    Returns:
+        dict: The full benchmark report.
+    """
+    runs = []
+    for intra, inter in args.threads:
+        print(f"Benchmarking intra_op={intra or 'default'} inter_op={inter or 'default'}...", file=sys.stderr)
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+            worker_output = f.name
+
+        command = [
+            sys.executable, os.path.abspath(__file__), "--worker",
+            "--intra", str(intra), "--inter", str(inter),
+            "--batch-sizes", ",".join(str(b) for b in args.batch_sizes),
+            "--images", str(args.images), "--repeats", str(args.repeats),
+            "--warmup", str(args.warmup), "--source", args.source,
+            "--database-url", args.database_url, "--output", worker_output,
+        ]
+        if args.unet:
+            command += ["--unet", args.unet]
+        if args.cnn:
+            command += ["--cnn", args.cnn]
+
+        completed = subprocess.run(command, stdout=subprocess.DEVNULL)
+        if completed.returncode != 0:
+            raise SystemExit(f"Benchmark worker failed for threads {intra}:{inter}")
+        with open(worker_output) as f:
+            runs.append(json.load(f))
+        os.remove(worker_output)
+
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {
+            "source": args.source,
+            "images": args.images,
+            "repeats": args.repeats,
+            "batch_sizes": args.batch_sizes,
+        },
+        "runs": runs,
+    }
+
+
+def compare_to_baseline(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Lists stages whose p50 or p95 latency grew by more than `tolerance`.
+
+    Results are matched on thread setting, batch size and stage; entries
+    missing from either report are ignored.
+
+    Args:
+        report (dict): The current report.
+        baseline (dict): A previously saved report.
+        tolerance (float): Allowed relative slowdown (0.1 = 10%).
+
+    Returns:
+        list[str]: One message per regression.
+    """
+    def index(data: dict) -> dict:
+        entries = {}
+        for run in data.get("runs", []):
+            for result in run["results"]:
+                key = (run["intra_op_threads"], run["inter_op_threads"], result["batch_size"])
+                entries[key] = dict(result["stages"], total=result["total"])
+        return entries
+
+    current, previous = index(report), index(baseline)
+    regressions = []
+    for key, stages in current.items():
+        if key not in previous:
+            continue
+        for stage, stats in stages.items():
+            old = previous[key].get(stage)
+            if not old:
+                continue
+            for metric in ("p50_ms", "p95_ms"):
+                if old[metric] > 0 and stats[metric] > old[metric] * (1 + tolerance):
+                    regressions.append(
+                        f"threads={key[0]}:{key[1]} batch={key[2]} {stage} {metric}: "
+                        f"{old[metric]:.2f} -> {stats[metric]:.2f} "
+                        f"(+{(stats[metric] / old[metric] - 1) * 100:.0f}%)"
+                    )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MRI analysis pipeline on CPU.")
+    parser.add_argument("--source", default="synthetic", help="'synthetic' or a directory of images (e.g. uploads)")
+    parser.add_argument("--batch-sizes", type=parse_int_list, default=[1, 2, 4, 8])
+    parser.add_argument("--threads", type=parse_thread_settings, default=[(0, 0)],
+                        help="Comma-separated intra:inter pairs; 0 keeps TensorFlow's default")
+    parser.add_argument("--images", type=int, default=16, help="Images per pass")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed passes per batch size")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed batches per batch size")
+    parser.add_argument("--database-url", default="sqlite://", help="Database for the DB write stage")
+    parser.add_argument("--unet", help="Override the U-Net model path")
+    parser.add_argument("--cnn", help="Override the CNN model path")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="Compare against a previously saved report")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative slowdown")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--intra", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--inter", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    report = run_worker(args) if args.worker else run_sweep(args)
+
+    if not args.worker and args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(report, json.load(f), args.tolerance)
+        report["regressions"] = regressions
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if not args.worker and report.get("regressions"):
+        print("Performance regressions against baseline:", file=sys.stderr)
+        for message in report["regressions"]:
+            print(f"  {message}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
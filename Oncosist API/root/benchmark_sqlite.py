@@ -0,0 +1,239 @@
+# benchmark_sqlite.py
+
+"""
+Mixed read/write load benchmark for the SQLite database profiles.
+
+Concurrent threads issue a mix of history page reads and small writes (a scan
+row plus its pending prediction, as an upload-and-analyze request does)
+against a fresh database for a fixed duration. Each profile is measured:
+
+- default: no pragmas (rollback journal, synchronous=FULL), one commit per write.
+- tuned:   the production profile (WAL, synchronous=NORMAL, mmap, cache, busy timeout).
+- group:   the tuned profile with writes coalesced by the group-commit writer.
+
+Each profile runs in its own subprocess, because the engines are configured
+from settings when `app.db.session` is imported.
+
+Usage:
+    python benchmark_sqlite.py
+    python benchmark_sqlite.py --threads 32 --duration 10 --write-ratio 0.3 --output sqlite_bench.json
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+PROFILES = {
+    "default": {"SQLITE_TUNED": "false", "SQLITE_GROUP_COMMIT": "false"},
+    "tuned": {"SQLITE_TUNED": "true", "SQLITE_GROUP_COMMIT": "false"},
+    "group": {"SQLITE_TUNED": "true", "SQLITE_GROUP_COMMIT": "true"},
+}
+
+
+def percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(samples_ms: list[float], duration_s: float) -> dict:
+    return {
+        "ops": len(samples_ms),
+        "ops_per_sec": round(len(samples_ms) / duration_s, 1),
+        "p50_ms": round(percentile(samples_ms, 0.50), 2),
+        "p95_ms": round(percentile(samples_ms, 0.95), 2),
+        "p99_ms": round(percentile(samples_ms, 0.99), 2),
+    }
+
+
+def run_worker(args) -> dict:
+    """
+    Measures one profile in this process (configured through the environment).
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+
+    Returns:
+        dict: Read and write throughput and latency percentiles, and error count.
+    """
+    from app.core.security import get_password_hash
+    from app.db.crud.crud_prediction import insert_pending_predictions
+    from app.db.crud.crud_scan import insert_scan_rows
+    from app.db.group_commit import get_group_commit_writer
+    from app.db.models.patient import Patient
+    from app.db.models.scan import Scan
+    from app.db.models.user import User
+    from app.db.session import SessionLocal, init_db
+    from app.services.history_service import scan_page_query
+
+    init_db()
+
+    # Seed a history for every simulated user
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        users = [
+            User(username=f"bench{i}", email=f"bench{i}@example.com", hashed_password=get_password_hash("bench"),
+                 full_name="Benchmark", position="Doctor")
+            for i in range(args.users)
+        ]
+        patients = [Patient(name=f"Patient {i}", age=50, sex="Female") for i in range(args.users)]
+        db.add_all(users + patients)
+        db.flush()
+        owners = [(user.id, patient.id) for user, patient in zip(users, patients)]
+        rows = [
+            {"user_id": user_id, "patient_id": patient_id, "patient_name": "Seed", "age": 50, "sex": "Female",
+             "scan_date": now, "uploaded_at": now - timedelta(seconds=i), "file_path": f"uploads/seed_{i}.png"}
+            for i in range(args.seed_scans)
+            for user_id, patient_id in [owners[i % len(owners)]]
+        ]
+        insert_scan_rows(db, rows)
+        db.commit()
+
+    writer = get_group_commit_writer()
+
+    def write_job(session, user_id, patient_id):
+        row = {"user_id": user_id, "patient_id": patient_id, "patient_name": "Bench", "age": 50, "sex": "Female",
+               "scan_date": datetime.utcnow(), "file_path": "uploads/bench.png"}
+        scan_ids = insert_scan_rows(session, [row])
+        insert_pending_predictions(session, scan_ids)
+        return scan_ids[0]
+
+    def write(user_id, patient_id):
+        if writer is not None:
+            return writer.submit(write_job, user_id, patient_id).result()
+        with SessionLocal() as db:
+            scan_id = write_job(db, user_id, patient_id)
+            db.commit()
+            return scan_id
+
+    def read(user_id):
+        with SessionLocal() as db:
+            return list(db.scalars(scan_page_query(Scan.user_id == user_id, args.page_size, include_patient=True)))
+
+    reads, writes, errors = [], [], []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + args.warmup + args.duration
+    measure_from = time.perf_counter() + args.warmup
+
+    def client(seed: int):
+        rng = random.Random(seed)
+        while True:
+            start = time.perf_counter()
+            if start >= stop_at:
+                return
+            user_id, patient_id = owners[rng.randrange(len(owners))]
+            is_write = rng.random() < args.write_ratio
+            try:
+                write(user_id, patient_id) if is_write else read(user_id)
+            except Exception as e:
+                with lock:
+                    errors.append(type(e).__name__)
+                continue
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if start >= measure_from:
+                with lock:
+                    (writes if is_write else reads).append(elapsed_ms)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "read": summarize(reads, args.duration),
+        "write": summarize(writes, args.duration),
+        "total_ops_per_sec": round((len(reads) + len(writes)) / args.duration, 1),
+        "errors": len(errors),
+        "error_types": sorted(set(errors)),
+    }
+
+
+def run_profiles(args) -> dict:
+    """
+    Runs every requested profile in a subprocess on its own fresh database.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+
+    Returns:
+        dict: The report, keyed by profile name.
+    """
+    report = {
+        "config": {key: getattr(args, key) for key in ("threads", "duration", "write_ratio", "users", "seed_scans", "page_size")},
+        "profiles": {},
+    }
+    for name in args.profiles:
+        workdir = tempfile.mkdtemp(prefix=f"sqlite_bench_{name}_")
+        env = {
+            **os.environ,
+            **PROFILES[name],
+            "DATABASE_URL_SQLITE": f"sqlite:///{os.path.join(workdir, 'bench.sqlite3')}",
+            "DATABASE_URL_POSTGRES": "",
+        }
+        command = [
+            sys.executable, os.path.abspath(__file__), "--worker",
+            "--threads", str(args.threads), "--duration", str(args.duration), "--warmup", str(args.warmup),
+            "--write-ratio", str(args.write_ratio), "--users", str(args.users),
+            "--seed-scans", str(args.seed_scans), "--page-size", str(args.page_size),
+        ]
+        result = subprocess.run(command, env=env, cwd=workdir, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Profile '{name}' failed:\n{result.stderr}")
+        report["profiles"][name] = json.loads(result.stdout.strip().splitlines()[-1])
+        print(f"{name:>8}: {format_result(report['profiles'][name])}", file=sys.stderr)
+    return report
+
+
+def format_result(result: dict) -> str:
+    return (
+        f"{result['total_ops_per_sec']:>8} ops/s | "
+        f"read p50 {result['read']['p50_ms']} ms p95 {result['read']['p95_ms']} ms | "
+        f"write p50 {result['write']['p50_ms']} ms p95 {result['write']['p95_ms']} ms | "
+        f"errors {result['errors']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQLite profiles under mixed read/write load.")
+    parser.add_argument("--profiles", type=lambda v: [p for p in v.split(",") if p], default=list(PROFILES),
+                        help=f"Comma-separated subset of: {', '.join(PROFILES)}")
+    parser.add_argument("--threads", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=5.0, help="Measured seconds per profile")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Unmeasured seconds before measuring")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="Fraction of operations that write")
+    parser.add_argument("--users", type=int, default=20, help="Distinct users (and patients)")
+    parser.add_argument("--seed-scans", type=int, default=20000, help="Scans in the database before the run")
+    parser.add_argument("--page-size", type=int, default=50, help="Scans per history page read")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    unknown = [name for name in args.profiles if name not in PROFILES]
+    if unknown:
+        parser.error(f"Unknown profile(s): {', '.join(unknown)}")
+
+    if args.worker:
+        print(json.dumps(run_worker(args)))
+        return
+
+    report = run_profiles(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
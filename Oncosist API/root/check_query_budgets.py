@@ -0,0 +1,110 @@
+# check_query_budgets.py
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+# Run against a throwaway SQLite database, never the configured one
+WORK_DIR = tempfile.mkdtemp(prefix="query_budgets_")
+os.environ["DATABASE_URL_SQLITE"] = f"sqlite:///{os.path.join(WORK_DIR, 'budgets.sqlite3')}"
+os.environ["DATABASE_URL_POSTGRES"] = ""
+os.chdir(WORK_DIR)
+
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.security import create_access_token, get_password_hash
+from app.db.session import SessionLocal, async_engine, engine, init_db
+from app.db.query_counter import QueryCounter
+from app.db.models.user import User
+from app.db.models.patient import Patient
+from app.db.models.scan import Scan
+from app.db.models.prediction import Prediction
+
+# Maximum SQL statements per request, including the authenticated user lookup
+BUDGETS = {
+    "/history/user/recent": 2,
+    "/history/user/all": 2,
+    "/history/user/patients": 2,
+    "/history/patient/{patient_id}/recent": 3,
+    "/history/patient/{patient_id}/all": 3,
+    "/debug/scans": 1,
+    "/stats/user": 4,
+    "/stats/patient/{patient_id}": 4,
+}
+
+# Each endpoint is measured at both sizes; the count must not grow with the rows
+DATASET_SIZES = (5, 200)
+
+
+def seed(num_scans: int) -> tuple[str, int]:
+    """
+    Creates a user and a patient with `num_scans` scans, half of them predicted.
+
+    Returns:
+        tuple[str, int]: An access token for the user and the patient's id.
+    """
+    db = SessionLocal()
+    try:
+        email = f"budget{num_scans}@example.com"
+        user = User(
+            username=f"budget{num_scans}", email=email, hashed_password=get_password_hash("budget"),
+            full_name="Query Budget", position="Doctor",
+        )
+        patient = Patient(name=f"Patient {num_scans}", age=50, sex="Female")
+        db.add_all([user, patient])
+        db.flush()
+
+        now = datetime.utcnow()
+        for i in range(num_scans):
+            scan = Scan(
+                user_id=user.id, patient_id=patient.id, patient_name=patient.name, age=50, sex="Female",
+                scan_date=now, uploaded_at=now - timedelta(minutes=i), file_path=f"uploads/scan_{i}.png",
+            )
+            if i % 2 == 0:
+                scan.prediction = Prediction(status="completed", tumor_type="Glioma")
+            db.add(scan)
+        db.commit()
+        return create_access_token({"sub": email}), patient.id
+    finally:
+        db.close()
+
+
+def measure(client: TestClient, token: str, patient_id: int) -> dict[str, int]:
+    """Requests every budgeted endpoint and returns its statement count."""
+    headers = {"Authorization": f"Bearer {token}"}
+    counts = {}
+    for route in BUDGETS:
+        with QueryCounter(engine, async_engine) as counter:
+            response = client.get(route.format(patient_id=patient_id), headers=headers)
+        if response.status_code != 200:
+            raise RuntimeError(f"{route} returned {response.status_code}: {response.text}")
+        counts[route] = counter.count
+    return counts
+
+
+def check_query_budgets() -> bool:
+    """
+    Measures each endpoint on a small and a large history and checks the budgets.
+
+    Returns:
+        bool: True if no endpoint exceeds its budget at any dataset size.
+    """
+    init_db()  # Seeding runs before the app's startup hook would migrate
+    client = TestClient(app)
+    results = {size: measure(client, *seed(size)) for size in DATASET_SIZES}
+
+    ok = True
+    for route, budget in BUDGETS.items():
+        counts = [results[size][route] for size in DATASET_SIZES]
+        within = max(counts) <= budget
+        ok = ok and within
+        sizes = ", ".join(f"{count} @ {size} scans" for size, count in zip(DATASET_SIZES, counts))
+        print(f"[{'OK' if within else 'FAIL'}] {route}: {sizes} (budget {budget})")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_query_budgets() else 1)
@@ -0,0 +1,99 @@
+# check_resume_jobs.py
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+# Run against a throwaway SQLite database, never the configured one
+WORK_DIR = tempfile.mkdtemp(prefix="resume_jobs_")
+os.environ["DATABASE_URL_SQLITE"] = f"sqlite:///{os.path.join(WORK_DIR, 'resume.sqlite3')}"
+os.environ["DATABASE_URL_POSTGRES"] = ""
+os.chdir(WORK_DIR)
+
+from concurrent.futures import wait
+from datetime import datetime
+
+import app.worker.tasks as tasks
+from app.core.security import get_password_hash
+from app.db.session import SessionLocal, init_db
+from app.db.models.user import User
+from app.db.models.patient import Patient
+from app.db.models.scan import Scan
+from app.db.models.prediction import Prediction
+from app.worker.executor import get_prediction_executor, resume_predictions_in_process
+
+# Stalled jobs resumed at once; more than one exercises concurrent first calls
+NUM_JOBS = 4
+JOB_TIMEOUT = 60  # Seconds to wait for the resumed jobs
+
+
+def complete_without_models(scan, db, prediction=None):
+    """Stands in for `process_prediction`: only the scheduling is under test."""
+    prediction.status = "completed"
+    prediction.tumor_type = "Glioma"
+    db.commit()
+    return prediction
+
+
+def seed(num_jobs: int) -> list[int]:
+    """
+    Creates scans whose predictions were left 'processing' by a dead process.
+
+    Returns:
+        list[int]: The scan IDs.
+    """
+    db = SessionLocal()
+    try:
+        user = User(
+            username="resume", email="resume@example.com", hashed_password=get_password_hash("resume"),
+            full_name="Resume Jobs", position="Doctor",
+        )
+        patient = Patient(name="Resume Patient", age=50, sex="Female")
+        db.add_all([user, patient])
+        db.flush()
+
+        now = datetime.utcnow()
+        scans = [
+            Scan(
+                user_id=user.id, patient_id=patient.id, patient_name=patient.name, age=50, sex="Female",
+                scan_date=now, uploaded_at=now, file_path=f"uploads/scan_{i}.png",
+                prediction=Prediction(status="processing"),  # No claim time: counts as stale
+            )
+            for i in range(num_jobs)
+        ]
+        db.add_all(scans)
+        db.commit()
+        return [scan.id for scan in scans]
+    finally:
+        db.close()
+
+
+def check_resume_jobs() -> bool:
+    """
+    Resumes stalled jobs on a fresh executor, as the eager-mode startup does.
+
+    Returns:
+        bool: True if every resumed job ran to completion.
+    """
+    init_db()
+    tasks.process_prediction = complete_without_models
+    scan_ids = seed(NUM_JOBS)
+
+    resumed = resume_predictions_in_process()
+    executor = get_prediction_executor()
+    wait([future for future in map(executor.get_in_flight, scan_ids) if future], timeout=JOB_TIMEOUT)
+
+    db = SessionLocal()
+    try:
+        statuses = [status for (status,) in db.query(Prediction.status).order_by(Prediction.scan_id)]
+    finally:
+        db.close()
+
+    ok = resumed == NUM_JOBS and statuses == ["completed"] * NUM_JOBS
+    print(f"[{'OK' if ok else 'FAIL'}] resumed {resumed} of {NUM_JOBS} stalled jobs: {statuses}")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_resume_jobs() else 1)
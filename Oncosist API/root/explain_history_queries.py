@@ -0,0 +1,99 @@
+# explain_history_queries.py
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from datetime import date, datetime
+from sqlalchemy import select, text
+
+from app.db.session import SessionLocal, engine, init_db
+from app.db.models.scan import Scan
+from app.db.models.prediction import Prediction
+from app.services.history_service import encode_cursor, scan_page_query
+
+# Import all models so relationships resolve
+from app.db.models import user, patient  # noqa: F401
+
+
+def history_queries():
+    """
+    Builds the hot history queries exactly as the history endpoints do,
+    paired with the index each must use.
+    """
+    cursor = encode_cursor(Scan(id=1000, uploaded_at=datetime(2025, 1, 1)))
+    return {
+        "user first page": (
+            scan_page_query(Scan.user_id == 1, 50, include_patient=True),
+            "ix_scans_user_id_uploaded_at_id",
+        ),
+        "user next page": (
+            scan_page_query(Scan.user_id == 1, 50, cursor, include_patient=True),
+            "ix_scans_user_id_uploaded_at_id",
+        ),
+        "user filtered page": (
+            scan_page_query(
+                Scan.user_id == 1, 50, cursor, include_patient=True,
+                date_from=date(2024, 1, 1), tumor_type="Glioma", prediction_status="completed",
+            ),
+            "ix_scans_user_id_uploaded_at_id",
+        ),
+        "patient first page": (
+            scan_page_query(Scan.patient_id == 1, 50, include_uploader=True),
+            "ix_scans_patient_id_uploaded_at_id",
+        ),
+        "patient next page": (
+            scan_page_query(Scan.patient_id == 1, 50, cursor, include_patient=True),
+            "ix_scans_patient_id_uploaded_at_id",
+        ),
+        "prediction by scan": (
+            select(Prediction).where(Prediction.scan_id == 1),
+            "uq_predictions_scan_id",
+        ),
+        "prediction by overlay path": (
+            select(Prediction).where(Prediction.result_path == "predictions/overlay.png"),
+            "ix_predictions_result_path",
+        ),
+    }
+
+
+def explain(db, query) -> str:
+    """Returns the database's query plan for a query, as text."""
+    statement = query.compile(engine, compile_kwargs={"literal_binds": True})
+
+    if engine.dialect.name == "sqlite":
+        rows = db.execute(text(f"EXPLAIN QUERY PLAN {statement}")).all()
+        return "\n".join(str(row[-1]) for row in rows)
+
+    # Tables in a fresh database are tiny; stop the planner preferring a scan for that reason alone
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    rows = db.execute(text(f"EXPLAIN {statement}")).all()
+    return "\n".join(row[0] for row in rows)
+
+
+def check_history_queries() -> bool:
+    """
+    Prints the plan of each history query and checks that it uses its index.
+
+    Returns:
+        bool: True if every query uses the expected index.
+    """
+    init_db()  # Plans are only meaningful against the current schema
+    db = SessionLocal()
+    ok = True
+    try:
+        for name, (query, index) in history_queries().items():
+            plan = explain(db, query)
+            uses_index = index in plan
+            ok = ok and uses_index
+            print(f"[{'OK' if uses_index else 'FAIL'}] {name}: expects {index}")
+            for line in plan.splitlines():
+                print(f"    {line}")
+    finally:
+        db.rollback()
+        db.close()
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_history_queries() else 1)
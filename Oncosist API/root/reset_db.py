@@ -1,15 +1,19 @@
 # reset_db.py
 
+from sqlalchemy import text
+
 from app.db.base import Base
-from app.db.session import engine
+from app.db.session import engine, run_migrations
 
 def reset_database():
     print("Dropping all tables...")
     Base.metadata.drop_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
     print("Tables dropped.")
 
     print("Recreating tables with updated schema...")
-    Base.metadata.create_all(bind=engine)
+    run_migrations()
     print("Database reset complete!")
 
 if __name__ == "__main__":
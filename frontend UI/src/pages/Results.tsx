@@ -10,28 +10,57 @@ export default function Results() {
   const [patientToDelete, setPatientToDelete] = useState<number | null>(null);
   const [patients, setPatients] = useState<any[]>([]);
   const [selectedPatientName, setSelectedPatientName] = useState<string | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [stats, setStats] = useState<any | null>(null);
 
   useEffect(() => {
     fetchAllHistory();
     fetchPatients();
+    fetchStats();
   }, []);
 
-  const fetchAllHistory = async () => {
+  const filterByPatient = (history: any[], name: string | null) =>
+    name
+      ? history.filter((scan) => scan.patient?.patient_name?.toLowerCase() === name.toLowerCase())
+      : history;
+
+  // History is paginated; pass the previous page's cursor to append the next one
+  const fetchAllHistory = async (cursor: string | null = null) => {
     try {
       const token = localStorage.getItem("access_token");
-      const res = await fetch("http://localhost:8000/history/user/all", {
+      const url = new URL("http://localhost:8000/history/user/all");
+      if (cursor) url.searchParams.set("cursor", cursor);
+      const res = await fetch(url, {
         headers: { Authorization: `Bearer ${token}` },
       });
 
       const data = await res.json();
-      const historyArray = Array.isArray(data.scans) ? data.scans : [];
+      const page = Array.isArray(data.scans) ? data.scans : [];
+      const historyArray = cursor ? [...fullHistory, ...page] : page;
       setFullHistory(historyArray);
-      setPatientHistory(historyArray);
+      setPatientHistory(filterByPatient(historyArray, selectedPatientName));
+      setNextCursor(data.next_cursor || null);
     } catch (err) {
       console.error("Error fetching history:", err);
     }
   };
 
+  // Summary counts come from the stats rollups, not from the loaded history pages
+  const fetchStats = async () => {
+    try {
+      const token = localStorage.getItem("access_token");
+      const res = await fetch("http://localhost:8000/stats/user", {
+        headers: { Authorization: `Bearer ${token}` },
+      });
+
+      if (!res.ok) throw new Error("Failed to load statistics");
+      setStats(await res.json());
+    } catch (err) {
+      console.error("Error fetching statistics:", err);
+      setStats(null);
+    }
+  };
+
   const fetchPatients = async () => {
     try {
       const token = localStorage.getItem("access_token");
@@ -66,14 +95,7 @@ export default function Results() {
     const selectedName = e.target.value;
     setSelectedPatientName(selectedName);
 
-    if (!selectedName) {
-      setPatientHistory(fullHistory);
-    } else {
-      const filtered = fullHistory.filter(
-        (scan) => scan.patient?.patient_name?.toLowerCase() === selectedName.toLowerCase()
-      );
-      setPatientHistory(filtered);
-    }
+    setPatientHistory(filterByPatient(fullHistory, selectedName));
   };
 
   const filteredHistory = patientHistory.filter((scan) =>
@@ -101,6 +123,7 @@ export default function Results() {
         const updatedFull = fullHistory.filter((scan) => scan.scan_id !== scanId);
         setPatientHistory(updated);
         setFullHistory(updatedFull);
+        fetchStats();
       } catch (err) {
         alert("Failed to delete scan.");
         console.error(err);
@@ -124,6 +147,36 @@ export default function Results() {
           <Card.Body>
             <Card.Title>Patient History</Card.Title>
 
+            {stats && (
+              <Row className="mb-4 text-center">
+                <Col xs={6} md={3}>
+                  <h4 className="mb-0">{stats.total_scans}</h4>
+                  <small className="text-muted">Scans</small>
+                </Col>
+                <Col xs={6} md={3}>
+                  <h4 className="mb-0">{stats.patients.length}</h4>
+                  <small className="text-muted">Patients</small>
+                </Col>
+                <Col xs={6} md={3}>
+                  <h4 className="mb-0">{stats.predictions_by_status.completed}</h4>
+                  <small className="text-muted">Completed</small>
+                </Col>
+                <Col xs={6} md={3}>
+                  <h4 className="mb-0">{stats.predictions_by_status.pending + stats.predictions_by_status.processing}</h4>
+                  <small className="text-muted">Pending</small>
+                </Col>
+                {Object.keys(stats.tumor_types).length > 0 && (
+                  <Col xs={12} className="mt-2">
+                    <small className="text-muted">
+                      {Object.entries(stats.tumor_types)
+                        .map(([tumorType, count]) => `${tumorType}: ${count}`)
+                        .join(" · ")}
+                    </small>
+                  </Col>
+                )}
+              </Row>
+            )}
+
             <Row className="mb-3">
               <Col md={6}>
                 <Form.Control
@@ -186,7 +239,7 @@ export default function Results() {
                                     style={{ width: "100%", height: "180px", backgroundColor: "#f8f9fa" }}
                                   >
                                     <img
-                                      src={`http://localhost:8000/${scan.prediction_result_path || scan.file_path}`}
+                                      src={scan.preview_url ? `http://localhost:8000${scan.preview_url}` : `http://localhost:8000/${scan.prediction_result_path || scan.thumbnail_path || scan.file_path}`}
                                       alt="Scan Result"
                                       className="img-fluid rounded"
                                       style={{ maxWidth: "100%", maxHeight: "100%" }}
@@ -211,6 +264,14 @@ export default function Results() {
                 );
               })
             )}
+
+            {nextCursor && (
+              <div className="text-center">
+                <Button variant="outline-primary" onClick={() => fetchAllHistory(nextCursor)}>
+                  Load More
+                </Button>
+              </div>
+            )}
           </Card.Body>
         </Card>
       </Container>
@@ -57,6 +57,7 @@ export default function Upload() {
     formData.append("sex", patientInfo.sex);
     formData.append("scan_date", patientInfo.scan_date);
     formData.append("doctor_notes", doctorNotes);
+    formData.append("analyze", "true"); // Start inference as soon as the scan is stored
 
     let token = localStorage.getItem("access_token");
     if (!token) {